@@ -0,0 +1,116 @@
+"""Initial schema: the tables as they stood before the migration chain began
+
+Revision ID: 000_initial_schema
+Revises: None
+Create Date: 2026-10-17
+
+Until then tables were created by Base.metadata.create_all at startup, so the
+chain had no root. items.priority is included here because it was only ever
+added at startup, never by a migration.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '000_initial_schema'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ITEM_TYPES = ('inbox', 'next_action', 'waiting_for', 'scheduled', 'someday', 'reference')
+ITEM_PRIORITIES = ('p1', 'p2', 'p3', 'p4')
+FAMILY_ROLES = ('owner', 'admin', 'member')
+PROJECT_STATUSES = ('active', 'completed', 'someday')
+PROJECT_HORIZONS = ('project', 'area', 'goal', 'vision', 'purpose')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'users',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('email', sa.String(255), nullable=False),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_users_email', 'users', ['email'], unique=True)
+
+    op.create_table(
+        'families',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('created_by', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('invite_code', sa.String(32), unique=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'family_members',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('family_id', sa.String(36), sa.ForeignKey('families.id'), nullable=False),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('role', sa.Enum(*FAMILY_ROLES, name='familyrole'), nullable=False),
+        sa.Column('joined_at', sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        'projects',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('family_id', sa.String(36), sa.ForeignKey('families.id'), nullable=True),
+        sa.Column('name', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('status', sa.Enum(*PROJECT_STATUSES, name='projectstatus'), nullable=False),
+        sa.Column('horizon', sa.Enum(*PROJECT_HORIZONS, name='projecthorizon'), nullable=False),
+        sa.Column('parent_id', sa.String(36), sa.ForeignKey('projects.id'), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'contexts',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('name', sa.String(100), nullable=False),
+        sa.Column('color', sa.String(7), nullable=True),
+    )
+    op.create_table(
+        'items',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('project_id', sa.String(36), sa.ForeignKey('projects.id'), nullable=True),
+        sa.Column('title', sa.String(500), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('type', sa.Enum(*ITEM_TYPES, name='itemtype'), nullable=False),
+        sa.Column('context_id', sa.String(36), sa.ForeignKey('contexts.id'), nullable=True),
+        sa.Column('assigned_to', sa.String(36), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('priority', sa.Enum(*ITEM_PRIORITIES, name='itempriority'), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+    )
+    op.create_table(
+        'weekly_reviews',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('weekly_reviews')
+    op.drop_table('items')
+    op.drop_table('contexts')
+    op.drop_table('projects')
+    op.drop_table('family_members')
+    op.drop_table('families')
+    op.drop_index('ix_users_email', table_name='users')
+    op.drop_table('users')
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in ('itempriority', 'itemtype', 'projecthorizon', 'projectstatus', 'familyrole'):
+            op.execute(f'DROP TYPE IF EXISTS {name}')
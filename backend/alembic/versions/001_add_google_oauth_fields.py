@@ -1,7 +1,7 @@
 """Add google_id column and make password_hash nullable
 
 Revision ID: 001_google_oauth
-Revises: None
+Revises: 000_initial_schema
 Create Date: 2026-02-07
 
 """
@@ -12,7 +12,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision: str = '001_google_oauth'
-down_revision: Union[str, None] = None
+down_revision: Union[str, None] = '000_initial_schema'
 branch_labels: Union[str, Sequence[str], None] = None
 depends_on: Union[str, Sequence[str], None] = None
 
@@ -0,0 +1,59 @@
+"""Add composite and partial indexes for item, project and family list queries
+
+Revision ID: 002_list_indexes
+Revises: 001_google_oauth
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '002_list_indexes'
+down_revision: Union[str, None] = '001_google_oauth'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_ITEMS = sa.text('completed_at IS NULL')
+
+
+def upgrade() -> None:
+    op.create_index('ix_items_user_created', 'items', ['user_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_items_user_open_created', 'items', ['user_id', 'created_at', 'id'],
+        sqlite_where=OPEN_ITEMS, postgresql_where=OPEN_ITEMS,
+    )
+    op.create_index(
+        'ix_items_user_type_open', 'items', ['user_id', 'type', 'created_at', 'id'],
+        sqlite_where=OPEN_ITEMS, postgresql_where=OPEN_ITEMS,
+    )
+    op.create_index(
+        'ix_items_user_context_open', 'items', ['user_id', 'context_id', 'created_at', 'id'],
+        sqlite_where=OPEN_ITEMS, postgresql_where=OPEN_ITEMS,
+    )
+    op.create_index(
+        'ix_items_user_priority_open', 'items', ['user_id', 'priority', 'created_at', 'id'],
+        sqlite_where=OPEN_ITEMS, postgresql_where=OPEN_ITEMS,
+    )
+    op.create_index('ix_items_user_project', 'items', ['user_id', 'project_id', 'created_at', 'id'])
+
+    op.create_index('ix_projects_user_created', 'projects', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_projects_family_created', 'projects', ['family_id', 'created_at', 'id'])
+
+    op.create_index('ix_family_members_family_user', 'family_members', ['family_id', 'user_id'])
+    op.create_index('ix_family_members_user_family', 'family_members', ['user_id', 'family_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_family_members_user_family', table_name='family_members')
+    op.drop_index('ix_family_members_family_user', table_name='family_members')
+    op.drop_index('ix_projects_family_created', table_name='projects')
+    op.drop_index('ix_projects_user_created', table_name='projects')
+    op.drop_index('ix_items_user_project', table_name='items')
+    op.drop_index('ix_items_user_priority_open', table_name='items')
+    op.drop_index('ix_items_user_context_open', table_name='items')
+    op.drop_index('ix_items_user_type_open', table_name='items')
+    op.drop_index('ix_items_user_open_created', table_name='items')
+    op.drop_index('ix_items_user_created', table_name='items')
@@ -0,0 +1,52 @@
+"""Add context timestamps, tombstones table and updated_at indexes for delta sync
+
+Revision ID: 003_sync_feed
+Revises: 002_list_indexes
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '003_sync_feed'
+down_revision: Union[str, None] = '002_list_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contexts', sa.Column('created_at', sa.DateTime(), nullable=True))
+    op.add_column('contexts', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    op.execute("UPDATE contexts SET created_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP")
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('entity_type', sa.String(20), nullable=False),
+        sa.Column('entity_id', sa.String(36), nullable=False),
+        sa.Column('user_id', sa.String(36), nullable=False),
+        sa.Column('family_id', sa.String(36), nullable=True),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_tombstones_user_deleted', 'tombstones', ['user_id', 'deleted_at', 'id'])
+    op.create_index('ix_tombstones_family_deleted', 'tombstones', ['family_id', 'deleted_at', 'id'])
+
+    op.create_index('ix_items_user_updated', 'items', ['user_id', 'updated_at', 'id'])
+    op.create_index('ix_projects_user_updated', 'projects', ['user_id', 'updated_at', 'id'])
+    op.create_index('ix_projects_family_updated', 'projects', ['family_id', 'updated_at', 'id'])
+    op.create_index('ix_contexts_user_updated', 'contexts', ['user_id', 'updated_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contexts_user_updated', table_name='contexts')
+    op.drop_index('ix_projects_family_updated', table_name='projects')
+    op.drop_index('ix_projects_user_updated', table_name='projects')
+    op.drop_index('ix_items_user_updated', table_name='items')
+    op.drop_index('ix_tombstones_family_deleted', table_name='tombstones')
+    op.drop_index('ix_tombstones_user_deleted', table_name='tombstones')
+    op.drop_table('tombstones')
+    op.drop_column('contexts', 'updated_at')
+    op.drop_column('contexts', 'created_at')
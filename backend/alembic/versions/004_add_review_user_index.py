@@ -0,0 +1,24 @@
+"""Add (user_id, created_at) index on weekly_reviews for listing and ETag stamps
+
+Revision ID: 004_review_user_index
+Revises: 003_sync_feed
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '004_review_user_index'
+down_revision: Union[str, None] = '003_sync_feed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_weekly_reviews_user_created', 'weekly_reviews', ['user_id', 'created_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_weekly_reviews_user_created', table_name='weekly_reviews')
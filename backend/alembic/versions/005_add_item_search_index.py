@@ -0,0 +1,63 @@
+"""Add full-text search index over item titles and notes
+
+SQLite gets an external-content FTS5 table kept in sync by triggers;
+PostgreSQL gets a generated tsvector column with a GIN index.
+
+Revision ID: 005_item_search
+Revises: 004_review_user_index
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '005_item_search'
+down_revision: Union[str, None] = '004_review_user_index'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE items_fts USING fts5("
+            "title, notes, content='items', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_ai AFTER INSERT ON items BEGIN "
+            "INSERT INTO items_fts(rowid, title, notes) VALUES (new.rowid, new.title, new.notes); END"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_ad AFTER DELETE ON items BEGIN "
+            "INSERT INTO items_fts(items_fts, rowid, title, notes) "
+            "VALUES ('delete', old.rowid, old.title, old.notes); END"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_au AFTER UPDATE OF title, notes ON items BEGIN "
+            "INSERT INTO items_fts(items_fts, rowid, title, notes) "
+            "VALUES ('delete', old.rowid, old.title, old.notes); "
+            "INSERT INTO items_fts(rowid, title, notes) VALUES (new.rowid, new.title, new.notes); END"
+        )
+        op.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE items ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')) STORED"
+        )
+        op.execute("CREATE INDEX ix_items_search_vector ON items USING GIN (search_vector)")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TRIGGER IF EXISTS items_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS items_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS items_fts_ai")
+        op.execute("DROP TABLE IF EXISTS items_fts")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_items_search_vector")
+        op.execute("ALTER TABLE items DROP COLUMN IF EXISTS search_vector")
@@ -0,0 +1,39 @@
+"""Add per-user dashboard counters and the open-items due_date index
+
+Revision ID: 006_user_counters
+Revises: 005_item_search
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006_user_counters'
+down_revision: Union[str, None] = '005_item_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPEN_ITEMS = sa.text('completed_at IS NULL')
+
+
+def upgrade() -> None:
+    # Rows are filled lazily on each user's first dashboard read, or up front
+    # with `python -m app.cli recount`
+    op.create_table(
+        'user_counters',
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('name', sa.String(80), primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False, server_default='0'),
+    )
+    op.create_index(
+        'ix_items_user_due_open', 'items', ['user_id', 'due_date'],
+        sqlite_where=OPEN_ITEMS, postgresql_where=OPEN_ITEMS,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_user_due_open', table_name='items')
+    op.drop_table('user_counters')
@@ -0,0 +1,90 @@
+"""Add items_archive table for completed items moved out of the live table
+
+Revision ID: 007_items_archive
+Revises: 006_user_counters
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '007_items_archive'
+down_revision: Union[str, None] = '006_user_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ITEM_TYPES = ('inbox', 'next_action', 'waiting_for', 'scheduled', 'someday', 'reference')
+ITEM_PRIORITIES = ('p1', 'p2', 'p3', 'p4')
+COMPLETED_ITEMS = sa.text('completed_at IS NOT NULL')
+
+
+def _enum(values, name):
+    # Reuse the PostgreSQL enum types created along with items
+    return sa.Enum(*values, name=name).with_variant(
+        postgresql.ENUM(*values, name=name, create_type=False), 'postgresql'
+    )
+
+
+# Databases that predate the chain got items.priority from an ad-hoc
+# ALTER ... VARCHAR(2) at startup, and possibly no itempriority type at all.
+# The archiver copies rows between the tables and items_with_archive UNIONs
+# them, so both must use the enum.
+CREATE_PRIORITY_TYPE = (
+    "DO $$ BEGIN CREATE TYPE itempriority AS ENUM ('p1', 'p2', 'p3', 'p4'); "
+    "EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+)
+PRIORITY_TO_ENUM = (
+    "DO $$ BEGIN "
+    "IF (SELECT data_type FROM information_schema.columns "
+    "WHERE table_schema = current_schema() AND table_name = 'items' AND column_name = 'priority') "
+    "<> 'USER-DEFINED' THEN "
+    "ALTER TABLE items ALTER COLUMN priority TYPE itempriority USING priority::itempriority; "
+    "END IF; END $$"
+)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(CREATE_PRIORITY_TYPE)
+        op.execute(PRIORITY_TO_ENUM)
+    op.create_table(
+        'items_archive',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('project_id', sa.String(36), sa.ForeignKey('projects.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('title', sa.String(500), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('type', _enum(ITEM_TYPES, 'itemtype'), nullable=False),
+        sa.Column('context_id', sa.String(36), sa.ForeignKey('contexts.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('assigned_to', sa.String(36), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('priority', _enum(ITEM_PRIORITIES, 'itempriority'), nullable=True),
+        sa.Column('due_date', sa.DateTime(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_items_archive_user_created', 'items_archive', ['user_id', 'created_at', 'id'])
+    op.create_index('ix_items_archive_user_project', 'items_archive', ['user_id', 'project_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_items_completed', 'items', ['completed_at'],
+        sqlite_where=COMPLETED_ITEMS, postgresql_where=COMPLETED_ITEMS,
+    )
+
+
+def downgrade() -> None:
+    # Put archived rows back before dropping the table
+    op.execute(
+        "INSERT INTO items (id, user_id, project_id, title, notes, type, context_id, assigned_to, "
+        "priority, due_date, completed_at, created_at, updated_at) "
+        "SELECT id, user_id, project_id, title, notes, type, context_id, assigned_to, "
+        "priority, due_date, completed_at, created_at, updated_at FROM items_archive"
+    )
+    op.drop_index('ix_items_completed', table_name='items')
+    op.drop_index('ix_items_archive_user_project', table_name='items_archive')
+    op.drop_index('ix_items_archive_user_created', table_name='items_archive')
+    op.drop_table('items_archive')
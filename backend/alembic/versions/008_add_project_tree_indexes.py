@@ -0,0 +1,28 @@
+"""Add indexes for the project tree: parent links and per-project item counts
+
+Revision ID: 008_project_tree
+Revises: 007_items_archive
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '008_project_tree'
+down_revision: Union[str, None] = '007_items_archive'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_projects_parent', 'projects', ['parent_id'])
+    op.create_index('ix_items_project_completed', 'items', ['project_id', 'completed_at'])
+    op.create_index('ix_items_archive_project', 'items_archive', ['project_id', 'completed_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_items_archive_project', table_name='items_archive')
+    op.drop_index('ix_items_project_completed', table_name='items')
+    op.drop_index('ix_projects_parent', table_name='projects')
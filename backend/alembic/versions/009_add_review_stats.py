@@ -0,0 +1,25 @@
+"""Add a stats snapshot column to weekly_reviews
+
+Revision ID: 009_review_stats
+Revises: 008_project_tree
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '009_review_stats'
+down_revision: Union[str, None] = '008_project_tree'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('weekly_reviews', sa.Column('stats', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('weekly_reviews', 'stats')
@@ -0,0 +1,34 @@
+"""Add weekly analytics rollups
+
+Revision ID: 010_weekly_rollups
+Revises: 009_review_stats
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '010_weekly_rollups'
+down_revision: Union[str, None] = '009_review_stats'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing history is loaded with `python -m app.cli backfill`; time in the
+    # inbox is only recorded from here on
+    op.create_table(
+        'weekly_rollups',
+        sa.Column('user_id', sa.String(36), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('week', sa.Date(), primary_key=True),
+        sa.Column('dimension', sa.String(80), primary_key=True),
+        sa.Column('metric', sa.String(40), primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False, server_default='0'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('weekly_rollups')
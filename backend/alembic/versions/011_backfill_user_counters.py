@@ -0,0 +1,50 @@
+"""Backfill dashboard counters for users who have none yet
+
+Revision ID: 011_counter_backfill
+Revises: 010_weekly_rollups
+Create Date: 2026-10-17
+
+New users get their counters at registration; this fills them in for
+everyone who predates that, so the dashboard read never writes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '011_counter_backfill'
+down_revision: Union[str, None] = '010_weekly_rollups'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+UNINITIALIZED = "NOT IN (SELECT user_id FROM user_counters WHERE name = '_initialized')"
+
+
+def upgrade() -> None:
+    # Increments written before a user was counted are partial; start over
+    op.execute(f"DELETE FROM user_counters WHERE user_id {UNINITIALIZED}")
+    op.execute(
+        "INSERT INTO user_counters (user_id, name, value) "
+        "SELECT user_id, CAST(type AS VARCHAR(80)), COUNT(*) FROM items "
+        f"WHERE completed_at IS NULL AND user_id {UNINITIALIZED} GROUP BY user_id, type"
+    )
+    op.execute(
+        "INSERT INTO user_counters (user_id, name, value) "
+        "SELECT user_id, 'next_action:context:' || COALESCE(context_id, 'none'), COUNT(*) FROM items "
+        f"WHERE completed_at IS NULL AND type = 'next_action' AND user_id {UNINITIALIZED} "
+        "GROUP BY user_id, context_id"
+    )
+    op.execute(
+        "INSERT INTO user_counters (user_id, name, value) "
+        "SELECT user_id, 'active_projects', COUNT(*) FROM projects "
+        f"WHERE status = 'active' AND user_id {UNINITIALIZED} GROUP BY user_id"
+    )
+    op.execute(
+        "INSERT INTO user_counters (user_id, name, value) "
+        f"SELECT id, '_initialized', 1 FROM users WHERE id {UNINITIALIZED}"
+    )
+
+
+def downgrade() -> None:
+    # The counters stay valid under the previous revision
+    pass
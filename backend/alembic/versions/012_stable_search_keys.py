@@ -0,0 +1,110 @@
+"""Key the search index on stable per-item keys and scope it by user
+
+SQLite: the external-content FTS5 table was keyed on items' implicit rowid,
+which VACUUM may renumber. It is replaced by an FTS5 table holding its own
+text under an INTEGER PRIMARY KEY from items_search_keys, with the owner's id
+as an indexed column so matches are narrowed to one user inside MATCH.
+PostgreSQL: the GIN index becomes (user_id, search_vector) through btree_gin,
+where the extension can be installed; otherwise the old index stays.
+
+Revision ID: 012_search_keys
+Revises: 011_counter_backfill
+Create Date: 2026-10-17
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '012_search_keys'
+down_revision: Union[str, None] = '011_counter_backfill'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY = "(SELECT key FROM items_search_keys WHERE item_id = {}.id)"
+OWNER = "replace({}.user_id, '-', '')"
+
+
+def _drop_sqlite_index() -> None:
+    op.execute("DROP TRIGGER IF EXISTS items_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS items_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS items_fts_ai")
+    op.execute("DROP TABLE IF EXISTS items_fts")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _drop_sqlite_index()
+        op.execute(
+            "CREATE TABLE items_search_keys (key INTEGER PRIMARY KEY, item_id VARCHAR(36) NOT NULL UNIQUE)"
+        )
+        op.execute(
+            "CREATE VIRTUAL TABLE items_fts USING fts5("
+            "owner, title, notes, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_ai AFTER INSERT ON items BEGIN "
+            "INSERT OR IGNORE INTO items_search_keys(item_id) VALUES (new.id); "
+            "INSERT INTO items_fts(rowid, owner, title, notes) "
+            f"VALUES ({KEY.format('new')}, {OWNER.format('new')}, new.title, new.notes); END"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_ad AFTER DELETE ON items BEGIN "
+            f"DELETE FROM items_fts WHERE rowid = {KEY.format('old')}; "
+            "DELETE FROM items_search_keys WHERE item_id = old.id; END"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_au AFTER UPDATE OF user_id, title, notes ON items BEGIN "
+            f"UPDATE items_fts SET owner = {OWNER.format('new')}, title = new.title, notes = new.notes "
+            f"WHERE rowid = {KEY.format('new')}; END"
+        )
+        op.execute("INSERT INTO items_search_keys (item_id) SELECT id FROM items")
+        op.execute(
+            "INSERT INTO items_fts (rowid, owner, title, notes) "
+            f"SELECT items_search_keys.key, {OWNER.format('items')}, items.title, items.notes "
+            "FROM items JOIN items_search_keys ON items_search_keys.item_id = items.id"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "DO $$ BEGIN CREATE EXTENSION IF NOT EXISTS btree_gin; "
+            "EXCEPTION WHEN OTHERS THEN RAISE NOTICE 'btree_gin is not available; keeping ix_items_search_vector'; "
+            "END $$"
+        )
+        op.execute(
+            "DO $$ BEGIN IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'btree_gin') THEN "
+            "CREATE INDEX ix_items_user_search ON items USING GIN (user_id, search_vector); "
+            "DROP INDEX ix_items_search_vector; "
+            "END IF; END $$"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        _drop_sqlite_index()
+        op.execute("DROP TABLE IF EXISTS items_search_keys")
+        op.execute(
+            "CREATE VIRTUAL TABLE items_fts USING fts5("
+            "title, notes, content='items', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_ai AFTER INSERT ON items BEGIN "
+            "INSERT INTO items_fts(rowid, title, notes) VALUES (new.rowid, new.title, new.notes); END"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_ad AFTER DELETE ON items BEGIN "
+            "INSERT INTO items_fts(items_fts, rowid, title, notes) "
+            "VALUES ('delete', old.rowid, old.title, old.notes); END"
+        )
+        op.execute(
+            "CREATE TRIGGER items_fts_au AFTER UPDATE OF title, notes ON items BEGIN "
+            "INSERT INTO items_fts(items_fts, rowid, title, notes) "
+            "VALUES ('delete', old.rowid, old.title, old.notes); "
+            "INSERT INTO items_fts(rowid, title, notes) VALUES (new.rowid, new.title, new.notes); END"
+        )
+        op.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute("CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING GIN (search_vector)")
+        op.execute("DROP INDEX IF EXISTS ix_items_user_search")
@@ -0,0 +1,91 @@
+"""Maintenance commands: python -m app.cli <command> [options]"""
+import argparse
+import sys
+from datetime import timedelta
+from .config import get_settings
+from .database import SessionLocal, engine
+from .migrations import migrate as migrate_schema
+from .services.analytics import rebuild_all_rollups
+from .services.archive import ARCHIVE_BATCH_SIZE, archive_completed_items
+from .services.counters import recompute_all_counters
+from .services.search import rebuild_search_index
+
+
+def migrate(args):
+    """Create or upgrade the database schema to the latest migration"""
+    before, after = migrate_schema()
+    if before == after:
+        print(f"Database already at {after}")
+    else:
+        print(f"Migrated database from {before or 'no version'} to {after}")
+
+
+def recount(args):
+    """Rebuild dashboard counters from the items and projects tables"""
+    db = SessionLocal()
+    try:
+        count = recompute_all_counters(db, args.user or None)
+    finally:
+        db.close()
+    print(f"Recounted {count} user(s)")
+
+
+def backfill(args):
+    """Rebuild weekly analytics rollups from the items and items_archive tables"""
+    db = SessionLocal()
+    try:
+        count = rebuild_all_rollups(db, args.user or None)
+    finally:
+        db.close()
+    print(f"Backfilled rollups for {count} user(s)")
+
+
+def archive(args):
+    """Move old completed items into items_archive"""
+    db = SessionLocal()
+    try:
+        moved = archive_completed_items(db, timedelta(days=args.days), batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"Archived {moved} item(s)")
+
+
+def reindex(args):
+    """Rebuild the item search index from the items table"""
+    with engine.begin() as conn:
+        rebuild_search_index(conn)
+    print("Rebuilt search index")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="GTD Family maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help=migrate.__doc__)
+    migrate_parser.set_defaults(func=migrate)
+
+    recount_parser = commands.add_parser("recount", help=recount.__doc__)
+    recount_parser.add_argument("--user", action="append", metavar="USER_ID", help="only this user (repeatable)")
+    recount_parser.set_defaults(func=recount)
+
+    backfill_parser = commands.add_parser("backfill", help=backfill.__doc__)
+    backfill_parser.add_argument("--user", action="append", metavar="USER_ID", help="only this user (repeatable)")
+    backfill_parser.set_defaults(func=backfill)
+
+    archive_parser = commands.add_parser("archive", help=archive.__doc__)
+    archive_parser.add_argument(
+        "--days", type=int, default=get_settings().archive_after_days,
+        help="archive items completed more than this many days ago"
+    )
+    archive_parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    archive_parser.set_defaults(func=archive)
+
+    reindex_parser = commands.add_parser("reindex", help=reindex.__doc__)
+    reindex_parser.set_defaults(func=reindex)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
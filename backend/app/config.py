@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Optional
 
 
 class Settings(BaseSettings):
@@ -8,6 +9,25 @@ class Settings(BaseSettings):
 
     # Database (SQLite for local dev, PostgreSQL for production)
     database_url: str = "sqlite:///./gtd_family.db"
+    # Comma-separated read replicas for GET requests; empty = everything on database_url
+    database_replica_urls: str = ""
+    # After a client writes, its reads stay on the primary this long to cover replication lag
+    replica_stickiness_seconds: float = 5.0
+
+    # Connection pool, per engine (see database.py)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_pool_recycle: int = 1800  # Reconnect after this many seconds, before server/proxy idle limits
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: int = 0  # PostgreSQL statement_timeout; 0 = no limit
+
+    # SQLite pragmas applied to every connection
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"  # Safe with WAL; only the last commits can be lost on power failure
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size: int = 268435456
 
     # JWT
     secret_key: str = "your-secret-key-change-in-production"
@@ -15,9 +35,41 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
 
+    # Password hashing: new hashes use this scheme/cost, older ones are upgraded on login
+    password_scheme: str = "sha256_crypt"
+    password_rounds: Optional[int] = None  # None keeps passlib's default for the scheme
+    # Concurrent hashes (0 = inline on the event loop), their pool, and how long a login may queue
+    password_hash_workers: int = 2
+    password_hash_pool: str = "process"  # "process" or "thread"
+    password_hash_queue_timeout: float = 10.0
+
+    # In-process cache of verified access tokens (see utils/token_cache.py)
+    auth_cache_enabled: bool = True
+    auth_cache_size: int = 10000
+    auth_cache_ttl_seconds: int = 60
+
+    # In-process cache of each user's family roles (see services/access.py); 0 TTL disables it
+    access_cache_size: int = 10000
+    access_cache_ttl_seconds: int = 30
+
+    # Change events pushed to /events subscribers (see services/events.py)
+    event_broker: str = "local"  # "local" (single worker) or "postgres" (LISTEN/NOTIFY across workers)
+    event_buffer_size: int = 100  # Unsent events per connection before it is told to resync
+    event_heartbeat_seconds: float = 15.0
+
+    # Cached weekly-review reports, dropped on change events for the user or their families
+    review_cache_ttl_seconds: int = 300  # 0 disables the cache
+    review_snapshot_ttl_seconds: int = 60
+    review_snapshot_concurrency: int = 3  # Snapshot queries (and pooled connections) in flight per request
+
     # Google OAuth
     google_client_id: str = ""
 
+    # Completed items move to items_archive after this many days
+    archive_after_days: int = 30
+    # How often the in-process archiver runs; 0 disables it (use `python -m app.cli archive`)
+    archive_interval_minutes: int = 60
+
     class Config:
         env_file = ".env"
 
@@ -1,21 +1,230 @@
-from sqlalchemy import create_engine
+import hashlib
+import random
+import threading
+import time
+from typing import Dict
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.requests import HTTPConnection
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import get_settings
 
 settings = get_settings()
 
-# SQLite needs check_same_thread=False for FastAPI
-connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
-engine = create_engine(settings.database_url, connect_args=connect_args)
+# Async drivers used for request handling, keyed by backend
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_database_url(url: str):
+    """The same database as `url`, reached through its asyncio driver"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+class PoolStats:
+    """Checkout counters for one pool, read by the /metrics endpoint"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self, pool) -> dict:
+        with self._lock:
+            return {
+                "size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "idle": pool.checkedin(),
+                "overflow": pool.overflow(),
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "wait_ms_max": round(self.wait_max * 1000, 3),
+            }
+
+
+def _metered(pool_class, stats: PoolStats):
+    """A pool class that times every checkout (queueing, connecting and pre-ping)"""
+
+    class MeteredPool(pool_class):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record(time.perf_counter() - start)
+            return connection
+
+    MeteredPool.__name__ = f"Metered{pool_class.__name__}"
+    return MeteredPool
+
+
+# engine name -> checkout stats, for monitoring
+pool_stats = {}
+# engine name -> engine whose pool the stats describe
+metered_engines: Dict[str, Engine] = {}
+
+
+def engine_options(url: str, is_async: bool, name: str) -> dict:
+    """Pool and driver settings from config.Settings for an engine on `url`"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    options = {}
+    connect_args = {}
+
+    if backend == "sqlite":
+        if not is_async:
+            # SQLite needs check_same_thread=False for FastAPI
+            connect_args["check_same_thread"] = False
+        if url.database in (None, "", ":memory:"):
+            # In-memory databases live in a single connection; keep SQLAlchemy's pool
+            return {"connect_args": connect_args}
+    elif backend == "postgresql" and settings.db_statement_timeout_ms:
+        if is_async:
+            connect_args["server_settings"] = {"statement_timeout": str(settings.db_statement_timeout_ms)}
+        else:
+            connect_args["options"] = f"-c statement_timeout={settings.db_statement_timeout_ms}"
+
+    stats = PoolStats()
+    pool_stats[name] = stats
+    options.update(
+        poolclass=_metered(AsyncAdaptedQueuePool if is_async else QueuePool, stats),
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        connect_args=connect_args,
+    )
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning: WAL lets readers run alongside the writer,
+    and busy_timeout makes writers wait for the lock instead of failing"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.sqlite_journal_mode}")
+    cursor.execute(f"PRAGMA synchronous={settings.sqlite_synchronous}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kb)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def tune_engine(engine: Engine):
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", apply_sqlite_pragmas)
+
+
+# Synchronous engine for startup, the CLI, background jobs and the export/import
+# streams, which run in worker threads rather than on the event loop.
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, False, "sync"))
+tune_engine(engine)
+metered_engines["sync"] = engine
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine for request handlers. Objects stay loaded after commit, since
+# response serialization happens outside the session and can't lazy-load.
+async_engine = create_async_engine(
+    async_database_url(settings.database_url), **engine_options(settings.database_url, True, "async")
+)
+tune_engine(async_engine.sync_engine)
+metered_engines["async"] = async_engine.sync_engine
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ReplicaSession(Session):
+    """Session on a read replica; ORM writes are refused before they reach the database"""
+
+    def flush(self, objects=None):
+        if self.new or self.dirty or self.deleted:
+            raise RuntimeError("Attempted to write through a read-replica session")
+        super().flush(objects)
+
+
+replica_sessions = []
+for index, replica_url in enumerate(u.strip() for u in settings.database_replica_urls.split(",") if u.strip()):
+    name = f"replica{index}"
+    replica_engine = create_async_engine(async_database_url(replica_url), **engine_options(replica_url, True, name))
+    tune_engine(replica_engine.sync_engine)
+    metered_engines[name] = replica_engine.sync_engine
+    replica_sessions.append(async_sessionmaker(
+        replica_engine, autoflush=False, expire_on_commit=False,
+        sync_session_class=ReplicaSession, info={"replica": name},
+    ))
+
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+def get_pool_metrics() -> dict:
+    return {name: stats.snapshot(metered_engines[name].pool) for name, stats in pool_stats.items()}
+
+
+# Read-your-writes: client key -> monotonic time of its last write
+READ_METHODS = ("GET", "HEAD")
+_recent_writes: Dict[str, float] = {}
+_MAX_TRACKED_WRITERS = 10000
+
+
+def _client_key(connection: HTTPConnection):
+    authorization = connection.headers.get("authorization")
+    return hashlib.sha256(authorization.encode()).hexdigest() if authorization else None
+
+
+def _mark_write(key: str):
+    now = time.monotonic()
+    if len(_recent_writes) >= _MAX_TRACKED_WRITERS:
+        cutoff = now - settings.replica_stickiness_seconds
+        for stale in [k for k, at in _recent_writes.items() if at < cutoff]:
+            del _recent_writes[stale]
+    _recent_writes[key] = now
+
+
+def _wrote_recently(key: str) -> bool:
+    at = _recent_writes.get(key)
+    return at is not None and time.monotonic() - at < settings.replica_stickiness_seconds
+
+
+async def get_db(connection: HTTPConnection):
+    """Session for a request: a replica for reads when replicas are configured,
+    the primary for writes and for a client's reads shortly after its writes"""
+    is_read = connection.scope.get("method") in READ_METHODS
+    key = _client_key(connection)
+    if not is_read and key:
+        _mark_write(key)
+
+    session_factory = AsyncSessionLocal
+    if replica_sessions and is_read and not (key and _wrote_recently(key)):
+        session_factory = random.choice(replica_sessions)
+    async with session_factory() as db:
+        yield db
+
+    if not is_read and key:
+        # Restart the window from when the write finished
+        _mark_write(key)
+
+
+async def get_primary_db():
+    """Session on the primary regardless of method, for reads that must not lag"""
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,9 +1,15 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy import inspect, text
 from .config import get_settings
-from .database import engine, Base
-from .routers import auth, items, projects, contexts, families, reviews
+from .database import async_engine, get_pool_metrics
+from .services.access import role_cache
+from .services.archive import run_archiver
+from .services.events import broker
+from .services.reviews import review_cache, snapshot_cache
+from .utils.auth import token_cache
+from .utils.passwords import password_hasher
+from .routers import auth, items, projects, contexts, families, reviews, sync, export, imports, dashboard, events, analytics
 
 settings = get_settings()
 
@@ -29,30 +35,32 @@ app.include_router(projects.router, prefix="/projects", tags=["Projects"])
 app.include_router(contexts.router, prefix="/contexts", tags=["Contexts"])
 app.include_router(families.router, prefix="/families", tags=["Families"])
 app.include_router(reviews.router, prefix="/reviews", tags=["Weekly Reviews"])
+app.include_router(sync.router, prefix="/sync", tags=["Sync"])
+app.include_router(export.router, prefix="/export", tags=["Export"])
+app.include_router(imports.router, prefix="/import", tags=["Import"])
+app.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(events.router, prefix="/events", tags=["Events"])
+app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 
 
 @app.on_event("startup")
 async def startup():
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+    # The schema is managed by `python -m app.cli migrate`, run once per deploy
+    await broker.start()
 
-    # Add columns that create_all won't add to existing tables
-    inspector = inspect(engine)
-    columns = [col["name"] for col in inspector.get_columns("users")]
-    with engine.begin() as conn:
-        if "google_id" not in columns:
-            conn.execute(text("ALTER TABLE users ADD COLUMN google_id VARCHAR(255) UNIQUE"))
-            conn.execute(text("CREATE INDEX ix_users_google_id ON users (google_id)"))
-        if inspector.get_columns("users"):
-            for col in inspector.get_columns("users"):
-                if col["name"] == "password_hash" and not col["nullable"]:
-                    conn.execute(text("ALTER TABLE users ALTER COLUMN password_hash DROP NOT NULL"))
+    # Periodically move old completed items out of the live items table
+    if settings.archive_interval_minutes > 0:
+        app.state.archiver = asyncio.create_task(run_archiver(settings.archive_interval_minutes))
 
-    # Add priority column to items table
-    item_columns = [col["name"] for col in inspector.get_columns("items")]
-    with engine.begin() as conn:
-        if "priority" not in item_columns:
-            conn.execute(text("ALTER TABLE items ADD COLUMN priority VARCHAR(2)"))
+
+@app.on_event("shutdown")
+async def shutdown():
+    archiver = getattr(app.state, "archiver", None)
+    if archiver:
+        archiver.cancel()
+    password_hasher.shutdown()
+    await broker.stop()
+    await async_engine.dispose()
 
 
 @app.get("/")
@@ -63,3 +71,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "auth_cache": token_cache.stats() if token_cache is not None else {"enabled": False},
+        "access_cache": role_cache.stats() if role_cache is not None else {"enabled": False},
+        "review_cache": review_cache.stats() if review_cache is not None else {"enabled": False},
+        "review_snapshot_cache": snapshot_cache.stats() if snapshot_cache is not None else {"enabled": False},
+        "password_hashing": password_hasher.stats(),
+        "db_pool": get_pool_metrics(),
+        "events": broker.stats(),
+    }
@@ -0,0 +1,114 @@
+"""Schema management through the Alembic chain in alembic/versions.
+
+The app never changes the schema itself; run `python -m app.cli migrate`
+once per deploy, before the new version starts serving.
+"""
+import os
+from typing import Optional, Tuple
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from . import models  # noqa: F401 - registers every table on Base.metadata
+from .database import Base, engine
+from .services.analytics import rebuild_all_rollups
+from .services.counters import recompute_all_counters
+from .services.search import ensure_search_index
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def alembic_config(connection: Optional[Connection] = None) -> Config:
+    """Config for alembic/ that runs on `connection` (see alembic/env.py)"""
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    config.attributes["connection"] = connection
+    return config
+
+
+def current_revision(conn: Connection) -> Optional[str]:
+    return MigrationContext.configure(conn).get_current_revision()
+
+
+def _adopt_legacy_schema(conn: Connection):
+    """Bring a database the app used to create at startup up to the models.
+
+    Such databases have no alembic_version, and create_all never added
+    columns or indexes to tables that already existed, so this replays the
+    column changes startup used to make and creates whatever is missing.
+    """
+    inspector = inspect(conn)
+    user_columns = {col["name"]: col for col in inspector.get_columns("users")}
+    if "google_id" not in user_columns:
+        # Uniqueness comes from ix_users_google_id, created with the other indexes below
+        conn.execute(text("ALTER TABLE users ADD COLUMN google_id VARCHAR(255)"))
+    password_hash = user_columns.get("password_hash")
+    if password_hash and not password_hash["nullable"] and conn.dialect.name == "postgresql":
+        conn.execute(text("ALTER TABLE users ALTER COLUMN password_hash DROP NOT NULL"))
+
+    if "priority" not in {col["name"] for col in inspector.get_columns("items")}:
+        conn.execute(text("ALTER TABLE items ADD COLUMN priority VARCHAR(2)"))
+    if conn.dialect.name == "postgresql":
+        # Startup added priority as VARCHAR(2); items_archive (and the archiver's
+        # INSERT ... SELECT and UNION) use the itempriority enum
+        conn.execute(text(
+            "DO $$ BEGIN CREATE TYPE itempriority AS ENUM ('p1', 'p2', 'p3', 'p4'); "
+            "EXCEPTION WHEN duplicate_object THEN NULL; END $$"
+        ))
+        conn.execute(text(
+            "DO $$ BEGIN "
+            "IF (SELECT data_type FROM information_schema.columns "
+            "WHERE table_schema = current_schema() AND table_name = 'items' AND column_name = 'priority') "
+            "<> 'USER-DEFINED' THEN "
+            "ALTER TABLE items ALTER COLUMN priority TYPE itempriority USING priority::itempriority; "
+            "END IF; END $$"
+        ))
+
+    context_columns = {col["name"] for col in inspector.get_columns("contexts")}
+    for column in ("created_at", "updated_at"):
+        if column not in context_columns:
+            conn.execute(text(f"ALTER TABLE contexts ADD COLUMN {column} TIMESTAMP"))
+            conn.execute(text(f"UPDATE contexts SET {column} = CURRENT_TIMESTAMP"))
+
+    if "stats" not in {col["name"] for col in inspector.get_columns("weekly_reviews")}:
+        conn.execute(text("ALTER TABLE weekly_reviews ADD COLUMN stats JSON"))
+
+    Base.metadata.create_all(conn)
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+    ensure_search_index(conn)
+
+
+def _backfill(conn: Connection):
+    """Derive the tables the data migrations fill (dashboard counters and
+    weekly rollups), for a database that is stamped rather than upgraded"""
+    # The session joins the migration's transaction; its commits don't end it
+    with Session(bind=conn) as db:
+        recompute_all_counters(db)
+        rebuild_all_rollups(db)
+
+
+def migrate() -> Tuple[Optional[str], Optional[str]]:
+    """Upgrade the database to the head revision; returns (before, after).
+
+    An empty database is created from the models and stamped, which is
+    faster than replaying the chain and gives the same schema. A database
+    created by older releases at startup is adopted and stamped. Stamping
+    skips the data migrations, so their derived tables are rebuilt first.
+    """
+    with engine.begin() as conn:
+        before = current_revision(conn)
+        config = alembic_config(conn)
+        if before is not None:
+            command.upgrade(config, "head")
+        else:
+            if "users" in inspect(conn).get_table_names():
+                _adopt_legacy_schema(conn)
+            else:
+                Base.metadata.create_all(conn)
+            _backfill(conn)
+            command.stamp(config, "head")
+        return before, current_revision(conn)
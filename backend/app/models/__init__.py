@@ -4,6 +4,10 @@ from .project import Project
 from .item import Item
 from .context import Context
 from .review import WeeklyReview
+from .tombstone import Tombstone
+from .counter import UserCounter
+from .archive import ArchivedItem
+from .analytics import WeeklyRollup
 
 __all__ = [
     "User",
@@ -13,4 +17,8 @@ __all__ = [
     "Item",
     "Context",
     "WeeklyReview",
+    "Tombstone",
+    "UserCounter",
+    "ArchivedItem",
+    "WeeklyRollup",
 ]
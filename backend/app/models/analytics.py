@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Date, String, Integer, ForeignKey
+from ..database import Base
+
+
+class WeeklyRollup(Base):
+    """Per-user weekly analytics total, maintained incrementally (see services/analytics.py).
+
+    `week` is the Monday of the ISO week. `dimension` is "all",
+    "context:<id>" or "project:<id>"; `metric` is "captured", "completed" or
+    an "inbox_time:<bucket>" histogram bucket.
+    """
+    __tablename__ = "weekly_rollups"
+
+    user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    week = Column(Date, primary_key=True)
+    dimension = Column(String(80), primary_key=True)
+    metric = Column(String(40), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,34 @@
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, Index
+from ..database import Base
+from .item import ItemType, ItemPriority
+
+
+class ArchivedItem(Base):
+    """Completed item moved out of the live items table (see services/archive.py).
+
+    Columns mirror Item so rows can be copied across with INSERT ... SELECT;
+    archived_at records when the move happened.
+    """
+    __tablename__ = "items_archive"
+
+    id = Column(String(36), primary_key=True)
+    user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
+    project_id = Column(String(36), ForeignKey("projects.id", ondelete="SET NULL"), nullable=True)
+    title = Column(String(500), nullable=False)
+    notes = Column(Text, nullable=True)
+    type = Column(Enum(ItemType), nullable=False)
+    context_id = Column(String(36), ForeignKey("contexts.id", ondelete="SET NULL"), nullable=True)
+    assigned_to = Column(String(36), ForeignKey("users.id"), nullable=True)
+    priority = Column(Enum(ItemPriority), nullable=True)
+    due_date = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_items_archive_user_created", "user_id", "created_at", "id"),
+        Index("ix_items_archive_user_project", "user_id", "project_id", "created_at", "id"),
+        Index("ix_items_archive_project", "project_id", "completed_at"),
+    )
@@ -1,5 +1,6 @@
 import uuid
-from sqlalchemy import Column, String, ForeignKey
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -15,7 +16,13 @@ class Context(Base):
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     name = Column(String(100), nullable=False)
     color = Column(String(7), default="#6366f1")  # Hex color
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="contexts")
     items = relationship("Item", back_populates="context")
+
+    __table_args__ = (
+        Index("ix_contexts_user_updated", "user_id", "updated_at", "id"),
+    )
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, String, Integer, ForeignKey
+from ..database import Base
+
+
+class UserCounter(Base):
+    """Per-user dashboard counter, maintained incrementally (see services/counters.py)"""
+    __tablename__ = "user_counters"
+
+    user_id = Column(String(36), ForeignKey("users.id"), primary_key=True)
+    name = Column(String(80), primary_key=True)
+    value = Column(Integer, nullable=False, default=0)
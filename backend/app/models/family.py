@@ -1,7 +1,7 @@
 import uuid
 import secrets
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 import enum
@@ -45,3 +45,8 @@ class FamilyMember(Base):
     # Relationships
     family = relationship("Family", back_populates="members")
     user = relationship("User", back_populates="family_memberships")
+
+    __table_args__ = (
+        Index("ix_family_members_family_user", "family_id", "user_id"),
+        Index("ix_family_members_user_family", "user_id", "family_id"),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from ..database import Base
 import enum
@@ -48,3 +48,87 @@ class Item(Base):
     project = relationship("Project", back_populates="items")
     context = relationship("Context", back_populates="items")
     assignee = relationship("User", foreign_keys=[assigned_to])
+
+    # List views only ever show open items, so the hot paths are partial indexes
+    # over completed_at IS NULL, each ending in (created_at, id) for keyset paging
+    __table_args__ = (
+        Index("ix_items_user_created", "user_id", "created_at", "id"),
+        Index(
+            "ix_items_user_open_created", "user_id", "created_at", "id",
+            sqlite_where=completed_at.is_(None), postgresql_where=completed_at.is_(None),
+        ),
+        Index(
+            "ix_items_user_type_open", "user_id", "type", "created_at", "id",
+            sqlite_where=completed_at.is_(None), postgresql_where=completed_at.is_(None),
+        ),
+        Index(
+            "ix_items_user_context_open", "user_id", "context_id", "created_at", "id",
+            sqlite_where=completed_at.is_(None), postgresql_where=completed_at.is_(None),
+        ),
+        Index(
+            "ix_items_user_priority_open", "user_id", "priority", "created_at", "id",
+            sqlite_where=completed_at.is_(None), postgresql_where=completed_at.is_(None),
+        ),
+        Index("ix_items_user_project", "user_id", "project_id", "created_at", "id"),
+        Index("ix_items_user_updated", "user_id", "updated_at", "id"),
+        Index(
+            "ix_items_user_due_open", "user_id", "due_date",
+            sqlite_where=completed_at.is_(None), postgresql_where=completed_at.is_(None),
+        ),
+        # Finds rows for the archiver; completed rows only stay here until archived
+        Index(
+            "ix_items_completed", "completed_at",
+            sqlite_where=completed_at.isnot(None), postgresql_where=completed_at.isnot(None),
+        ),
+        # Per-project totals across all members' items, for /projects/tree
+        Index("ix_items_project_completed", "project_id", "completed_at"),
+    )
+
+
+# Full-text search over title and notes (see services/search.py). The index is
+# kept in sync by the database itself, so every write path - ORM, bulk Core
+# statements, raw SQL - is covered without application hooks.
+#
+# SQLite: items has a String primary key, so its implicit rowid is not stable
+# (VACUUM may renumber it). items_search_keys gives each item an INTEGER
+# PRIMARY KEY that VACUUM keeps, and the FTS table stores its own copy of the
+# text under that key. `owner` holds the user id as a single token so a search
+# is narrowed to one user inside MATCH instead of after it.
+SEARCH_OWNER = "replace({}.user_id, '-', '')"
+SEARCH_KEY = "(SELECT key FROM items_search_keys WHERE item_id = {}.id)"
+SQLITE_SEARCH_DDL = [
+    "CREATE TABLE IF NOT EXISTS items_search_keys (key INTEGER PRIMARY KEY, item_id VARCHAR(36) NOT NULL UNIQUE)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5("
+    "owner, title, notes, tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+    "INSERT OR IGNORE INTO items_search_keys(item_id) VALUES (new.id); "
+    "INSERT INTO items_fts(rowid, owner, title, notes) "
+    f"VALUES ({SEARCH_KEY.format('new')}, {SEARCH_OWNER.format('new')}, new.title, new.notes); END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+    f"DELETE FROM items_fts WHERE rowid = {SEARCH_KEY.format('old')}; "
+    "DELETE FROM items_search_keys WHERE item_id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE OF user_id, title, notes ON items BEGIN "
+    f"UPDATE items_fts SET owner = {SEARCH_OWNER.format('new')}, title = new.title, notes = new.notes "
+    f"WHERE rowid = {SEARCH_KEY.format('new')}; END",
+]
+# PostgreSQL: a generated tsvector column. The GIN index leads with user_id
+# (btree_gin) so one user's matches are found without touching other users';
+# servers without the extension keep a GIN index on search_vector alone.
+POSTGRES_SEARCH_DDL = [
+    "ALTER TABLE items ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')) STORED",
+    "DO $$ BEGIN CREATE EXTENSION IF NOT EXISTS btree_gin; "
+    "EXCEPTION WHEN OTHERS THEN RAISE NOTICE 'btree_gin is not available; search is not indexed by user'; END $$",
+    "DO $$ BEGIN "
+    "IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'btree_gin') THEN "
+    "CREATE INDEX IF NOT EXISTS ix_items_user_search ON items USING GIN (user_id, search_vector); "
+    "DROP INDEX IF EXISTS ix_items_search_vector; "
+    "ELSE CREATE INDEX IF NOT EXISTS ix_items_search_vector ON items USING GIN (search_vector); "
+    "END IF; END $$",
+]
+
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Item.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Item.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
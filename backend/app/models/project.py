@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 import enum
@@ -43,3 +43,12 @@ class Project(Base):
     family = relationship("Family", back_populates="projects")
     parent = relationship("Project", remote_side=[id], backref="children")
     items = relationship("Item", back_populates="project")
+
+    __table_args__ = (
+        Index("ix_projects_user_created", "user_id", "created_at", "id"),
+        Index("ix_projects_family_created", "family_id", "created_at", "id"),
+        Index("ix_projects_user_updated", "user_id", "updated_at", "id"),
+        Index("ix_projects_family_updated", "family_id", "updated_at", "id"),
+        # Walking down the horizons tree in /projects/tree
+        Index("ix_projects_parent", "parent_id"),
+    )
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, DateTime, ForeignKey, Text, String
+from sqlalchemy import Column, DateTime, ForeignKey, Text, String, Index, JSON
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -16,7 +16,13 @@ class WeeklyReview(Base):
     user_id = Column(String(36), ForeignKey("users.id"), nullable=False)
     completed_at = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
+    # Counts from GET /reviews/snapshot at the time of the review
+    stats = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
     user = relationship("User", back_populates="weekly_reviews")
+
+    __table_args__ = (
+        Index("ix_weekly_reviews_user_created", "user_id", "created_at"),
+    )
@@ -0,0 +1,25 @@
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Index
+from ..database import Base
+
+
+def generate_uuid():
+    return str(uuid.uuid4())
+
+
+class Tombstone(Base):
+    """Record of a hard-deleted row, so sync clients can learn about deletes"""
+    __tablename__ = "tombstones"
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    entity_type = Column(String(20), nullable=False)  # "item", "project" or "context"
+    entity_id = Column(String(36), nullable=False)
+    user_id = Column(String(36), nullable=False)
+    family_id = Column(String(36), nullable=True)  # Set for shared family projects
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index("ix_tombstones_user_deleted", "user_id", "deleted_at", "id"),
+        Index("ix_tombstones_family_deleted", "family_id", "deleted_at", "id"),
+    )
@@ -1,3 +1,3 @@
-from . import auth, items, projects, contexts, families, reviews
+from . import auth, items, projects, contexts, families, reviews, sync, export, imports, dashboard, events, analytics
 
-__all__ = ["auth", "items", "projects", "contexts", "families", "reviews"]
+__all__ = ["auth", "items", "projects", "contexts", "families", "reviews", "sync", "export", "imports", "dashboard", "events", "analytics"]
@@ -0,0 +1,38 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..schemas.analytics import InboxTimeReport, ThroughputReport
+from ..services.analytics import inbox_time_report, throughput_report
+from ..utils.auth import get_current_active_user
+from ..utils.token_cache import UserSnapshot
+
+router = APIRouter()
+
+MAX_WEEKS = 104
+
+
+@router.get("/throughput", response_model=ThroughputReport)
+async def throughput(
+    weeks: int = Query(12, ge=1, le=MAX_WEEKS),
+    dimension: Literal["all", "context", "project"] = "all",
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    """Items captured vs completed per ISO week, overall or by context/project.
+
+    Read from the weekly rollups; items are counted under their current
+    context and project.
+    """
+    return await db.run_sync(throughput_report, current_user.id, weeks, dimension)
+
+
+@router.get("/inbox-time", response_model=InboxTimeReport)
+async def inbox_time(
+    weeks: int = Query(12, ge=1, le=MAX_WEEKS),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    """How long items sat in the inbox before being processed or completed,
+    per week they left it; percentiles are histogram bucket bounds in hours"""
+    return await db.run_sync(inbox_time_report, current_user.id, weeks)
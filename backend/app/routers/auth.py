@@ -1,29 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
 from ..models.user import User
+from ..services.counters import initial_counters
 from ..schemas.user import UserCreate, UserResponse, Token, GoogleAuthRequest
 from ..utils.auth import (
-    get_password_hash,
-    verify_password,
     create_access_token,
     create_refresh_token,
     get_current_active_user,
 )
+from ..utils.passwords import password_hasher
+from ..utils.token_cache import UserSnapshot
 from ..config import get_settings
 from jose import JWTError, jwt
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 
 router = APIRouter()
 settings = get_settings()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
+    existing_user = await db.scalar(select(User).where(User.email == user_data.email))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -33,28 +33,38 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     # Create new user
     user = User(
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_hasher.hash(user_data.password),
         name=user_data.name
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.flush()
+    db.add(initial_counters(user.id))
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/login", response_model=Token)
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = db.query(User).filter(User.email == form_data.username).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
+    user = await db.scalar(select(User).where(User.email == form_data.username))
+    verified, new_hash = False, None
+    if user and user.password_hash:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.password_hash)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # The stored hash used an old scheme or cost; upgrade it now that we have the password
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
 
@@ -66,7 +76,7 @@ async def login(
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
+async def refresh_token(refresh_token: str, db: AsyncSession = Depends(get_db)):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -82,7 +92,7 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.scalar(select(User).where(User.id == user_id))
     if user is None:
         raise credentials_exception
 
@@ -97,13 +107,18 @@ async def refresh_token(refresh_token: str, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: UserSnapshot = Depends(get_current_active_user)):
     return current_user
 
 
 @router.post("/google", response_model=Token)
-async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db)):
+async def google_auth(request: GoogleAuthRequest, db: AsyncSession = Depends(get_db)):
     """Authenticate with Google ID token"""
+    # Imported on first use: google-auth pulls in requests, which would add
+    # about 100 ms to every cold start for an endpoint most instances never hit
+    from google.oauth2 import id_token
+    from google.auth.transport import requests as google_requests
+
     try:
         # Verify the Google ID token
         idinfo = id_token.verify_oauth2_token(
@@ -118,13 +133,13 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
         name = idinfo.get("name", email.split("@")[0])
 
         # Check if user exists by google_id or email
-        user = db.query(User).filter(User.google_id == google_id).first()
+        user = await db.scalar(select(User).where(User.google_id == google_id))
         if not user:
-            user = db.query(User).filter(User.email == email).first()
+            user = await db.scalar(select(User).where(User.email == email))
             if user:
                 # Link existing account with Google
                 user.google_id = google_id
-                db.commit()
+                await db.commit()
             else:
                 # Create new user
                 user = User(
@@ -134,8 +149,10 @@ async def google_auth(request: GoogleAuthRequest, db: Session = Depends(get_db))
                     password_hash=None
                 )
                 db.add(user)
-                db.commit()
-                db.refresh(user)
+                await db.flush()
+                db.add(initial_counters(user.id))
+                await db.commit()
+                await db.refresh(user)
 
         # Create tokens
         access_token = create_access_token(data={"sub": str(user.id)})
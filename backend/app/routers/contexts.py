@@ -1,28 +1,34 @@
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
-from ..models.user import User
 from ..models.context import Context
 from ..schemas.context import ContextCreate, ContextUpdate, ContextResponse
+from ..services.analytics import detach_rollups
+from ..services.archive import detach_archived_items
+from ..services.counters import detach_context_counters
+from ..services.sync import record_tombstones
 from ..utils.auth import get_current_active_user
+from ..utils.etag import contexts_etag
+from ..utils.token_cache import UserSnapshot
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ContextResponse])
+@router.get("", response_model=List[ContextResponse], dependencies=[Depends(contexts_etag)])
 async def list_contexts(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    return db.query(Context).filter(Context.user_id == current_user.id).all()
+    return (await db.scalars(select(Context).where(Context.user_id == current_user.id))).all()
 
 
 @router.post("", response_model=ContextResponse, status_code=status.HTTP_201_CREATED)
 async def create_context(
     context_data: ContextCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
     context = Context(
         user_id=current_user.id,
@@ -30,21 +36,21 @@ async def create_context(
         color=context_data.color
     )
     db.add(context)
-    db.commit()
-    db.refresh(context)
+    await db.commit()
+    await db.refresh(context)
     return context
 
 
 @router.get("/{context_id}", response_model=ContextResponse)
 async def get_context(
     context_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    context = db.query(Context).filter(
+    context = await db.scalar(select(Context).where(
         Context.id == context_id,
         Context.user_id == current_user.id
-    ).first()
+    ))
 
     if not context:
         raise HTTPException(
@@ -58,13 +64,13 @@ async def get_context(
 async def update_context(
     context_id: str,
     context_data: ContextUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    context = db.query(Context).filter(
+    context = await db.scalar(select(Context).where(
         Context.id == context_id,
         Context.user_id == current_user.id
-    ).first()
+    ))
 
     if not context:
         raise HTTPException(
@@ -76,21 +82,21 @@ async def update_context(
     for field, value in update_data.items():
         setattr(context, field, value)
 
-    db.commit()
-    db.refresh(context)
+    await db.commit()
+    await db.refresh(context)
     return context
 
 
 @router.delete("/{context_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_context(
     context_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    context = db.query(Context).filter(
+    context = await db.scalar(select(Context).where(
         Context.id == context_id,
         Context.user_id == current_user.id
-    ).first()
+    ))
 
     if not context:
         raise HTTPException(
@@ -98,5 +104,9 @@ async def delete_context(
             detail="Context not found"
         )
 
-    db.delete(context)
-    db.commit()
+    await db.run_sync(record_tombstones, "context", [context])
+    await db.run_sync(detach_context_counters, context.id)
+    await db.run_sync(detach_rollups, context_id=context.id)
+    await db.run_sync(detach_archived_items, context_id=context.id)
+    await db.delete(context)
+    await db.commit()
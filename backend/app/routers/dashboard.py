@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db
+from ..schemas.dashboard import DashboardSummary
+from ..services.counters import get_summary
+from ..utils.auth import get_current_active_user
+from ..utils.token_cache import UserSnapshot
+
+router = APIRouter()
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def dashboard_summary(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    return await db.run_sync(get_summary, current_user.id)
@@ -0,0 +1,108 @@
+import asyncio
+import json
+from fastapi import APIRouter, Depends, Query, WebSocket, WebSocketDisconnect, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import get_settings
+from ..database import AsyncSessionLocal, get_db
+from ..services.access import FamilyAccess, get_family_access
+from ..services.events import Subscription, broker, family_channel, user_channel
+from ..utils.auth import authenticate_token
+from ..utils.token_cache import UserSnapshot
+
+settings = get_settings()
+
+router = APIRouter()
+
+
+async def _channels(access: FamilyAccess) -> set:
+    return {user_channel(access.user.id)} | {family_channel(f) for f in await access.family_ids()}
+
+
+async def _events(subscription: Subscription, user: UserSnapshot):
+    """Yield events for one connection, or None when a keepalive is due.
+
+    When the user joins or leaves a family the subscription is moved to the
+    new set of family channels.
+    """
+    while True:
+        event = await subscription.get(settings.event_heartbeat_seconds)
+        if event is not None and event["type"].startswith("family_member.") and user.id in event["ids"]:
+            async with AsyncSessionLocal() as db:
+                broker.resubscribe(subscription, await _channels(FamilyAccess(db, user)))
+        yield event
+
+
+@router.get("/stream")
+async def event_stream(
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
+):
+    """Server-sent events for changes to the user's and their families' data.
+
+    Each event is `{"type": "<entity>.<op>", "ids": [...], "actor", "at"}`;
+    `resync` means events were dropped and lists should be refetched, as
+    does `import.completed`, which carries no ids.
+    """
+    channels = await _channels(access)
+    # Return the connection to the pool; the stream may stay open for hours
+    await db.close()
+    subscription = broker.subscribe(channels)
+
+    async def body():
+        try:
+            yield f"retry: {int(settings.event_heartbeat_seconds * 1000)}\n\n"
+            async for event in _events(subscription, access.user):
+                if event is None:
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.websocket("/ws")
+async def event_socket(
+    websocket: WebSocket,
+    token: str = Query(..., description="Access token; browsers can't set headers on WebSockets"),
+    db: AsyncSession = Depends(get_db)
+):
+    """The same events as /events/stream over a WebSocket, as JSON messages"""
+    try:
+        user = await authenticate_token(token, db)
+        channels = await _channels(FamilyAccess(db, user))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    finally:
+        await db.close()
+
+    await websocket.accept()
+    subscription = broker.subscribe(channels)
+
+    async def send():
+        async for event in _events(subscription, user):
+            await websocket.send_json(event or {"type": "keepalive"})
+
+    async def receive():
+        # Clients don't send anything; this only notices the disconnect
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    # Whichever ends first (client gone, or a send failed) closes the other
+    tasks = {asyncio.create_task(send()), asyncio.create_task(receive())}
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        broker.unsubscribe(subscription)
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from ..services.export import EXPORTS, stream_export
+from ..utils.auth import get_current_active_user
+from ..utils.token_cache import UserSnapshot
+
+router = APIRouter()
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+@router.get("")
+async def export_data(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    entities: Optional[str] = None,
+    gzip: bool = False,
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    """Stream the user's items, projects, contexts, reviews and family memberships.
+
+    `entities` is a comma-separated subset of the above (all by default).
+    NDJSON records are `{"type": ..., "data": ...}`; CSV takes exactly one entity.
+    """
+    selected = [e.strip() for e in entities.split(",") if e.strip()] if entities else list(EXPORTS)
+    unknown = [e for e in selected if e not in EXPORTS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown entities: {', '.join(unknown)}"
+        )
+    if format == "csv" and len(selected) != 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="CSV export takes exactly one entity"
+        )
+
+    name = selected[0] if format == "csv" else "gtd-export"
+    filename = f"{name}-{datetime.utcnow():%Y%m%d}.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream_export(current_user.id, format, selected, gzip),
+        media_type="application/gzip" if gzip else MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -1,29 +1,78 @@
-from typing import List
+from typing import List, Optional
 import secrets
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from ..database import get_db
 from ..models.user import User
 from ..models.family import Family, FamilyMember, FamilyRole
 from ..schemas.family import FamilyCreate, FamilyResponse, FamilyMemberResponse, FamilyJoin
+from ..services.access import FamilyAccess, get_family_access
+from ..services.events import family_channel, publish, user_channel
 from ..utils.auth import get_current_active_user
+from ..utils.etag import families_etag
+from ..utils.token_cache import UserSnapshot
 
 router = APIRouter()
 
+INCLUDES = {"members"}
+
+
+def _parse_include(include: Optional[str]) -> set:
+    requested = {part.strip() for part in (include or "").split(",") if part.strip()}
+    unknown = requested - INCLUDES
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}"
+        )
+    return requested
+
+
+def _with_members(query):
+    # One extra SELECT for all members of all families, joined to their users
+    return query.options(
+        selectinload(Family.members).joinedload(FamilyMember.user).load_only(User.name, User.email)
+    )
+
+
+def _member_response(member: FamilyMember, user: User) -> FamilyMemberResponse:
+    return FamilyMemberResponse(
+        id=member.id,
+        user_id=member.user_id,
+        user_name=user.name,
+        user_email=user.email,
+        role=member.role,
+        joined_at=member.joined_at
+    )
+
+
+def _family_response(family: Family, include_members: bool = False) -> FamilyResponse:
+    return FamilyResponse(
+        id=family.id,
+        name=family.name,
+        created_by=family.created_by,
+        invite_code=family.invite_code,
+        created_at=family.created_at,
+        updated_at=family.updated_at,
+        members=[_member_response(m, m.user) for m in family.members] if include_members else None
+    )
+
 
 @router.post("", response_model=FamilyResponse, status_code=status.HTTP_201_CREATED)
 async def create_family(
     family_data: FamilyCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
     family = Family(
         name=family_data.name,
         created_by=current_user.id
     )
     db.add(family)
-    db.commit()
-    db.refresh(family)
+    await db.commit()
+    await db.refresh(family)
 
     # Add creator as owner
     member = FamilyMember(
@@ -32,104 +81,67 @@ async def create_family(
         role=FamilyRole.owner
     )
     db.add(member)
-    db.commit()
-
-    # Return without members to avoid needing user enrichment
-    return FamilyResponse(
-        id=family.id,
-        name=family.name,
-        created_by=family.created_by,
-        invite_code=family.invite_code,
-        created_at=family.created_at,
-        updated_at=family.updated_at,
-        members=None
+    await db.commit()
+    await publish(
+        "family_member", "joined", [current_user.id], current_user.id,
+        [family_channel(family.id), user_channel(current_user.id)]
     )
 
+    return _family_response(family)
 
-@router.get("", response_model=List[FamilyResponse])
+
+@router.get("", response_model=List[FamilyResponse], dependencies=[Depends(families_etag)])
 async def list_families(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    include: Optional[str] = Query(None, description="Set to 'members' to embed each family's members"),
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    # Get all families user is a member of
-    family_ids = db.query(FamilyMember.family_id).filter(
-        FamilyMember.user_id == current_user.id
-    ).subquery()
-
-    families = db.query(Family).filter(Family.id.in_(family_ids)).all()
-    # Return without members
-    return [FamilyResponse(
-        id=f.id,
-        name=f.name,
-        created_by=f.created_by,
-        invite_code=f.invite_code,
-        created_at=f.created_at,
-        updated_at=f.updated_at,
-        members=None
-    ) for f in families]
+    include_members = "members" in _parse_include(include)
+    query = select(Family).where(Family.id.in_(await access.family_ids())).order_by(Family.created_at)
+    if include_members:
+        query = _with_members(query)
+
+    families = (await db.scalars(query)).all()
+    return [_family_response(f, include_members) for f in families]
 
 
 @router.get("/{family_id}", response_model=FamilyResponse)
 async def get_family(
     family_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    include: Optional[str] = Query(None, description="Set to 'members' to embed the member list"),
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    # Verify membership
-    member = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family_id,
-        FamilyMember.user_id == current_user.id
-    ).first()
-
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this family"
-        )
+    include_members = "members" in _parse_include(include)
+    await access.require_member(family_id)
+    query = select(Family).where(Family.id == family_id)
+    if include_members:
+        query = _with_members(query)
 
-    family = db.query(Family).filter(Family.id == family_id).first()
+    family = await db.scalar(query)
     if not family:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Family not found"
         )
 
-    return FamilyResponse(
-        id=family.id,
-        name=family.name,
-        created_by=family.created_by,
-        invite_code=family.invite_code,
-        created_at=family.created_at,
-        updated_at=family.updated_at,
-        members=None
-    )
+    return _family_response(family, include_members)
 
 
 @router.post("/{family_id}/invite")
 async def generate_invite(
     family_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    # Verify admin/owner role
-    member = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family_id,
-        FamilyMember.user_id == current_user.id,
-        FamilyMember.role.in_([FamilyRole.owner, FamilyRole.admin])
-    ).first()
+    await access.require_manager(family_id, "Only owners and admins can generate invites")
 
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only owners and admins can generate invites"
-        )
-
-    family = db.query(Family).filter(Family.id == family_id).first()
+    family = await db.scalar(select(Family).where(Family.id == family_id))
 
     # Generate new invite code
     family.invite_code = secrets.token_urlsafe(16)
-    db.commit()
-    db.refresh(family)
+    await db.commit()
+    await db.refresh(family)
 
     return {"invite_code": family.invite_code}
 
@@ -137,10 +149,10 @@ async def generate_invite(
 @router.post("/join", response_model=FamilyResponse)
 async def join_family(
     join_data: FamilyJoin,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    family = db.query(Family).filter(Family.invite_code == join_data.invite_code).first()
+    family = await db.scalar(select(Family).where(Family.invite_code == join_data.invite_code))
 
     if not family:
         raise HTTPException(
@@ -148,13 +160,7 @@ async def join_family(
             detail="Invalid invite code"
         )
 
-    # Check if already a member
-    existing = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family.id,
-        FamilyMember.user_id == current_user.id
-    ).first()
-
-    if existing:
+    if await access.role(family.id) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Already a member of this family"
@@ -162,86 +168,52 @@ async def join_family(
 
     member = FamilyMember(
         family_id=family.id,
-        user_id=current_user.id,
+        user_id=access.user.id,
         role=FamilyRole.member
     )
     db.add(member)
-    db.commit()
-
-    return FamilyResponse(
-        id=family.id,
-        name=family.name,
-        created_by=family.created_by,
-        invite_code=family.invite_code,
-        created_at=family.created_at,
-        updated_at=family.updated_at,
-        members=None
+    await db.commit()
+    # Open event streams of the new member pick up the family's channel from this
+    await publish(
+        "family_member", "joined", [access.user.id], access.user.id,
+        [family_channel(family.id), user_channel(access.user.id)]
     )
 
+    return _family_response(family)
+
 
 @router.get("/{family_id}/members", response_model=List[FamilyMemberResponse])
 async def list_members(
     family_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    # Verify membership
-    member = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family_id,
-        FamilyMember.user_id == current_user.id
-    ).first()
-
-    if not member:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not a member of this family"
-        )
+    await access.require_member(family_id)
 
-    members = db.query(FamilyMember).filter(FamilyMember.family_id == family_id).all()
-
-    # Enrich with user info
-    result = []
-    for m in members:
-        user = db.query(User).filter(User.id == m.user_id).first()
-        result.append(FamilyMemberResponse(
-            id=m.id,
-            user_id=m.user_id,
-            user_name=user.name,
-            user_email=user.email,
-            role=m.role,
-            joined_at=m.joined_at
-        ))
-
-    return result
+    # Members joined to their users in one query
+    rows = (await db.execute(
+        select(FamilyMember, User).join(User, User.id == FamilyMember.user_id).where(
+            FamilyMember.family_id == family_id
+        ).order_by(FamilyMember.joined_at)
+    )).all()
+    return [_member_response(member, user) for member, user in rows]
 
 
 @router.delete("/{family_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_member(
     family_id: str,
     user_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    # Verify admin/owner role
-    current_member = db.query(FamilyMember).filter(
-        FamilyMember.family_id == family_id,
-        FamilyMember.user_id == current_user.id,
-        FamilyMember.role.in_([FamilyRole.owner, FamilyRole.admin])
-    ).first()
-
     # Allow self-removal
-    is_self = user_id == current_user.id
+    if user_id != access.user.id:
+        await access.require_manager(family_id, "Only owners and admins can remove members")
 
-    if not current_member and not is_self:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only owners and admins can remove members"
-        )
-
-    target_member = db.query(FamilyMember).filter(
+    target_member = await db.scalar(select(FamilyMember).where(
         FamilyMember.family_id == family_id,
         FamilyMember.user_id == user_id
-    ).first()
+    ))
 
     if not target_member:
         raise HTTPException(
@@ -256,5 +228,9 @@ async def remove_member(
             detail="Cannot remove family owner"
         )
 
-    db.delete(target_member)
-    db.commit()
+    await db.delete(target_member)
+    await db.commit()
+    await publish(
+        "family_member", "removed", [user_id], access.user.id,
+        [family_channel(family_id), user_channel(user_id)]
+    )
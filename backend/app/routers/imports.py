@@ -0,0 +1,55 @@
+import json
+import tempfile
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, File, Form, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from ..models.item import ItemType
+from ..services.events import publish, user_channel
+from ..services.importer import READ_SIZE, run_import
+from ..utils.auth import get_current_active_user
+from ..utils.token_cache import UserSnapshot
+
+router = APIRouter()
+
+
+@router.post("")
+async def import_data(
+    file: UploadFile = File(...),
+    format: Literal["csv", "ndjson", "json", "todoist"] = Form("csv"),
+    project: Optional[str] = Form(None),
+    default_type: ItemType = Form(ItemType.inbox),
+    create_missing: bool = Form(True),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    """Bulk-import items, projects and contexts from a file upload.
+
+    - csv: one item per row (title, notes, type, priority, due_date, project,
+      context, ...); rows with kind=project create projects
+    - ndjson / json: records as produced by GET /export, or plain item objects
+    - todoist: a Todoist CSV template; `project` names the project it belongs to
+
+    Project and context names are resolved to ids (and created if missing,
+    unless create_missing is false). The response streams NDJSON events:
+    per-row "error"s, a "progress" event after every committed chunk and a
+    final "done" or "failed" summary.
+    """
+    # Copy the upload to a file owned by the import, since the response body
+    # (and with it the parsing) runs after the request has been handled
+    spool = tempfile.TemporaryFile()
+    while chunk := await file.read(READ_SIZE):
+        spool.write(chunk)
+    spool.seek(0)
+
+    async def events():
+        rows = run_import(spool, current_user.id, format, project, default_type.value, create_missing)
+        try:
+            async for event in iterate_in_threadpool(rows):
+                yield json.dumps(event) + "\n"
+        finally:
+            spool.close()
+            # One notice for the whole import rather than per row; like any
+            # change event it also drops the user's cached review reports
+            await publish("import", "completed", [], current_user.id, [user_channel(current_user.id)])
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
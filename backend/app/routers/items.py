@@ -1,47 +1,107 @@
-from typing import List, Optional
+from typing import List, Optional, Union
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
-from ..models.user import User
 from ..models.item import Item, ItemType, ItemPriority
-from ..schemas.item import ItemCreate, ItemUpdate, ItemResponse, ItemProcess
+from ..models.archive import ArchivedItem
+from ..schemas.item import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemProcess, ItemPage,
+    ItemBatchRequest, ItemBatchResponse, ItemBulkProcess, ItemSearchResults,
+)
+from ..services.analytics import RollupState, apply_rollup_delta, rollup_delta
+from ..services.archive import items_with_archive, restore_items
+from ..services.counters import ItemState, apply_counter_delta, item_delta
+from ..services.events import publish_items
+from ..services.item_batch import apply_item_batch, process_inbox_items
+from ..services.search import search_items
+from ..services.sync import record_tombstones
 from ..utils.auth import get_current_active_user
+from ..utils.etag import items_etag
+from ..utils.fields import parse_fields, load_fields, sparse_rows, sparse_response
+from ..utils.pagination import MAX_PAGE_SIZE, is_paginated, paginate
+from ..utils.token_cache import UserSnapshot
 
 router = APIRouter()
 
+# Batch operation -> change event op
+BATCH_EVENTS = {"create": "created", "update": "updated", "complete": "completed", "delete": "deleted",
+                "process": "processed"}
 
-@router.get("", response_model=List[ItemResponse])
+
+async def _publish_results(db: AsyncSession, user_id: str, results, deleted_scopes: dict = None):
+    """Publish one event per kind of operation that succeeded in a batch.
+
+    Deleted items have no final state, so their project and assignee come
+    from `deleted_scopes` (id -> (project_id, assigned_to)), read beforehand.
+    """
+    scopes = dict(deleted_scopes or {})
+    scopes.update((r.id, (r.item.project_id, r.item.assigned_to)) for r in results if r.item)
+    ok = [r for r in results if r.ok and r.id]
+    for op in dict.fromkeys(r.op for r in ok):
+        matching = [scopes.get(r.id, (None, None)) for r in ok if r.op == op]
+        await publish_items(
+            db, BATCH_EVENTS[op], user_id, [r.id for r in ok if r.op == op],
+            project_ids=[project_id for project_id, _ in matching],
+            assignees=[assigned_to for _, assigned_to in matching],
+        )
+
+
+@router.get("", response_model=Union[ItemPage, List[ItemResponse]], dependencies=[Depends(items_etag)])
 async def list_items(
+    response: Response,
     type: Optional[ItemType] = None,
     project_id: Optional[str] = None,
     context_id: Optional[str] = None,
     priority: Optional[ItemPriority] = None,
     include_completed: bool = False,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated ItemResponse fields to return"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    query = db.query(Item).filter(Item.user_id == current_user.id)
+    selected = parse_fields(fields, ItemResponse)
+    if include_completed:
+        # Old completed items live in items_archive; read both tables
+        source = items_with_archive(current_user.id)
+        query = select(source)
+    else:
+        source = Item
+        query = select(Item).where(Item.user_id == current_user.id, Item.completed_at.is_(None))
+    if selected:
+        query = query.options(load_fields(source, selected))
 
     if type:
-        query = query.filter(Item.type == type)
+        query = query.where(source.type == type)
     if project_id:
-        query = query.filter(Item.project_id == project_id)
+        query = query.where(source.project_id == project_id)
     if context_id:
-        query = query.filter(Item.context_id == context_id)
+        query = query.where(source.context_id == context_id)
     if priority:
-        query = query.filter(Item.priority == priority)
-    if not include_completed:
-        query = query.filter(Item.completed_at.is_(None))
+        query = query.where(source.priority == priority)
+
+    # Without any paging params, keep returning the full bare list for older clients
+    if not is_paginated(limit, cursor, include_total):
+        items = (await db.scalars(query.order_by(source.created_at.desc()))).all()
+        return sparse_response(sparse_rows(items, selected), response) if selected else items
 
-    return query.order_by(Item.created_at.desc()).all()
+    items, next_cursor, total = await paginate(db, query, source, limit, cursor, include_total)
+    if selected:
+        return sparse_response(
+            {"items": sparse_rows(items, selected), "next_cursor": next_cursor, "total": total}, response
+        )
+    return ItemPage(items=items, next_cursor=next_cursor, total=total)
 
 
 @router.post("", response_model=ItemResponse, status_code=status.HTTP_201_CREATED)
 async def create_item(
     item_data: ItemCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
     item = Item(
         user_id=current_user.id,
@@ -55,21 +115,84 @@ async def create_item(
         due_date=item_data.due_date
     )
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.run_sync(
+        apply_counter_delta, current_user.id, item_delta(None, ItemState(item_data.type, item_data.context_id, None))
+    )
+    await db.run_sync(apply_rollup_delta, current_user.id, rollup_delta(None, RollupState.of(item), datetime.utcnow()))
+    await db.commit()
+    await db.refresh(item)
+    await publish_items(db, "created", current_user.id, [item.id], [item.project_id], [item.assigned_to])
     return item
 
 
+@router.post("/batch", response_model=ItemBatchResponse)
+async def batch_items(
+    batch: ItemBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    delete_ids = [op.id for op in batch.operations if op.op == "delete" and op.id]
+    deleted_scopes = {}
+    if delete_ids:
+        deleted_scopes = {row.id: (row.project_id, row.assigned_to) for row in await db.execute(
+            select(Item.id, Item.project_id, Item.assigned_to).where(
+                Item.user_id == current_user.id,
+                Item.id.in_(delete_ids)
+            )
+        )}
+    try:
+        results = await db.run_sync(apply_item_batch, current_user.id, batch.operations, atomic=batch.atomic)
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Batch rejected by the database; no operations were applied"
+        )
+
+    await _publish_results(db, current_user.id, results, deleted_scopes)
+    succeeded = sum(1 for r in results if r.ok)
+    return ItemBatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+@router.post("/process", response_model=ItemBatchResponse)
+async def process_items(
+    process_data: ItemBulkProcess,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    results = await db.run_sync(process_inbox_items, current_user.id, process_data.items)
+    await _publish_results(db, current_user.id, results)
+    succeeded = sum(1 for r in results if r.ok)
+    return ItemBatchResponse(results=results, succeeded=succeeded, failed=len(results) - succeeded)
+
+
+@router.get("/search", response_model=ItemSearchResults)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    include_completed: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    return await db.run_sync(search_items, current_user.id, q, limit, offset, include_completed)
+
+
 @router.get("/{item_id}", response_model=ItemResponse)
 async def get_item(
     item_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    item = db.query(Item).filter(
+    item = await db.scalar(select(Item).where(
         Item.id == item_id,
         Item.user_id == current_user.id
-    ).first()
+    ))
+    if not item:
+        item = await db.scalar(select(ArchivedItem).where(
+            ArchivedItem.id == item_id,
+            ArchivedItem.user_id == current_user.id
+        ))
 
     if not item:
         raise HTTPException(
@@ -83,13 +206,14 @@ async def get_item(
 async def update_item(
     item_id: str,
     item_data: ItemUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    item = db.query(Item).filter(
+    await db.run_sync(restore_items, current_user.id, [item_id])
+    item = await db.scalar(select(Item).where(
         Item.id == item_id,
         Item.user_id == current_user.id
-    ).first()
+    ))
 
     if not item:
         raise HTTPException(
@@ -97,25 +221,37 @@ async def update_item(
             detail="Item not found"
         )
 
+    before = ItemState.of(item)
+    before_rollup = RollupState.of(item)
+    before_scope = (item.project_id, item.assigned_to)
     update_data = item_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(item, field, value)
 
-    db.commit()
-    db.refresh(item)
+    await db.run_sync(apply_counter_delta, current_user.id, item_delta(before, ItemState.of(item)))
+    await db.run_sync(
+        apply_rollup_delta, current_user.id, rollup_delta(before_rollup, RollupState.of(item), datetime.utcnow())
+    )
+    await db.commit()
+    await db.refresh(item)
+    await publish_items(
+        db, "updated", current_user.id, [item.id],
+        [item.project_id, before_scope[0]], [item.assigned_to, before_scope[1]]
+    )
     return item
 
 
 @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_item(
     item_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    item = db.query(Item).filter(
+    await db.run_sync(restore_items, current_user.id, [item_id])
+    item = await db.scalar(select(Item).where(
         Item.id == item_id,
         Item.user_id == current_user.id
-    ).first()
+    ))
 
     if not item:
         raise HTTPException(
@@ -123,20 +259,24 @@ async def delete_item(
             detail="Item not found"
         )
 
-    db.delete(item)
-    db.commit()
+    await db.run_sync(record_tombstones, "item", [item])
+    await db.run_sync(apply_counter_delta, current_user.id, item_delta(ItemState.of(item), None))
+    await db.delete(item)
+    await db.commit()
+    await publish_items(db, "deleted", current_user.id, [item.id], [item.project_id], [item.assigned_to])
 
 
 @router.post("/{item_id}/complete", response_model=ItemResponse)
 async def complete_item(
     item_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    item = db.query(Item).filter(
+    await db.run_sync(restore_items, current_user.id, [item_id])
+    item = await db.scalar(select(Item).where(
         Item.id == item_id,
         Item.user_id == current_user.id
-    ).first()
+    ))
 
     if not item:
         raise HTTPException(
@@ -144,9 +284,16 @@ async def complete_item(
             detail="Item not found"
         )
 
+    before = ItemState.of(item)
+    before_rollup = RollupState.of(item)
     item.completed_at = datetime.utcnow()
-    db.commit()
-    db.refresh(item)
+    await db.run_sync(apply_counter_delta, current_user.id, item_delta(before, ItemState.of(item)))
+    await db.run_sync(
+        apply_rollup_delta, current_user.id, rollup_delta(before_rollup, RollupState.of(item), item.completed_at)
+    )
+    await db.commit()
+    await db.refresh(item)
+    await publish_items(db, "completed", current_user.id, [item.id], [item.project_id], [item.assigned_to])
     return item
 
 
@@ -154,14 +301,14 @@ async def complete_item(
 async def process_item(
     item_id: str,
     process_data: ItemProcess,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    item = db.query(Item).filter(
+    item = await db.scalar(select(Item).where(
         Item.id == item_id,
         Item.user_id == current_user.id,
         Item.type == ItemType.inbox
-    ).first()
+    ))
 
     if not item:
         raise HTTPException(
@@ -169,6 +316,9 @@ async def process_item(
             detail="Inbox item not found"
         )
 
+    before = ItemState.of(item)
+    before_rollup = RollupState.of(item)
+    before_scope = (item.project_id, item.assigned_to)
     item.type = process_data.type
     if process_data.project_id:
         item.project_id = process_data.project_id
@@ -181,6 +331,14 @@ async def process_item(
     if process_data.due_date:
         item.due_date = process_data.due_date
 
-    db.commit()
-    db.refresh(item)
+    await db.run_sync(apply_counter_delta, current_user.id, item_delta(before, ItemState.of(item)))
+    await db.run_sync(
+        apply_rollup_delta, current_user.id, rollup_delta(before_rollup, RollupState.of(item), datetime.utcnow())
+    )
+    await db.commit()
+    await db.refresh(item)
+    await publish_items(
+        db, "processed", current_user.id, [item.id],
+        [item.project_id, before_scope[0]], [item.assigned_to, before_scope[1]]
+    )
     return item
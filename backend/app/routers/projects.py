@@ -1,64 +1,77 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
-from ..models.user import User
 from ..models.project import Project, ProjectStatus, ProjectHorizon
-from ..models.family import FamilyMember
-from ..schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse
+from ..schemas.project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectPage, ProjectWithChildren
+from ..services.access import FamilyAccess, get_family_access, visible_projects
+from ..services.analytics import detach_rollups
+from ..services.archive import detach_archived_items
+from ..services.counters import apply_counter_delta, project_delta
+from ..services.events import publish_project
+from ..services.project_tree import build_project_tree
+from ..services.sync import record_tombstones
 from ..utils.auth import get_current_active_user
+from ..utils.etag import projects_etag
+from ..utils.fields import parse_fields, load_fields, sparse_rows, sparse_response
+from ..utils.pagination import MAX_PAGE_SIZE, is_paginated, paginate
+from ..utils.token_cache import UserSnapshot
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[ProjectResponse])
+@router.get("", response_model=Union[ProjectPage, List[ProjectResponse]], dependencies=[Depends(projects_etag)])
 async def list_projects(
+    response: Response,
     horizon: Optional[ProjectHorizon] = None,
     status: Optional[ProjectStatus] = None,
     family_id: Optional[str] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    fields: Optional[str] = Query(None, description="Comma-separated ProjectResponse fields to return"),
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
+    selected = parse_fields(fields, ProjectResponse)
     # Get user's personal projects and family projects they have access to
-    query = db.query(Project).filter(
-        (Project.user_id == current_user.id) |
-        (Project.family_id.in_(
-            db.query(FamilyMember.family_id).filter(
-                FamilyMember.user_id == current_user.id
-            )
-        ))
-    )
+    query = select(Project).where(visible_projects(access.user.id, await access.family_ids()))
 
     if horizon:
-        query = query.filter(Project.horizon == horizon)
+        query = query.where(Project.horizon == horizon)
     if status:
-        query = query.filter(Project.status == status)
+        query = query.where(Project.status == status)
     if family_id:
-        query = query.filter(Project.family_id == family_id)
-
-    return query.order_by(Project.created_at.desc()).all()
+        query = query.where(Project.family_id == family_id)
+    if selected:
+        query = query.options(load_fields(Project, selected))
+
+    # Without any paging params, keep returning the full bare list for older clients
+    if not is_paginated(limit, cursor, include_total):
+        projects = (await db.scalars(query.order_by(Project.created_at.desc()))).all()
+        return sparse_response(sparse_rows(projects, selected), response) if selected else projects
+
+    projects, next_cursor, total = await paginate(db, query, Project, limit, cursor, include_total)
+    if selected:
+        return sparse_response(
+            {"projects": sparse_rows(projects, selected), "next_cursor": next_cursor, "total": total}, response
+        )
+    return ProjectPage(projects=projects, next_cursor=next_cursor, total=total)
 
 
 @router.post("", response_model=ProjectResponse, status_code=status.HTTP_201_CREATED)
 async def create_project(
     project_data: ProjectCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
     # Verify family access if family_id provided
     if project_data.family_id:
-        member = db.query(FamilyMember).filter(
-            FamilyMember.family_id == project_data.family_id,
-            FamilyMember.user_id == current_user.id
-        ).first()
-        if not member:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not a member of this family"
-            )
+        await access.require_member(project_data.family_id)
 
     project = Project(
-        user_id=current_user.id,
+        user_id=access.user.id,
         name=project_data.name,
         description=project_data.description,
         status=project_data.status,
@@ -67,18 +80,29 @@ async def create_project(
         parent_id=project_data.parent_id
     )
     db.add(project)
-    db.commit()
-    db.refresh(project)
+    await db.run_sync(apply_counter_delta, access.user.id, project_delta(None, project.status))
+    await db.commit()
+    await db.refresh(project)
+    await publish_project("created", access.user.id, project)
     return project
 
 
+@router.get("/tree", response_model=List[ProjectWithChildren])
+async def project_tree(
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
+):
+    """Horizons of focus as nested projects, with item counts rolled up from each subtree"""
+    return await db.run_sync(build_project_tree, access.user.id, await access.family_ids())
+
+
 @router.get("/{project_id}", response_model=ProjectResponse)
 async def get_project(
     project_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.scalar(select(Project).where(Project.id == project_id))
 
     if not project:
         raise HTTPException(
@@ -86,16 +110,7 @@ async def get_project(
             detail="Project not found"
         )
 
-    # Check access
-    has_access = project.user_id == current_user.id
-    if project.family_id and not has_access:
-        member = db.query(FamilyMember).filter(
-            FamilyMember.family_id == project.family_id,
-            FamilyMember.user_id == current_user.id
-        ).first()
-        has_access = member is not None
-
-    if not has_access:
+    if not await access.can_view_project(project):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Access denied"
@@ -108,13 +123,13 @@ async def get_project(
 async def update_project(
     project_id: str,
     project_data: ProjectUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))
 
     if not project:
         raise HTTPException(
@@ -122,25 +137,30 @@ async def update_project(
             detail="Project not found"
         )
 
+    before_status = project.status
+    before_family = project.family_id
     update_data = project_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(project, field, value)
 
-    db.commit()
-    db.refresh(project)
+    await db.run_sync(apply_counter_delta, current_user.id, project_delta(before_status, project.status))
+    await db.commit()
+    await db.refresh(project)
+    # A project moved between families is announced to both
+    await publish_project("updated", current_user.id, project, [before_family])
     return project
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_project(
     project_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    project = db.query(Project).filter(
+    project = await db.scalar(select(Project).where(
         Project.id == project_id,
         Project.user_id == current_user.id
-    ).first()
+    ))
 
     if not project:
         raise HTTPException(
@@ -148,5 +168,10 @@ async def delete_project(
             detail="Project not found"
         )
 
-    db.delete(project)
-    db.commit()
+    await db.run_sync(record_tombstones, "project", [project])
+    await db.run_sync(apply_counter_delta, current_user.id, project_delta(project.status, None))
+    await db.run_sync(detach_rollups, project_id=project.id)
+    await db.run_sync(detach_archived_items, project_id=project.id)
+    await db.delete(project)
+    await db.commit()
+    await publish_project("deleted", current_user.id, project)
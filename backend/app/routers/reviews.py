@@ -1,98 +1,108 @@
 from typing import List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..database import get_db
-from ..models.user import User
 from ..models.review import WeeklyReview
-from ..schemas.review import ReviewCreate, ReviewResponse, ReviewChecklist, ReviewChecklistItem
+from ..schemas.review import (
+    ReviewCreate, ReviewResponse, ReviewChecklist, ReviewSnapshot, StalledProjectsReport,
+)
+from ..services.access import FamilyAccess, get_family_access
+from ..services.reviews import (
+    CHECKLIST, DEFAULT_STALE_WEEKS, build_review_snapshot, cached_report, find_stalled_projects,
+    review_cache, review_channels, snapshot_cache, snapshot_stats,
+)
 from ..utils.auth import get_current_active_user
+from ..utils.etag import reviews_etag
+from ..utils.token_cache import UserSnapshot
 
 router = APIRouter()
 
 
 @router.get("/checklist", response_model=ReviewChecklist)
 async def get_review_checklist(
-    current_user: User = Depends(get_current_active_user)
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    checklist_items = [
-        ReviewChecklistItem(
-            id="clear_inbox",
-            title="Clear Inbox to Zero",
-            description="Process all items in your inbox - decide what each item is and what to do with it"
-        ),
-        ReviewChecklistItem(
-            id="review_next_actions",
-            title="Review Next Actions",
-            description="Review all next action lists for each context - mark complete, update, or delete"
-        ),
-        ReviewChecklistItem(
-            id="review_waiting_for",
-            title="Review Waiting For",
-            description="Check on delegated items - follow up on anything overdue"
-        ),
-        ReviewChecklistItem(
-            id="review_projects",
-            title="Review Projects",
-            description="Review each project - ensure at least one next action exists for active projects"
-        ),
-        ReviewChecklistItem(
-            id="review_someday",
-            title="Review Someday/Maybe",
-            description="Review someday/maybe list - move items to active if appropriate"
-        ),
-        ReviewChecklistItem(
-            id="review_calendar",
-            title="Review Calendar",
-            description="Review past and upcoming calendar events - capture any actions needed"
-        ),
-        ReviewChecklistItem(
-            id="review_goals",
-            title="Review Goals & Vision",
-            description="Review higher horizons - ensure projects align with goals"
-        ),
-    ]
-
-    return ReviewChecklist(items=checklist_items)
+    return ReviewChecklist(items=CHECKLIST)
+
+
+@router.get("/stalled-projects", response_model=StalledProjectsReport)
+async def stalled_projects(
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
+):
+    """Active projects (own and family) that have no open next action.
+
+    Cached per user until an item, project or membership change touches the
+    user or one of their families.
+    """
+    family_ids = await access.family_ids()
+    return await cached_report(
+        db, review_cache, access.user.id, review_channels(access.user.id, family_ids),
+        lambda: db.run_sync(find_stalled_projects, access.user.id, family_ids),
+    )
+
+
+async def _snapshot(db: AsyncSession, access: FamilyAccess, stale_weeks: int) -> ReviewSnapshot:
+    family_ids = await access.family_ids()
+    return await cached_report(
+        db, snapshot_cache, f"{access.user.id}:{stale_weeks}", review_channels(access.user.id, family_ids),
+        lambda: build_review_snapshot(db, access.user.id, family_ids, stale_weeks),
+    )
+
+
+@router.get("/snapshot", response_model=ReviewSnapshot)
+async def review_snapshot(
+    stale_weeks: int = Query(DEFAULT_STALE_WEEKS, ge=1, le=52, description="List someday items untouched this long"),
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
+):
+    """Everything the weekly review walks through, in one response: the
+    checklist with a count per step, overdue waiting-for items, stalled
+    projects and someday items that haven't been touched in `stale_weeks`"""
+    return await _snapshot(db, access, stale_weeks)
 
 
 @router.post("", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 async def create_review(
     review_data: ReviewCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    access: FamilyAccess = Depends(get_family_access)
 ):
+    snapshot = await _snapshot(db, access, DEFAULT_STALE_WEEKS)
     review = WeeklyReview(
-        user_id=current_user.id,
+        user_id=access.user.id,
         notes=review_data.notes,
-        completed_at=datetime.utcnow()
+        completed_at=datetime.utcnow(),
+        stats=snapshot_stats(snapshot)
     )
     db.add(review)
-    db.commit()
-    db.refresh(review)
+    await db.commit()
+    await db.refresh(review)
     return review
 
 
-@router.get("", response_model=List[ReviewResponse])
+@router.get("", response_model=List[ReviewResponse], dependencies=[Depends(reviews_etag)])
 async def list_reviews(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    return db.query(WeeklyReview).filter(
+    return (await db.scalars(select(WeeklyReview).where(
         WeeklyReview.user_id == current_user.id
-    ).order_by(WeeklyReview.created_at.desc()).all()
+    ).order_by(WeeklyReview.created_at.desc()))).all()
 
 
 @router.get("/{review_id}", response_model=ReviewResponse)
 async def get_review(
     review_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
 ):
-    review = db.query(WeeklyReview).filter(
+    review = await db.scalar(select(WeeklyReview).where(
         WeeklyReview.id == review_id,
         WeeklyReview.user_id == current_user.id
-    ).first()
+    ))
 
     if not review:
         raise HTTPException(
@@ -0,0 +1,26 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_primary_db
+from ..schemas.sync import SyncChanges
+from ..services.sync import SYNC_PAGE_SIZE, get_changes
+from ..utils.auth import get_current_active_user
+from ..utils.token_cache import UserSnapshot
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=SyncChanges)
+async def list_changes(
+    since: Optional[str] = None,
+    limit: int = Query(SYNC_PAGE_SIZE, ge=1, le=SYNC_PAGE_SIZE),
+    db: AsyncSession = Depends(get_primary_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+):
+    """Items, projects and contexts changed since the `since` cursor, plus deletions.
+
+    Call without `since` for the initial sync, then pass back `next_cursor`.
+    Keep paging while `has_more` is true.
+    """
+    # Read from the primary: a lagging replica could let the cursor skip rows for good
+    return await db.run_sync(get_changes, current_user.id, since, limit)
@@ -1,9 +1,15 @@
 from .user import UserCreate, UserResponse, UserLogin, Token, TokenData
-from .item import ItemCreate, ItemUpdate, ItemResponse, ItemProcess
-from .project import ProjectCreate, ProjectUpdate, ProjectResponse
+from .item import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemProcess, ItemPage,
+    ItemBatchRequest, ItemBatchResponse, ItemBulkProcess, ItemSearchResults,
+)
+from .project import ProjectCreate, ProjectUpdate, ProjectResponse, ProjectPage
 from .context import ContextCreate, ContextUpdate, ContextResponse
-from .family import FamilyCreate, FamilyResponse, FamilyMemberResponse, FamilyJoin
-from .review import ReviewCreate, ReviewResponse, ReviewChecklist
+from .family import FamilyCreate, FamilyResponse, FamilyMemberResponse, FamilyJoin, FamilyMembershipExport
+from .review import ReviewCreate, ReviewResponse, ReviewChecklist, StalledProjectsReport, ReviewSnapshot
+from .sync import SyncChanges, SyncTombstone
+from .dashboard import DashboardSummary
+from .analytics import ThroughputReport, InboxTimeReport
 
 __all__ = [
     "UserCreate",
@@ -15,9 +21,15 @@ __all__ = [
     "ItemUpdate",
     "ItemResponse",
     "ItemProcess",
+    "ItemPage",
+    "ItemBatchRequest",
+    "ItemBatchResponse",
+    "ItemBulkProcess",
+    "ItemSearchResults",
     "ProjectCreate",
     "ProjectUpdate",
     "ProjectResponse",
+    "ProjectPage",
     "ContextCreate",
     "ContextUpdate",
     "ContextResponse",
@@ -25,7 +37,15 @@ __all__ = [
     "FamilyResponse",
     "FamilyMemberResponse",
     "FamilyJoin",
+    "FamilyMembershipExport",
     "ReviewCreate",
     "ReviewResponse",
     "ReviewChecklist",
+    "StalledProjectsReport",
+    "ReviewSnapshot",
+    "SyncChanges",
+    "SyncTombstone",
+    "DashboardSummary",
+    "ThroughputReport",
+    "InboxTimeReport",
 ]
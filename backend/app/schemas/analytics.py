@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import Optional, List, Dict
+
+
+class ThroughputRow(BaseModel):
+    week: date  # Monday of the ISO week
+    key: Optional[str] = None  # Context or project id ("none" for items without one); null overall
+    captured: int
+    completed: int
+
+
+class ThroughputReport(BaseModel):
+    dimension: str
+    weeks: int
+    rows: List[ThroughputRow]
+
+
+class InboxTimeWeek(BaseModel):
+    week: date
+    processed: int
+    p50_hours: Optional[float] = None  # Histogram bucket bound; null past the last bound
+    p90_hours: Optional[float] = None
+    buckets: Dict[str, int]
+
+
+class InboxTimeReport(BaseModel):
+    processed: int
+    p50_hours: Optional[float] = None
+    p90_hours: Optional[float] = None
+    buckets: Dict[str, int]
+    weeks: List[InboxTimeWeek]
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import Dict
+
+
+class DashboardSummary(BaseModel):
+    inbox: int
+    next_actions: int
+    next_actions_by_context: Dict[str, int]  # context id ("none" for no context) -> open next actions
+    waiting_for: int
+    scheduled: int
+    someday: int
+    reference: int
+    overdue: int
+    active_projects: int
@@ -24,6 +24,11 @@ class FamilyMemberResponse(BaseModel):
         from_attributes = True
 
 
+class FamilyMembershipExport(FamilyMemberResponse):
+    family_id: str
+    family_name: str
+
+
 class FamilyResponse(BaseModel):
     id: str
     name: str
@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List, Literal, Dict, Any
 from ..models.item import ItemType, ItemPriority
 
 
@@ -15,6 +15,10 @@ class ItemCreate(BaseModel):
     due_date: Optional[datetime] = None
 
 
+class ItemImport(ItemCreate):
+    completed_at: Optional[datetime] = None  # Keeps history when importing finished items
+
+
 class ItemUpdate(BaseModel):
     title: Optional[str] = None
     notes: Optional[str] = None
@@ -35,6 +39,14 @@ class ItemProcess(BaseModel):
     due_date: Optional[datetime] = None
 
 
+class ItemProcessEntry(ItemProcess):
+    id: str
+
+
+class ItemBulkProcess(BaseModel):
+    items: List[ItemProcessEntry] = Field(..., min_length=1, max_length=500)
+
+
 class ItemResponse(BaseModel):
     id: str
     user_id: str
@@ -52,3 +64,47 @@ class ItemResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class ItemPage(BaseModel):
+    items: List[ItemResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
+class ItemBatchOperation(BaseModel):
+    op: Literal["create", "update", "complete", "delete"]
+    id: Optional[str] = None  # Required for update/complete/delete
+    data: Optional[Dict[str, Any]] = None  # ItemCreate for create, ItemUpdate for update
+
+
+class ItemBatchRequest(BaseModel):
+    operations: List[ItemBatchOperation] = Field(..., min_length=1, max_length=500)
+    atomic: bool = False  # Apply nothing if any operation fails
+
+
+class ItemBatchResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[str] = None
+    ok: bool
+    error: Optional[str] = None
+    item: Optional[ItemResponse] = None
+
+
+class ItemBatchResponse(BaseModel):
+    results: List[ItemBatchResult]
+    succeeded: int
+    failed: int
+
+
+class ItemSearchHit(BaseModel):
+    item: ItemResponse
+    rank: float  # Higher is a better match
+    title_highlight: str  # Title with matches wrapped in <mark>
+    snippet: Optional[str] = None  # Best matching fragment of the notes
+
+
+class ItemSearchResults(BaseModel):
+    hits: List[ItemSearchHit]
+    next_offset: Optional[int] = None
@@ -38,6 +38,12 @@ class ProjectResponse(BaseModel):
         from_attributes = True
 
 
+class ProjectPage(BaseModel):
+    projects: List[ProjectResponse]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+
+
 class ProjectWithChildren(ProjectResponse):
     children: List["ProjectWithChildren"] = []
     item_count: int = 0
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
+from .item import ItemResponse
+from .project import ProjectResponse
 
 
 class ReviewCreate(BaseModel):
@@ -13,6 +15,8 @@ class ReviewResponse(BaseModel):
     completed_at: Optional[datetime]
     notes: Optional[str]
     created_at: datetime
+    # Counts from the review snapshot when the review was saved
+    stats: Optional[Dict[str, int]] = None
 
     class Config:
         from_attributes = True
@@ -27,3 +31,29 @@ class ReviewChecklistItem(BaseModel):
 
 class ReviewChecklist(BaseModel):
     items: List[ReviewChecklistItem]
+
+
+class StalledProjectsReport(BaseModel):
+    """Active projects with no open next action"""
+    projects: List[ProjectResponse]
+    generated_at: datetime
+
+
+class ReviewStep(ReviewChecklistItem):
+    count: int = 0
+
+
+class ReviewItemList(BaseModel):
+    items: List[ItemResponse]  # The first page only
+    total: int
+
+
+class ReviewSnapshot(BaseModel):
+    steps: List[ReviewStep]
+    open_items: Dict[str, int]  # By item type
+    overdue_items: Dict[str, int]  # By item type
+    active_projects: Dict[str, int]  # By horizon
+    overdue_waiting_for: ReviewItemList
+    stale_someday: ReviewItemList
+    stalled_projects: List[ProjectResponse]
+    generated_at: datetime
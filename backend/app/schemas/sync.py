@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List
+from .item import ItemResponse
+from .project import ProjectResponse
+from .context import ContextResponse
+
+
+class SyncTombstone(BaseModel):
+    entity_type: str
+    id: str
+    deleted_at: datetime
+
+
+class SyncChanges(BaseModel):
+    items: List[ItemResponse]
+    projects: List[ProjectResponse]
+    contexts: List[ContextResponse]
+    deleted: List[SyncTombstone]
+    next_cursor: str
+    has_more: bool = False
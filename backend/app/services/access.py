@@ -0,0 +1,217 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import event, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+from ..config import get_settings
+from ..database import get_db
+from ..models.family import FamilyMember, FamilyRole
+from ..models.project import Project
+from ..utils.auth import get_current_active_user
+from ..utils.token_cache import UserSnapshot
+from .events import broker
+
+settings = get_settings()
+
+MANAGER_ROLES = (FamilyRole.owner, FamilyRole.admin)
+
+Roles = Dict[str, FamilyRole]
+
+
+def visible_projects(user_id: str, family_ids: Iterable[str], project=Project):
+    """Filter for the projects a user owns or shares through one of `family_ids`
+    (also fits other rows with user_id and family_id, such as tombstones)"""
+    return or_(project.user_id == user_id, project.family_id.in_(list(family_ids)))
+
+
+def memberships(user_id: str, *columns):
+    """SELECT `columns` over the user's own FamilyMember rows"""
+    return select(*columns).where(FamilyMember.user_id == user_id)
+
+
+class RoleCache:
+    """Thread-safe LRU of user id -> {family_id: role}, shared across requests.
+
+    Entries are dropped as soon as one of the user's memberships changes: in
+    this process through the ORM events below, in other workers through the
+    family_member.* change events. The `ttl` only bounds staleness when an
+    event is lost.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[Roles, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced with one isn't cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, user_id: str) -> Optional[Roles]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[1] <= time.monotonic():
+                self._entries.pop(user_id, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, user_id: str, roles: Roles, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[user_id] = (roles, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_ids: Iterable[str]):
+        with self._lock:
+            self.generation += 1
+            for user_id in user_ids:
+                if self._entries.pop(user_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+
+role_cache = (
+    RoleCache(settings.access_cache_size, settings.access_cache_ttl_seconds)
+    if settings.access_cache_ttl_seconds > 0 else None
+)
+
+
+def _on_change_event(channels: Optional[Iterable[str]], change: dict):
+    if channels is None:
+        role_cache.clear()
+    elif change["type"].startswith("family_member."):
+        role_cache.invalidate(change["ids"])
+
+
+if role_cache is not None:
+    broker.add_listener(_on_change_event)
+
+
+def family_roles(db: Session, user_id: str) -> Roles:
+    """The user's {family_id: role}, from the role cache when it has them"""
+    roles = role_cache.get(user_id) if role_cache is not None else None
+    if roles is None:
+        generation = role_cache.generation if role_cache is not None else None
+        rows = db.execute(memberships(user_id, FamilyMember.family_id, FamilyMember.role))
+        roles = {family_id: role for family_id, role in rows}
+        if role_cache is not None:
+            role_cache.put(user_id, roles, generation)
+    return roles
+
+
+def user_family_ids(db: Session, user_id: str) -> List[str]:
+    return list(family_roles(db, user_id))
+
+
+def family_member_ids(db: Session, family_ids: Iterable[str]) -> Set[str]:
+    """Everyone in any of `family_ids`"""
+    return set(db.scalars(select(FamilyMember.user_id).where(FamilyMember.family_id.in_(list(family_ids)))))
+
+
+@event.listens_for(FamilyMember, "after_insert")
+@event.listens_for(FamilyMember, "after_update")
+@event.listens_for(FamilyMember, "after_delete")
+def _membership_changed(mapper, connection, target):
+    if role_cache is None:
+        return
+    role_cache.invalidate([target.user_id])
+    # Invalidate again once the change is visible to other sessions, in case
+    # a concurrent request reloaded the old roles in between
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("access_changed_users", set()).add(target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    changed = session.info.pop("access_changed_users", None)
+    if changed and role_cache is not None:
+        role_cache.invalidate(changed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop("access_changed_users", None)
+
+
+class FamilyAccess:
+    """The current user's family roles, loaded at most once per request.
+
+    Routers declare it as a dependency; FastAPI shares one instance between
+    all dependencies of a request, so every check after the first is free,
+    and with the role cache warm the first one is too.
+    """
+
+    def __init__(self, db: AsyncSession, user: UserSnapshot):
+        self.db = db
+        self.user = user
+        self._roles: Optional[Roles] = None
+
+    async def roles(self) -> Roles:
+        if self._roles is None:
+            self._roles = role_cache.get(self.user.id) if role_cache is not None else None
+        if self._roles is None:
+            self._roles = await self.db.run_sync(family_roles, self.user.id)
+        return self._roles
+
+    async def family_ids(self) -> list:
+        return list(await self.roles())
+
+    async def role(self, family_id: str) -> Optional[FamilyRole]:
+        return (await self.roles()).get(family_id)
+
+    async def require_member(self, family_id: str) -> FamilyRole:
+        role = await self.role(family_id)
+        if role is None:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not a member of this family"
+            )
+        return role
+
+    async def require_manager(self, family_id: str, detail: str) -> FamilyRole:
+        """Require the owner or admin role in the family; `detail` is the 403 message"""
+        role = await self.role(family_id)
+        if role not in MANAGER_ROLES:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+        return role
+
+    async def can_view_project(self, project) -> bool:
+        if project.user_id == self.user.id:
+            return True
+        return project.family_id is not None and await self.role(project.family_id) is not None
+
+
+def get_family_access(
+    db: AsyncSession = Depends(get_db),
+    current_user: UserSnapshot = Depends(get_current_active_user)
+) -> FamilyAccess:
+    return FamilyAccess(db, current_user)
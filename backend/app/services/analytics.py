@@ -0,0 +1,263 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, NamedTuple, Optional
+from sqlalchemy import delete, or_, select, union_all
+from sqlalchemy.orm import Session
+from ..models.analytics import WeeklyRollup
+from ..models.archive import ArchivedItem
+from ..models.item import Item, ItemType
+from ..models.user import User
+from ..schemas.analytics import InboxTimeReport, InboxTimeWeek, ThroughputReport, ThroughputRow
+from .counters import NO_CONTEXT, upsert_statement
+
+ALL = "all"
+CONTEXT = "context"
+PROJECT = "project"
+DIMENSIONS = (ALL, CONTEXT, PROJECT)
+NO_PROJECT = "none"
+
+CAPTURED = "captured"
+COMPLETED = "completed"
+INBOX_TIME_PREFIX = "inbox_time:"
+# Time-in-inbox histogram: bucket name -> upper bound in hours (None = unbounded)
+INBOX_TIME_BUCKETS = {
+    "1h": 1, "4h": 4, "1d": 24, "3d": 72, "1w": 168, "30d": 720, "more": None,
+}
+
+# Rows read and written per backfill round trip
+BACKFILL_BATCH_SIZE = 5000
+
+
+# Item columns read into a RollupState
+ROLLUP_COLUMNS = ("type", "context_id", "project_id", "created_at", "completed_at")
+
+
+class RollupState(NamedTuple):
+    """The columns of an item that decide which rollups it contributes to"""
+    type: ItemType
+    context_id: Optional[str]
+    project_id: Optional[str]
+    created_at: Optional[datetime]
+    completed_at: Optional[datetime]
+
+    @classmethod
+    def of(cls, item) -> "RollupState":
+        return cls(ItemType(item.type), item.context_id, item.project_id, item.created_at, item.completed_at)
+
+
+def week_start(moment) -> date:
+    """Monday of the ISO week containing `moment`"""
+    day = moment.date() if isinstance(moment, datetime) else moment
+    return day - timedelta(days=day.weekday())
+
+
+def dimensions(state: RollupState) -> list:
+    return [
+        ALL,
+        f"{CONTEXT}:{state.context_id or NO_CONTEXT}",
+        f"{PROJECT}:{state.project_id or NO_PROJECT}",
+    ]
+
+
+def inbox_time_bucket(hours: float) -> str:
+    for name, bound in INBOX_TIME_BUCKETS.items():
+        if bound is None or hours <= bound:
+            return name
+
+
+def _contribution(state: RollupState, now: datetime) -> Counter:
+    """What an item adds to the captured/completed rollups in its current state.
+
+    Both are attributed to the item's current context and project, so moving
+    an item moves its history with it and a backfill reproduces the totals.
+    """
+    totals = Counter()
+    captured_week = week_start(state.created_at or now)
+    for dimension in dimensions(state):
+        totals[(captured_week, dimension, CAPTURED)] += 1
+        if state.completed_at is not None:
+            totals[(week_start(state.completed_at), dimension, COMPLETED)] += 1
+    return totals
+
+
+def rollup_delta(before: Optional[RollupState], after: Optional[RollupState], now: datetime) -> Counter:
+    """Rollup changes for one item moving from `before` to `after` (None = absent).
+
+    Deleting an item keeps its history. Time in the inbox is recorded in the
+    week the item leaves the inbox, whether by processing or by completion.
+    """
+    if after is None:
+        return Counter()
+    delta = _contribution(after, now)
+    if before is not None:
+        delta.subtract(_contribution(before, now))
+        left_inbox = after.type != ItemType.inbox or after.completed_at is not None
+        if before.type == ItemType.inbox and before.completed_at is None and left_inbox and before.created_at:
+            hours = (now - before.created_at).total_seconds() / 3600
+            delta[(week_start(now), ALL, INBOX_TIME_PREFIX + inbox_time_bucket(hours))] += 1
+    return delta
+
+
+def apply_rollup_delta(db: Session, user_id: str, delta: Counter):
+    """Add `delta` to the user's weekly rollups in the current transaction"""
+    rows = [
+        {"user_id": user_id, "week": week, "dimension": dimension, "metric": metric, "value": value}
+        for (week, dimension, metric), value in delta.items() if value
+    ]
+    if not rows:
+        return
+    stmt = upsert_statement(db, WeeklyRollup)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[WeeklyRollup.user_id, WeeklyRollup.week, WeeklyRollup.dimension, WeeklyRollup.metric],
+            set_={"value": WeeklyRollup.value + stmt.excluded.value},
+        ),
+        rows,
+    )
+
+
+def rebuild_rollups(db: Session, user_id: str):
+    """Rebuild a user's captured/completed rollups from live and archived items.
+
+    Time in the inbox can't be recovered from the tables, so those rows are
+    kept as they are; items deleted since they were counted drop out.
+    """
+    rows = union_all(
+        select(*(getattr(Item, c) for c in ROLLUP_COLUMNS)).where(Item.user_id == user_id),
+        select(*(getattr(ArchivedItem, c) for c in ROLLUP_COLUMNS)).where(ArchivedItem.user_id == user_id),
+    )
+    now = datetime.utcnow()
+    totals = Counter()
+    for row in db.execute(rows).yield_per(BACKFILL_BATCH_SIZE):
+        totals.update(_contribution(RollupState.of(row), now))
+
+    db.execute(delete(WeeklyRollup).where(
+        WeeklyRollup.user_id == user_id,
+        WeeklyRollup.metric.in_([CAPTURED, COMPLETED])
+    ))
+    apply_rollup_delta(db, user_id, totals)
+    db.commit()
+
+
+def detach_rollups(db: Session, project_id: Optional[str] = None, context_id: Optional[str] = None):
+    """Move rollups of items about to lose a deleted project or context to
+    the "none" dimension, where a backfill would put them afterwards.
+
+    Covers live and archived items of every user, since family members'
+    items can sit in a shared project. Call before the references are nulled.
+    """
+    references = {name: value for name, value in (("project_id", project_id), ("context_id", context_id)) if value}
+    if not references:
+        return
+    rows = union_all(*(
+        select(model.user_id, *(getattr(model, c) for c in ROLLUP_COLUMNS)).where(
+            or_(*(getattr(model, name) == value for name, value in references.items()))
+        )
+        for model in (Item, ArchivedItem)
+    ))
+    now = datetime.utcnow()
+    deltas: Dict[str, Counter] = {}
+    for row in db.execute(rows):
+        before = RollupState.of(row)
+        after = before._replace(**{
+            name: None for name, value in references.items() if getattr(before, name) == value
+        })
+        delta = deltas.setdefault(row.user_id, Counter())
+        delta.update(_contribution(after, now))
+        delta.subtract(_contribution(before, now))
+    for user_id, delta in deltas.items():
+        apply_rollup_delta(db, user_id, delta)
+
+
+def rebuild_all_rollups(db: Session, user_ids: Optional[Iterable[str]] = None) -> int:
+    if user_ids is None:
+        user_ids = [row.id for row in db.query(User.id)]
+    count = 0
+    for user_id in user_ids:
+        rebuild_rollups(db, user_id)
+        count += 1
+    return count
+
+
+# --- Reports -----------------------------------------------------------------
+# Both read only weekly_rollups, so their cost depends on the number of weeks
+# asked for, not on how many items the user has.
+
+def _first_week(weeks: int) -> date:
+    return week_start(datetime.utcnow()) - timedelta(weeks=weeks - 1)
+
+
+def throughput_report(db: Session, user_id: str, weeks: int, dimension: str = ALL) -> ThroughputReport:
+    """Items captured and completed per week, overall or per context/project"""
+    first = _first_week(weeks)
+    query = select(WeeklyRollup.week, WeeklyRollup.dimension, WeeklyRollup.metric, WeeklyRollup.value).where(
+        WeeklyRollup.user_id == user_id,
+        WeeklyRollup.week >= first,
+        WeeklyRollup.metric.in_([CAPTURED, COMPLETED]),
+    )
+    if dimension == ALL:
+        query = query.where(WeeklyRollup.dimension == ALL)
+    else:
+        query = query.where(WeeklyRollup.dimension.startswith(f"{dimension}:"))
+
+    cells: Dict[tuple, Counter] = {}
+    for week, dimension_key, metric, value in db.execute(query):
+        key = None if dimension == ALL else dimension_key.split(":", 1)[1]
+        cells.setdefault((week, key), Counter())[metric] += value
+    if dimension == ALL:
+        # The overall series is dense so charts don't have to fill gaps
+        for offset in range(weeks):
+            cells.setdefault((first + timedelta(weeks=offset), None), Counter())
+
+    rows = [
+        ThroughputRow(week=week, key=key, captured=values[CAPTURED], completed=values[COMPLETED])
+        for (week, key), values in sorted(cells.items(), key=lambda cell: (cell[0][0], cell[0][1] or ""))
+        if dimension == ALL or values[CAPTURED] or values[COMPLETED]
+    ]
+    return ThroughputReport(dimension=dimension, weeks=weeks, rows=rows)
+
+
+def bucket_percentile(buckets: Dict[str, int], fraction: float) -> Optional[float]:
+    """Upper bound (in hours) of the bucket holding the given fraction of
+    items; None when there are no items or it falls in the unbounded bucket"""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    seen = 0
+    for name, bound in INBOX_TIME_BUCKETS.items():
+        seen += buckets.get(name, 0)
+        if seen >= fraction * total:
+            return bound
+    return None
+
+
+def inbox_time_report(db: Session, user_id: str, weeks: int) -> InboxTimeReport:
+    """Items leaving the inbox per week, with time-in-inbox percentiles"""
+    first = _first_week(weeks)
+    histograms: Dict[date, Dict[str, int]] = {first + timedelta(weeks=offset): {} for offset in range(weeks)}
+    overall = Counter()
+    for week, metric, value in db.execute(
+        select(WeeklyRollup.week, WeeklyRollup.metric, WeeklyRollup.value).where(
+            WeeklyRollup.user_id == user_id,
+            WeeklyRollup.week >= first,
+            WeeklyRollup.dimension == ALL,
+            WeeklyRollup.metric.startswith(INBOX_TIME_PREFIX),
+        )
+    ):
+        bucket = metric[len(INBOX_TIME_PREFIX):]
+        histograms.setdefault(week, {})[bucket] = value
+        overall[bucket] += value
+
+    def summary(buckets: Dict[str, int]) -> dict:
+        return {
+            "processed": sum(buckets.values()),
+            "p50_hours": bucket_percentile(buckets, 0.5),
+            "p90_hours": bucket_percentile(buckets, 0.9),
+            "buckets": {name: buckets.get(name, 0) for name in INBOX_TIME_BUCKETS},
+        }
+
+    return InboxTimeReport(
+        weeks=[InboxTimeWeek(week=week, **summary(buckets)) for week, buckets in sorted(histograms.items())],
+        **summary(overall),
+    )
+
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+from sqlalchemy import delete, insert, literal, select, union_all, update
+from sqlalchemy.orm import Session, aliased
+from starlette.concurrency import run_in_threadpool
+from ..config import get_settings
+from ..database import SessionLocal
+from ..models.item import Item
+from ..models.archive import ArchivedItem
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 1000
+ITEM_COLUMNS = [column.name for column in Item.__table__.columns]
+
+
+def _columns(model):
+    return [model.__table__.c[name] for name in ITEM_COLUMNS]
+
+
+def all_items_select(user_id: str):
+    """Live and archived items of one user as a single UNION ALL selectable.
+
+    The user filter sits inside each branch so both halves use their
+    (user_id, ...) indexes.
+    """
+    return union_all(
+        select(*_columns(Item)).where(Item.user_id == user_id),
+        select(*_columns(ArchivedItem)).where(ArchivedItem.user_id == user_id),
+    ).subquery("all_items")
+
+
+def items_with_archive(user_id: str):
+    """An Item alias over live and archived rows, for read-only ORM queries"""
+    return aliased(Item, all_items_select(user_id))
+
+
+def archive_completed_items(
+    db: Session,
+    older_than: timedelta,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    max_batches: Optional[int] = None,
+) -> int:
+    """Move items completed before `older_than` ago into items_archive.
+
+    Works in batches of `batch_size` rows, each copied and deleted in its own
+    short transaction, so writers on the live table are never blocked for
+    long. Returns the number of items moved.
+    """
+    cutoff = datetime.utcnow() - older_than
+    moved = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        # SKIP LOCKED lets several archivers run at once on PostgreSQL
+        ids = [
+            row.id for row in db.query(Item.id).filter(
+                Item.completed_at.isnot(None),
+                Item.completed_at < cutoff
+            ).order_by(Item.completed_at).limit(batch_size).with_for_update(skip_locked=True)
+        ]
+        if not ids:
+            break
+        db.execute(
+            insert(ArchivedItem).from_select(
+                ITEM_COLUMNS + ["archived_at"],
+                select(*_columns(Item), literal(datetime.utcnow())).where(Item.id.in_(ids)),
+            )
+        )
+        db.execute(delete(Item).where(Item.id.in_(ids)))
+        db.commit()
+        moved += len(ids)
+        batches += 1
+    return moved
+
+
+def restore_items(db: Session, user_id: str, item_ids: Iterable[str]) -> int:
+    """Move the user's archived items among `item_ids` back to the live table.
+
+    Called before an archived item is modified; the archiver will pick it up
+    again later if it is still completed. Not committed here.
+    """
+    item_ids = list(item_ids)
+    if not item_ids:
+        return 0
+    owned = ArchivedItem.__table__.c.user_id == user_id
+    restored = db.execute(
+        insert(Item).from_select(
+            ITEM_COLUMNS,
+            select(*_columns(ArchivedItem)).where(owned, ArchivedItem.id.in_(item_ids)),
+        )
+    ).rowcount
+    if restored:
+        db.execute(delete(ArchivedItem).where(owned, ArchivedItem.id.in_(item_ids)))
+    return restored
+
+
+def detach_archived_items(db: Session, project_id: Optional[str] = None, context_id: Optional[str] = None):
+    """Clear archived items' references to a project or context about to be deleted.
+
+    The ORM relationships only null live items. The archive's foreign keys are
+    ON DELETE SET NULL, but databases created before that (and SQLite, which
+    doesn't enforce them here) need it done explicitly.
+    """
+    if project_id:
+        db.execute(update(ArchivedItem).where(ArchivedItem.project_id == project_id).values(project_id=None))
+    if context_id:
+        db.execute(update(ArchivedItem).where(ArchivedItem.context_id == context_id).values(context_id=None))
+
+
+def _archive_once() -> int:
+    db = SessionLocal()
+    try:
+        return archive_completed_items(db, timedelta(days=get_settings().archive_after_days))
+    finally:
+        db.close()
+
+
+async def run_archiver(interval_minutes: int):
+    """Background loop started by the app; each pass runs in a worker thread"""
+    while True:
+        await asyncio.sleep(interval_minutes * 60)
+        try:
+            moved = await run_in_threadpool(_archive_once)
+            if moved:
+                logger.info("Archived %d completed items", moved)
+        except Exception:
+            logger.exception("Archiving completed items failed")
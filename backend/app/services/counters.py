@@ -0,0 +1,197 @@
+from collections import Counter
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+from sqlalchemy import delete, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..database import engine
+from ..models.counter import UserCounter
+from ..models.item import Item, ItemType
+from ..models.project import Project, ProjectStatus
+from ..models.user import User
+from ..schemas.dashboard import DashboardSummary
+
+# Written by a full recompute; users without it have never been counted
+INITIALIZED = "_initialized"
+ACTIVE_PROJECTS = "active_projects"
+CONTEXT_PREFIX = "next_action:context:"
+NO_CONTEXT = "none"
+
+# INSERT ... ON CONFLICT for each supported dialect
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+if engine.dialect.name not in UPSERT_INSERTS:
+    raise RuntimeError(
+        f"Counters need INSERT ... ON CONFLICT, which isn't available for {engine.dialect.name}; "
+        "use PostgreSQL or SQLite"
+    )
+
+
+class ItemState(NamedTuple):
+    """The columns of an item that decide which counters it contributes to"""
+    type: ItemType
+    context_id: Optional[str]
+    completed_at: Optional[datetime]
+
+    @classmethod
+    def of(cls, item) -> "ItemState":
+        return cls(ItemType(item.type), item.context_id, item.completed_at)
+
+
+def item_counter_keys(state: Optional[ItemState]) -> list:
+    if state is None or state.completed_at is not None:
+        return []
+    keys = [state.type.value]
+    if state.type == ItemType.next_action:
+        keys.append(CONTEXT_PREFIX + (state.context_id or NO_CONTEXT))
+    return keys
+
+
+def project_counter_keys(status) -> list:
+    return [ACTIVE_PROJECTS] if status is not None and ProjectStatus(status) == ProjectStatus.active else []
+
+
+def item_delta(before: Optional[ItemState], after: Optional[ItemState]) -> Counter:
+    """Counter changes for one item moving from `before` to `after` (None = absent)"""
+    delta = Counter()
+    for key in item_counter_keys(before):
+        delta[key] -= 1
+    for key in item_counter_keys(after):
+        delta[key] += 1
+    return delta
+
+
+def project_delta(before_status, after_status) -> Counter:
+    delta = Counter()
+    for key in project_counter_keys(before_status):
+        delta[key] -= 1
+    for key in project_counter_keys(after_status):
+        delta[key] += 1
+    return delta
+
+
+def detach_context_counters(db: Session, context_id: str):
+    """Move open next actions of a context about to be deleted to "none".
+
+    Deleting the context nulls their context_id without going through the
+    item write paths, so the counters are moved here. Call it first.
+    """
+    move = item_delta(
+        ItemState(ItemType.next_action, context_id, None),
+        ItemState(ItemType.next_action, None, None),
+    )
+    open_next_actions = db.query(Item.user_id, func.count(Item.id)).filter(
+        Item.context_id == context_id,
+        Item.type == ItemType.next_action,
+        Item.completed_at.is_(None)
+    ).group_by(Item.user_id)
+    for user_id, count in open_next_actions.all():
+        apply_counter_delta(db, user_id, Counter({name: value * count for name, value in move.items()}))
+
+
+def upsert_statement(db: Session, model):
+    """INSERT into `model` in the session's dialect, which supports ON CONFLICT"""
+    return UPSERT_INSERTS[db.get_bind().dialect.name](model)
+
+
+def apply_counter_delta(db: Session, user_id: str, delta: Counter):
+    """Add `delta` to the user's counters in the current transaction.
+
+    One INSERT ... ON CONFLICT DO UPDATE SET value = value + excluded.value
+    covers all keys, so concurrent writers never lose increments.
+    """
+    rows = [{"user_id": user_id, "name": name, "value": value} for name, value in delta.items() if value]
+    if not rows:
+        return
+    stmt = upsert_statement(db, UserCounter)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[UserCounter.user_id, UserCounter.name],
+            set_={"value": UserCounter.value + stmt.excluded.value},
+        ),
+        rows,
+    )
+
+
+def initial_counters(user_id: str) -> UserCounter:
+    """Counters for a new user, who has no items or projects yet"""
+    return UserCounter(user_id=user_id, name=INITIALIZED, value=1)
+
+
+def count_counters(db: Session, user_id: str) -> Counter:
+    """A user's counter values, counted from the items and projects tables"""
+    totals = Counter({INITIALIZED: 1})
+    open_items = db.query(Item.type, Item.context_id, func.count(Item.id)).filter(
+        Item.user_id == user_id,
+        Item.completed_at.is_(None)
+    ).group_by(Item.type, Item.context_id)
+    for type, context_id, count in open_items:
+        for key in item_counter_keys(ItemState(ItemType(type), context_id, None)):
+            totals[key] += count
+
+    totals[ACTIVE_PROJECTS] += db.query(func.count(Project.id)).filter(
+        Project.user_id == user_id,
+        Project.status == ProjectStatus.active
+    ).scalar()
+    return totals
+
+
+def recompute_counters(db: Session, user_id: str):
+    """Rebuild a user's counters from the items and projects tables (drift repair).
+
+    Item writers are held off until the new values are committed, so an
+    increment can neither be counted twice nor lost. On PostgreSQL that takes
+    a table lock which only conflicts with writes; on SQLite the DELETE,
+    issued before counting, takes the database's single write lock.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE user_counters IN SHARE ROW EXCLUSIVE MODE"))
+    db.execute(delete(UserCounter).where(UserCounter.user_id == user_id))
+    totals = count_counters(db, user_id)
+    db.add_all([UserCounter(user_id=user_id, name=name, value=value) for name, value in totals.items() if value])
+    db.commit()
+
+
+def recompute_all_counters(db: Session, user_ids: Optional[Iterable[str]] = None) -> int:
+    if user_ids is None:
+        user_ids = [row.id for row in db.query(User.id)]
+    count = 0
+    for user_id in user_ids:
+        recompute_counters(db, user_id)
+        count += 1
+    return count
+
+
+def get_summary(db: Session, user_id: str) -> DashboardSummary:
+    counters = {
+        row.name: row.value
+        for row in db.query(UserCounter.name, UserCounter.value).filter(UserCounter.user_id == user_id)
+    }
+    if INITIALIZED not in counters:
+        # A user from before the counters table whom neither migration 011 nor
+        # `recount` has reached. Count live rather than write from a read,
+        # which would race the user's item writes.
+        counters = count_counters(db, user_id)
+
+    # Overdue depends on the clock, so it can't be kept as a counter; it is a
+    # range count over the partial (user_id, due_date) index of open items
+    overdue = db.query(func.count(Item.id)).filter(
+        Item.user_id == user_id,
+        Item.completed_at.is_(None),
+        Item.due_date < datetime.utcnow()
+    ).scalar()
+
+    return DashboardSummary(
+        inbox=counters.get(ItemType.inbox.value, 0),
+        next_actions=counters.get(ItemType.next_action.value, 0),
+        next_actions_by_context={
+            name[len(CONTEXT_PREFIX):]: value
+            for name, value in counters.items()
+            if name.startswith(CONTEXT_PREFIX) and value
+        },
+        waiting_for=counters.get(ItemType.waiting_for.value, 0),
+        scheduled=counters.get(ItemType.scheduled.value, 0),
+        someday=counters.get(ItemType.someday.value, 0),
+        reference=counters.get(ItemType.reference.value, 0),
+        overdue=overdue,
+        active_projects=counters.get(ACTIVE_PROJECTS, 0),
+    )
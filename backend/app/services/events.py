@@ -0,0 +1,323 @@
+import asyncio
+import json
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..config import get_settings
+from ..models.project import Project
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Sent in place of whatever a slow subscriber missed: refetch instead of catching up
+RESYNC = {"type": "resync"}
+
+
+def user_channel(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+def family_channel(family_id: str) -> str:
+    return f"family:{family_id}"
+
+
+class Subscription:
+    """One stream connection's bounded buffer of pending events.
+
+    Publishers never wait on a subscriber: when the buffer is full, the
+    backlog is dropped and replaced by a single resync event, so a slow or
+    stalled client costs at most `buffer_size` events of memory.
+    """
+
+    def __init__(self, channels: Iterable[str], buffer_size: int):
+        self.channels: Set[str] = set(channels)
+        self._queue: asyncio.Queue = asyncio.Queue(buffer_size)
+        self.dropped = 0
+
+    def offer(self, event: dict):
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                if self._queue.get_nowait() is not RESYNC:
+                    self.dropped += 1
+            self._queue.put_nowait(RESYNC)
+            self.dropped += 1
+
+    async def get(self, timeout: float) -> Optional[dict]:
+        """The next event, or None after `timeout` seconds without one"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """In-process pub/sub: events go straight to this process's subscribers.
+
+    Only correct with a single worker. Cross-worker brokers override
+    `publish` to send events through a shared transport, and call `deliver`
+    for every event they receive from it (including their own).
+    """
+
+    name = "local"
+
+    def __init__(self, buffer_size: int):
+        self.buffer_size = buffer_size
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._listeners: List[Callable[[Iterable[str], dict], None]] = []
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def add_listener(self, listener: Callable[[Optional[Iterable[str]], dict], None]):
+        """Call `listener(channels, event)` for every event this process receives,
+        e.g. to drop cached data the event makes stale. After a gap in delivery
+        it gets `(None, RESYNC)` and should drop everything."""
+        self._listeners.append(listener)
+
+    def _notify_listeners(self, channels: Optional[Iterable[str]], event: dict):
+        for listener in self._listeners:
+            try:
+                listener(channels, event)
+            except Exception:
+                logger.exception("Event listener failed on %s", event.get("type"))
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels, self.buffer_size)
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def resubscribe(self, subscription: Subscription, channels: Iterable[str]):
+        self.unsubscribe(subscription)
+        subscription.channels = set(channels)
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+        self.dropped += subscription.dropped
+        subscription.dropped = 0
+
+    def deliver(self, channels: Iterable[str], event: dict):
+        self._notify_listeners(channels, event)
+        # A subscriber on several of the channels still gets the event once
+        targets = set()
+        for channel in channels:
+            targets.update(self._channels.get(channel, ()))
+        for subscription in targets:
+            subscription.offer(event)
+        self.delivered += len(targets)
+
+    def resync_all(self):
+        """Tell listeners and every subscriber in this process that events may
+        have been missed"""
+        self._notify_listeners(None, RESYNC)
+        subscriptions = self._subscriptions()
+        for subscription in subscriptions:
+            subscription.offer(RESYNC)
+        self.delivered += len(subscriptions)
+
+    async def publish(self, channels: Iterable[str], event: dict):
+        self.published += 1
+        self.deliver(channels, event)
+
+    def _subscriptions(self) -> Set[Subscription]:
+        subscriptions = set()
+        for subscribers in self._channels.values():
+            subscriptions.update(subscribers)
+        return subscriptions
+
+    def stats(self) -> dict:
+        subscriptions = self._subscriptions()
+        return {
+            "broker": self.name,
+            "subscriptions": len(subscriptions),
+            "channels": len(self._channels),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped + sum(s.dropped for s in subscriptions),
+        }
+
+
+class PostgresBroker(EventBroker):
+    """Shares events between workers through PostgreSQL LISTEN/NOTIFY on one
+    dedicated asyncpg connection per process.
+
+    If that connection drops it is re-established in the background; events
+    sent meanwhile never arrive, so once back every local listener and
+    subscriber is told to resync.
+    """
+
+    name = "postgres"
+    CHANNEL = "gtd_events"
+    # pg_notify rejects payloads of 8000 bytes or more
+    MAX_PAYLOAD_BYTES = 7999
+    RECONNECT_MAX_DELAY_SECONDS = 30
+
+    def __init__(self, buffer_size: int, database_url: str):
+        super().__init__(buffer_size)
+        self.dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        self._connection = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self.reconnects = 0
+
+    async def start(self):
+        await self._connect()
+
+    async def stop(self):
+        if self._reconnect_task is not None:
+            self._reconnect_task.cancel()
+            self._reconnect_task = None
+        connection, self._connection = self._connection, None
+        if connection is not None:
+            await connection.close()
+
+    async def _connect(self):
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(self.CHANNEL, self._on_notify)
+        connection.add_termination_listener(self._on_terminate)
+        self._connection = connection
+
+    def _on_terminate(self, connection):
+        if connection is not self._connection:
+            return  # Closed by stop()
+        self._connection = None
+        logger.warning("Event broker lost its PostgreSQL connection; reconnecting")
+        self._reconnect_task = asyncio.get_running_loop().create_task(self._reconnect())
+
+    async def _reconnect(self):
+        delay = 1
+        while True:
+            try:
+                await self._connect()
+            except Exception:
+                logger.warning("Event broker reconnect failed; retrying in %ss", delay, exc_info=True)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RECONNECT_MAX_DELAY_SECONDS)
+                continue
+            self.reconnects += 1
+            self._reconnect_task = None
+            self.resync_all()
+            return
+
+    def _on_notify(self, connection, pid, channel, payload):
+        message = json.loads(payload)
+        self.deliver(message["channels"], message["event"])
+
+    def _payloads(self, channels: List[str], event: dict) -> List[str]:
+        """NOTIFY payloads for the event, splitting its ids (then its channels)
+        across several notifications when one would be too large"""
+        payload = json.dumps({"channels": channels, "event": event})
+        if len(payload.encode()) <= self.MAX_PAYLOAD_BYTES:
+            return [payload]
+        ids = event.get("ids") or []
+        if len(ids) > 1:
+            half = len(ids) // 2
+            return (self._payloads(channels, {**event, "ids": ids[:half]}) +
+                    self._payloads(channels, {**event, "ids": ids[half:]}))
+        if len(channels) > 1:
+            half = len(channels) // 2
+            return self._payloads(channels[:half], event) + self._payloads(channels[half:], event)
+        raise ValueError(f"Event {event.get('type')} does not fit in a NOTIFY payload")
+
+    async def publish(self, channels: Iterable[str], event: dict):
+        self.published += 1
+        channels = sorted(channels)
+        payloads = self._payloads(channels, event)
+        try:
+            if self._connection is None:
+                raise ConnectionError("Event broker is reconnecting to PostgreSQL")
+            async with self._lock:
+                for payload in payloads:
+                    await self._connection.execute("SELECT pg_notify($1, $2)", self.CHANNEL, payload)
+        except Exception:
+            # Other workers miss this event; this process's subscribers needn't
+            self.deliver(channels, event)
+            raise
+
+    def stats(self) -> dict:
+        return {**super().stats(), "connected": self._connection is not None, "reconnects": self.reconnects}
+
+
+def create_broker() -> EventBroker:
+    if settings.event_broker == "postgres":
+        return PostgresBroker(settings.event_buffer_size, settings.database_url)
+    if settings.event_broker != "local":
+        raise ValueError(f"Unknown event broker: {settings.event_broker}")
+    return EventBroker(settings.event_buffer_size)
+
+
+broker = create_broker()
+
+
+async def publish(entity: str, op: str, ids: Iterable[str], actor_id: str, channels: Iterable[str]):
+    """Push a compact change notice; clients refetch the ids they care about.
+
+    Called after commit. A broker failure is logged rather than failing the
+    write that has already happened.
+    """
+    event = {
+        "type": f"{entity}.{op}",
+        "ids": list(ids),
+        "actor": actor_id,
+        "at": datetime.utcnow().isoformat(),
+    }
+    try:
+        await broker.publish(set(channels), event)
+    except Exception:
+        logger.exception("Publishing %s failed", event["type"])
+
+
+async def project_families(db: AsyncSession, project_ids: Iterable[Optional[str]]) -> Set[str]:
+    project_ids = {p for p in project_ids if p}
+    if not project_ids:
+        return set()
+    rows = await db.scalars(
+        select(Project.family_id).where(Project.id.in_(project_ids), Project.family_id.isnot(None))
+    )
+    return set(rows)
+
+
+async def publish_items(
+    db: AsyncSession,
+    op: str,
+    actor_id: str,
+    ids: Iterable[str],
+    project_ids: Iterable[Optional[str]] = (),
+    assignees: Iterable[Optional[str]] = (),
+):
+    """Publish a change to the owner's items, scoped to the owner, the assignees
+    and the families owning `project_ids` (include any project an item left)"""
+    ids = list(ids)
+    if not ids:
+        return
+    channels = {user_channel(actor_id)}
+    channels.update(user_channel(user_id) for user_id in assignees if user_id)
+    channels.update(family_channel(family_id) for family_id in await project_families(db, project_ids))
+    await publish("item", op, ids, actor_id, channels)
+
+
+async def publish_project(op: str, actor_id: str, project, family_ids: Iterable[Optional[str]] = ()):
+    channels = {user_channel(project.user_id)}
+    channels.update(family_channel(f) for f in {project.family_id, *family_ids} if f)
+    await publish("project", op, [project.id], actor_id, channels)
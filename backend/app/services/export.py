@@ -0,0 +1,138 @@
+import csv
+import io
+import json
+import zlib
+from typing import Iterator, List, Type
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.project import Project
+from ..models.context import Context
+from ..models.review import WeeklyReview
+from ..models.family import Family, FamilyMember
+from ..models.user import User
+from ..schemas.item import ItemResponse
+from .access import memberships
+from .archive import all_items_select
+from ..schemas.project import ProjectResponse
+from ..schemas.context import ContextResponse
+from ..schemas.review import ReviewResponse
+from ..schemas.family import FamilyMembershipExport
+
+# Rows fetched per round trip from the server-side cursor
+YIELD_PER = 500
+# Bytes buffered before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+
+def _items(user_id: str):
+    items = all_items_select(user_id)
+    return select(items).order_by(items.c.created_at, items.c.id)
+
+
+def _projects(user_id: str):
+    return select(Project.__table__).where(Project.user_id == user_id).order_by(Project.created_at, Project.id)
+
+
+def _contexts(user_id: str):
+    return select(Context.__table__).where(Context.user_id == user_id).order_by(Context.name, Context.id)
+
+
+def _reviews(user_id: str):
+    return select(WeeklyReview.__table__).where(
+        WeeklyReview.user_id == user_id
+    ).order_by(WeeklyReview.created_at, WeeklyReview.id)
+
+
+def _family_memberships(user_id: str):
+    return memberships(
+        user_id,
+        FamilyMember.id,
+        FamilyMember.user_id,
+        FamilyMember.role,
+        FamilyMember.joined_at,
+        FamilyMember.family_id,
+        Family.name.label("family_name"),
+        User.name.label("user_name"),
+        User.email.label("user_email"),
+    ).join(Family, Family.id == FamilyMember.family_id).join(
+        User, User.id == FamilyMember.user_id
+    ).order_by(FamilyMember.joined_at, FamilyMember.id)
+
+
+# entity name -> (NDJSON record type, query, response schema)
+# Referenced rows come first so an export can be fed straight back into /import
+EXPORTS = {
+    "contexts": ("context", _contexts, ContextResponse),
+    "projects": ("project", _projects, ProjectResponse),
+    "items": ("item", _items, ItemResponse),
+    "reviews": ("review", _reviews, ReviewResponse),
+    "family_memberships": ("family_membership", _family_memberships, FamilyMembershipExport),
+}
+
+
+def _rows(db: Session, entity: str, user_id: str) -> Iterator[dict]:
+    _, query, schema = EXPORTS[entity]
+    # yield_per streams through a server-side cursor where the driver has one
+    result = db.execute(query(user_id).execution_options(yield_per=YIELD_PER))
+    for row in result:
+        yield schema.model_validate(row).model_dump(mode="json")
+
+
+def _ndjson_lines(db: Session, user_id: str, entities: List[str]) -> Iterator[str]:
+    for entity in entities:
+        record_type = EXPORTS[entity][0]
+        for data in _rows(db, entity, user_id):
+            yield json.dumps({"type": record_type, "data": data}, separators=(",", ":")) + "\n"
+
+
+def _csv_lines(db: Session, user_id: str, entity: str) -> Iterator[str]:
+    schema: Type[BaseModel] = EXPORTS[entity][2]
+    fields = list(schema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    for data in _rows(db, entity, user_id):
+        writer.writerow(data)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_export(user_id: str, format: str, entities: List[str], compress: bool) -> Iterator[bytes]:
+    """Yield the export in ~64KB chunks, optionally gzipped on the fly.
+
+    Runs on its own session because the response body is produced after the
+    request's dependencies have been torn down. Memory stays bounded by the
+    cursor batch plus one chunk, whatever the number of rows.
+    """
+    db = SessionLocal()
+    try:
+        if format == "csv":
+            lines = _csv_lines(db, user_id, entities[0])
+        else:
+            lines = _ndjson_lines(db, user_id, entities)
+
+        compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS) if compress else None
+        pending: List[bytes] = []
+        size = 0
+        for line in lines:
+            data = line.encode()
+            pending.append(data)
+            size += len(data)
+            if size >= CHUNK_SIZE:
+                chunk = b"".join(pending)
+                pending, size = [], 0
+                chunk = compressor.compress(chunk) if compressor else chunk
+                if chunk:
+                    yield chunk
+
+        chunk = b"".join(pending)
+        if compressor:
+            chunk = compressor.compress(chunk) + compressor.flush()
+        if chunk:
+            yield chunk
+    finally:
+        db.close()
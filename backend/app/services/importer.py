@@ -0,0 +1,373 @@
+import codecs
+import csv
+import json
+from collections import Counter
+from datetime import datetime
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.item import Item, ItemType, generate_uuid
+from ..models.project import Project
+from ..models.context import Context
+from ..schemas.item import ItemImport
+from ..schemas.project import ProjectCreate
+from ..schemas.context import ContextCreate
+from .access import family_member_ids, user_family_ids, visible_projects
+from .analytics import RollupState, apply_rollup_delta, rollup_delta
+from .counters import ItemState, apply_counter_delta, item_delta, project_delta
+
+# Rows validated, inserted and committed together
+CHUNK_SIZE = 1000
+# Per-row errors reported individually; later ones are only counted
+MAX_REPORTED_ERRORS = 1000
+READ_SIZE = 64 * 1024
+
+Record = Tuple[str, dict]  # (kind, fields)
+
+
+class ImportFormatError(ValueError):
+    """The upload can't be parsed any further"""
+
+
+# --- Parsing -----------------------------------------------------------------
+
+def _text(stream: IO[bytes]) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(chunk)
+
+
+def _lines(stream: IO[bytes]) -> Iterator[str]:
+    # Line endings are kept so csv can reassemble quoted multi-line fields
+    pending = ""
+    for text in _text(stream):
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+
+def _json_array(stream: IO[bytes]) -> Iterator[object]:
+    """Yield the elements of a top-level JSON array without loading it whole"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    started = False
+    for text in _text(stream):
+        buffer += text
+        while True:
+            buffer = buffer.lstrip()
+            if not buffer:
+                break
+            if not started:
+                if buffer[0] != "[":
+                    raise ImportFormatError("Expected a JSON array of records")
+                buffer, started = buffer[1:], True
+            elif buffer[0] == ",":
+                buffer = buffer[1:]
+            elif buffer[0] == "]":
+                return
+            else:
+                try:
+                    value, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    break  # Element continues in the next read
+                yield value
+                buffer = buffer[end:]
+    raise ImportFormatError("Unterminated JSON array")
+
+
+def _record(value: object) -> Record:
+    """Accept both export records ({"type", "data"}) and plain item objects"""
+    if not isinstance(value, dict):
+        return "invalid", {}
+    if isinstance(value.get("data"), dict) and "type" in value:
+        return str(value["type"]), value["data"]
+    return str(value.pop("kind", "item")), value
+
+
+def _csv_records(stream: IO[bytes]) -> Iterator[Record]:
+    for row in csv.DictReader(_lines(stream)):
+        row = {key: value for key, value in row.items() if key and value not in (None, "")}
+        yield str(row.pop("kind", "item")), row
+
+
+def _todoist_records(stream: IO[bytes], project_name: Optional[str]) -> Iterator[Record]:
+    """Map a Todoist CSV template (TYPE, CONTENT, DESCRIPTION, PRIORITY, DATE, ...)"""
+    if project_name:
+        yield "project", {"name": project_name}
+    section = None
+    for row in csv.DictReader(_lines(stream)):
+        kind = (row.get("TYPE") or "").strip().lower()
+        content = (row.get("CONTENT") or "").strip()
+        if kind == "section" and content:
+            section = content
+            yield "project", {"name": section, "parent": project_name} if project_name else {"name": section}
+        elif kind == "task" and content:
+            fields = {"title": content, "notes": (row.get("DESCRIPTION") or "").strip() or None}
+            priority = (row.get("PRIORITY") or "").strip()
+            if priority in ("1", "2", "3", "4"):
+                fields["priority"] = f"p{priority}"  # Todoist CSV priority 1 is the most urgent
+            due = (row.get("DATE") or "").strip()
+            if due:
+                try:
+                    fields["due_date"] = datetime.fromisoformat(due)
+                except ValueError:
+                    # Natural-language dates ("every monday") don't map; keep them readable
+                    fields["notes"] = "\n".join(filter(None, [fields["notes"], f"Due: {due}"]))
+            if section or project_name:
+                fields["project"] = section or project_name
+            yield "item", fields
+        else:
+            yield "skip", {}
+
+
+def parse_records(stream: IO[bytes], format: str, project_name: Optional[str] = None) -> Iterator[Record]:
+    if format == "csv":
+        yield from _csv_records(stream)
+    elif format == "todoist":
+        yield from _todoist_records(stream, project_name)
+    elif format == "ndjson":
+        for line in _lines(stream):
+            if not line.strip():
+                continue
+            try:
+                yield _record(json.loads(line))
+            except json.JSONDecodeError as e:
+                yield "invalid", {"error": f"Invalid JSON: {e.msg}"}
+    elif format == "json":
+        for value in _json_array(stream):
+            yield _record(value)
+
+
+# --- Loading -----------------------------------------------------------------
+
+class _Importer:
+    """Validates records in chunks and writes each chunk with bulk INSERTs.
+
+    Project and context names and ids are resolved through caches loaded once
+    per import, so resolving a row never costs a query. Ids from an earlier
+    export are remapped to the new rows, so an export can be re-imported.
+    """
+
+    def __init__(self, db: Session, user_id: str, default_type: str, create_missing: bool):
+        self.db = db
+        self.user_id = user_id
+        self.default_type = default_type
+        self.create_missing = create_missing
+
+        self.projects_by_name: Dict[str, str] = {}
+        self.project_ids = set()
+        family_ids = user_family_ids(db, user_id)
+        for project in db.query(Project.id, Project.name, Project.user_id).filter(
+            visible_projects(user_id, family_ids)
+        ):
+            self.project_ids.add(project.id)
+            if project.user_id == user_id:
+                self.projects_by_name.setdefault(project.name.lower(), project.id)
+
+        self.contexts_by_name: Dict[str, str] = {}
+        self.context_ids = set()
+        for context in db.query(Context.id, Context.name).filter(Context.user_id == user_id):
+            self.context_ids.add(context.id)
+            self.contexts_by_name.setdefault(context.name.lower(), context.id)
+
+        self.assignable_ids = {user_id} | family_member_ids(db, family_ids)
+        self.id_map: Dict[str, str] = {}  # id in the source file -> new id
+
+        self.new_projects: List[dict] = []
+        self.new_contexts: List[dict] = []
+        self.new_items: List[dict] = []
+        self.counts = {"items": 0, "projects": 0, "contexts": 0, "skipped": 0}
+
+    def _project(self, name: str) -> str:
+        key = name.strip().lower()
+        if key not in self.projects_by_name:
+            if not self.create_missing:
+                raise ValueError(f"Unknown project: {name}")
+            self._add_project({"name": name.strip()})
+        return self.projects_by_name[key]
+
+    def _context(self, name: str) -> str:
+        key = name.strip().lower()
+        if key not in self.contexts_by_name:
+            if not self.create_missing:
+                raise ValueError(f"Unknown context: {name}")
+            self._add_context({"name": name.strip()})
+        return self.contexts_by_name[key]
+
+    def _reference(self, value: str, known: set, label: str) -> str:
+        value = self.id_map.get(value, value)
+        if value not in known:
+            raise ValueError(f"Unknown {label}: {value}")
+        return value
+
+    def _add_project(self, fields: dict, source_id: Optional[str] = None):
+        parent = fields.pop("parent", None)
+        if parent:
+            fields["parent_id"] = self._project(parent)
+        data = ProjectCreate.model_validate(fields)
+        if data.parent_id:
+            data.parent_id = self._reference(data.parent_id, self.project_ids, "parent project")
+        if data.family_id:
+            # Shared projects are created through the families API, not by import
+            data.family_id = None
+        project_id = generate_uuid()
+        self.new_projects.append({"id": project_id, "user_id": self.user_id, **data.model_dump()})
+        self.project_ids.add(project_id)
+        self.projects_by_name.setdefault(data.name.lower(), project_id)
+        if source_id:
+            self.id_map[source_id] = project_id
+
+    def _add_context(self, fields: dict, source_id: Optional[str] = None):
+        data = ContextCreate.model_validate(fields)
+        context_id = generate_uuid()
+        self.new_contexts.append({"id": context_id, "user_id": self.user_id, **data.model_dump()})
+        self.context_ids.add(context_id)
+        self.contexts_by_name.setdefault(data.name.lower(), context_id)
+        if source_id:
+            self.id_map[source_id] = context_id
+
+    def _add_item(self, fields: dict):
+        project, context = fields.pop("project", None), fields.pop("context", None)
+        fields.setdefault("type", self.default_type)
+        data = ItemImport.model_validate(fields)
+        if project:
+            data.project_id = self._project(project)
+        elif data.project_id:
+            data.project_id = self._reference(data.project_id, self.project_ids, "project")
+        if context:
+            data.context_id = self._context(context)
+        elif data.context_id:
+            data.context_id = self._reference(data.context_id, self.context_ids, "context")
+        if data.assigned_to and data.assigned_to not in self.assignable_ids:
+            raise ValueError(f"Unknown assignee: {data.assigned_to}")
+        self.new_items.append({"id": generate_uuid(), "user_id": self.user_id, **data.model_dump()})
+
+    def add(self, kind: str, fields: dict):
+        fields = dict(fields)
+        source_id = fields.pop("id", None)
+        if kind == "item":
+            self._add_item(fields)
+        elif kind == "project":
+            name = str(fields.get("name", "")).strip().lower()
+            if name and name in self.projects_by_name:
+                # Already there (or created earlier in this import): reuse it
+                if source_id:
+                    self.id_map[source_id] = self.projects_by_name[name]
+                self.counts["skipped"] += 1
+            else:
+                self._add_project(fields, source_id)
+        elif kind == "context":
+            name = str(fields.get("name", "")).strip().lower()
+            if name and name in self.contexts_by_name:
+                if source_id:
+                    self.id_map[source_id] = self.contexts_by_name[name]
+                self.counts["skipped"] += 1
+            else:
+                self._add_context(fields, source_id)
+        elif kind == "invalid":
+            raise ValueError(fields.get("error", "Record must be a JSON object"))
+        else:
+            # Reviews, family memberships and Todoist notes have no import target
+            self.counts["skipped"] += 1
+
+    @property
+    def pending(self) -> int:
+        return len(self.new_items) + len(self.new_projects) + len(self.new_contexts)
+
+    def flush(self):
+        # Referenced rows first, so foreign keys hold on PostgreSQL
+        if self.new_contexts:
+            self.db.execute(insert(Context), self.new_contexts)
+        if self.new_projects:
+            self.db.execute(insert(Project), self.new_projects)
+        if self.new_items:
+            self.db.execute(insert(Item), self.new_items)
+
+        now = datetime.utcnow()
+        delta = Counter()
+        rollups = Counter()
+        for row in self.new_projects:
+            delta.update(project_delta(None, row["status"]))
+        for row in self.new_items:
+            item_type = ItemType(row["type"])
+            delta.update(item_delta(None, ItemState(item_type, row["context_id"], row["completed_at"])))
+            # Rows are stamped created_at=now on insert; completed_at keeps its history
+            rollups.update(rollup_delta(
+                None, RollupState(item_type, row["context_id"], row["project_id"], None, row["completed_at"]), now
+            ))
+        apply_counter_delta(self.db, self.user_id, delta)
+        apply_rollup_delta(self.db, self.user_id, rollups)
+        self.db.commit()
+        self.counts["contexts"] += len(self.new_contexts)
+        self.counts["projects"] += len(self.new_projects)
+        self.counts["items"] += len(self.new_items)
+        self.new_contexts, self.new_projects, self.new_items = [], [], []
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, ValidationError):
+        first = error.errors()[0]
+        location = ".".join(str(part) for part in first["loc"])
+        return f"{location}: {first['msg']}" if location else first["msg"]
+    return str(error)
+
+
+def run_import(
+    stream: IO[bytes],
+    user_id: str,
+    format: str,
+    project_name: Optional[str] = None,
+    default_type: str = "inbox",
+    create_missing: bool = True,
+) -> Iterator[dict]:
+    """Import records from `stream`, yielding NDJSON-ready progress events.
+
+    Emits an "error" event per rejected row, a "progress" event after each
+    committed chunk, and finally "done" (or "failed" if the file can't be parsed
+    further). Chunks already committed stay imported.
+    """
+    db = SessionLocal()
+    try:
+        importer = _Importer(db, user_id, default_type, create_missing)
+        rows = errors = 0
+
+        def progress(event: str) -> dict:
+            return {"event": event, "rows": rows, "errors": errors, **importer.counts}
+
+        try:
+            for kind, fields in parse_records(stream, format, project_name):
+                rows += 1
+                try:
+                    importer.add(kind, fields)
+                except (ValidationError, ValueError) as e:
+                    errors += 1
+                    if errors <= MAX_REPORTED_ERRORS:
+                        yield {"event": "error", "row": rows, "error": _error_message(e)}
+                if importer.pending >= CHUNK_SIZE:
+                    importer.flush()
+                    yield progress("progress")
+            importer.flush()
+        except ImportFormatError as e:
+            importer.flush()
+            yield {**progress("failed"), "error": str(e)}
+            return
+        except SQLAlchemyError:
+            db.rollback()
+            yield {**progress("failed"), "error": f"Database rejected the chunk ending at row {rows}"}
+            return
+
+        yield progress("done")
+    finally:
+        db.close()
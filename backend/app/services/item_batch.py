@@ -0,0 +1,269 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import Session
+from ..models.item import Item, ItemType, generate_uuid
+from ..models.project import Project
+from ..models.context import Context
+from ..schemas.item import (
+    ItemCreate, ItemUpdate, ItemResponse, ItemBatchOperation, ItemBatchResult, ItemProcessEntry,
+)
+from .access import user_family_ids, visible_projects
+from .analytics import RollupState, apply_rollup_delta, rollup_delta
+from .archive import restore_items
+from .counters import ItemState, apply_counter_delta, item_delta
+from .sync import record_tombstones
+
+# Optional ItemProcess fields; like process_item, only the ones provided are applied
+PROCESS_FIELDS = ("project_id", "context_id", "assigned_to", "priority", "due_date")
+
+
+def _counted(state: Optional[RollupState]) -> Optional[ItemState]:
+    return ItemState.of(state) if state is not None else None
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    location = ".".join(str(part) for part in first["loc"])
+    return f"{location}: {first['msg']}" if location else first["msg"]
+
+
+def apply_item_batch(
+    db: Session,
+    user_id: str,
+    operations: List[ItemBatchOperation],
+    atomic: bool = False,
+) -> List[ItemBatchResult]:
+    """Apply a list of item mutations in one transaction.
+
+    Operations are validated up front and ownership of every referenced item is
+    checked with a single IN query. Valid operations are then applied as one
+    INSERT, one UPDATE per distinct column set, one completing UPDATE and one
+    DELETE, followed by a single commit. Invalid operations are reported in
+    their result and skipped, unless `atomic` is set, in which case nothing is
+    written.
+    """
+    results = [ItemBatchResult(index=i, op=op.op, id=op.id, ok=True) for i, op in enumerate(operations)]
+
+    def fail(index: int, message: str):
+        results[index].ok = False
+        results[index].error = message
+
+    referenced_ids = {op.id for op in operations if op.op != "create" and op.id}
+    owned: Dict[str, RollupState] = {}
+    if referenced_ids:
+        restore_items(db, user_id, referenced_ids)
+        owned = {
+            row.id: RollupState.of(row) for row in db.query(
+                Item.id, Item.type, Item.context_id, Item.project_id, Item.created_at, Item.completed_at
+            ).filter(
+                Item.user_id == user_id,
+                Item.id.in_(referenced_ids)
+            )
+        }
+
+    creates: List[dict] = []
+    updates: Dict[str, dict] = {}
+    complete_ids: List[str] = []
+    delete_ids: List[str] = []
+
+    for i, op in enumerate(operations):
+        if op.op == "create":
+            try:
+                item_data = ItemCreate.model_validate(op.data or {})
+            except ValidationError as e:
+                fail(i, _validation_message(e))
+                continue
+            item_id = generate_uuid()
+            results[i].id = item_id
+            creates.append({"id": item_id, "user_id": user_id, **item_data.model_dump()})
+            continue
+
+        if not op.id:
+            fail(i, "id is required")
+            continue
+        if op.id not in owned:
+            fail(i, "Item not found")
+            continue
+        if op.id in delete_ids:
+            fail(i, "Item is deleted earlier in this batch")
+            continue
+
+        if op.op == "update":
+            try:
+                item_data = ItemUpdate.model_validate(op.data or {})
+            except ValidationError as e:
+                fail(i, _validation_message(e))
+                continue
+            # Several updates to one item collapse into a single row, later ops winning
+            updates.setdefault(op.id, {"id": op.id}).update(item_data.model_dump(exclude_unset=True))
+        elif op.op == "complete":
+            complete_ids.append(op.id)
+        elif op.op == "delete":
+            delete_ids.append(op.id)
+
+    failed = [r for r in results if not r.ok]
+    if atomic and failed:
+        for r in results:
+            if r.ok:
+                fail(r.index, "Not applied: another operation in this atomic batch failed")
+        return results
+
+    now = datetime.utcnow()
+    delta = Counter()
+    rollups = Counter()
+    for row in creates:
+        delta.update(item_delta(None, ItemState(ItemType(row["type"]), row["context_id"], None)))
+        rollups.update(rollup_delta(
+            None, RollupState(ItemType(row["type"]), row["context_id"], row["project_id"], None, None), now
+        ))
+    for item_id in set(updates) | set(complete_ids) | set(delete_ids):
+        before = after = owned[item_id]
+        if item_id in updates:
+            changes = updates[item_id]
+            after = after._replace(
+                type=ItemType(changes.get("type") or after.type),
+                context_id=changes.get("context_id", after.context_id),
+                project_id=changes.get("project_id", after.project_id),
+            )
+        if item_id in complete_ids:
+            after = after._replace(completed_at=now)
+        if item_id in delete_ids:
+            after = None
+        delta.update(item_delta(_counted(before), _counted(after)))
+        rollups.update(rollup_delta(before, after, now))
+    apply_counter_delta(db, user_id, delta)
+    apply_rollup_delta(db, user_id, rollups)
+
+    if creates:
+        db.execute(insert(Item), creates)
+    # ORM bulk UPDATE by primary key; rows whose only key is "id" have nothing to set
+    update_rows = [row for row in updates.values() if len(row) > 1]
+    if update_rows:
+        db.execute(update(Item), update_rows)
+    if complete_ids:
+        db.execute(
+            update(Item)
+            .where(Item.id.in_(complete_ids))
+            .values(completed_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    if delete_ids:
+        record_tombstones(db, "item", db.query(Item.id, Item.user_id).filter(Item.id.in_(delete_ids)))
+        db.execute(
+            delete(Item)
+            .where(Item.id.in_(delete_ids))
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+
+    _attach_items(db, [r for r in results if r.ok and r.op != "delete"])
+    return results
+
+
+def process_inbox_items(
+    db: Session,
+    user_id: str,
+    entries: List[ItemProcessEntry],
+) -> List[ItemBatchResult]:
+    """Bulk version of process_item.
+
+    Item ownership, project access and context ownership are each checked with
+    one IN query. Entries that share the same target values are then moved with
+    a single UPDATE ... WHERE id IN (...), and everything is committed once.
+    """
+    results = [ItemBatchResult(index=i, op="process", id=e.id, ok=True) for i, e in enumerate(entries)]
+
+    def fail(index: int, message: str):
+        results[index].ok = False
+        results[index].error = message
+
+    item_ids = {e.id for e in entries}
+    project_ids = {e.project_id for e in entries if e.project_id}
+    context_ids = {e.context_id for e in entries if e.context_id}
+
+    inbox = {
+        row.id: RollupState.of(row) for row in db.query(
+            Item.id, Item.type, Item.context_id, Item.project_id, Item.created_at, Item.completed_at
+        ).filter(
+            Item.user_id == user_id,
+            Item.type == ItemType.inbox,
+            Item.id.in_(item_ids)
+        )
+    }
+    visible_project_ids = set()
+    if project_ids:
+        visible_project_ids = {
+            row.id for row in db.query(Project.id).filter(
+                Project.id.in_(project_ids),
+                visible_projects(user_id, user_family_ids(db, user_id))
+            )
+        }
+    own_context_ids = set()
+    if context_ids:
+        own_context_ids = {
+            row.id for row in db.query(Context.id).filter(
+                Context.user_id == user_id,
+                Context.id.in_(context_ids)
+            )
+        }
+
+    groups: Dict[tuple, List[str]] = {}
+    now = datetime.utcnow()
+    delta = Counter()
+    rollups = Counter()
+    seen = set()
+    for i, entry in enumerate(entries):
+        if entry.id in seen:
+            fail(i, "Item is listed more than once")
+            continue
+        seen.add(entry.id)
+        if entry.id not in inbox:
+            fail(i, "Inbox item not found")
+            continue
+        if entry.project_id and entry.project_id not in visible_project_ids:
+            fail(i, "Project not found")
+            continue
+        if entry.context_id and entry.context_id not in own_context_ids:
+            fail(i, "Context not found")
+            continue
+
+        values = (("type", entry.type),) + tuple(
+            (field, getattr(entry, field)) for field in PROCESS_FIELDS if getattr(entry, field)
+        )
+        groups.setdefault(values, []).append(entry.id)
+        before = inbox[entry.id]
+        after = before._replace(
+            type=entry.type,
+            context_id=entry.context_id or before.context_id,
+            project_id=entry.project_id or before.project_id,
+        )
+        delta.update(item_delta(_counted(before), _counted(after)))
+        rollups.update(rollup_delta(before, after, now))
+
+    for values, ids in groups.items():
+        db.execute(
+            update(Item)
+            .where(Item.id.in_(ids), Item.user_id == user_id, Item.type == ItemType.inbox)
+            .values(**dict(values))
+            .execution_options(synchronize_session=False)
+        )
+    apply_counter_delta(db, user_id, delta)
+    apply_rollup_delta(db, user_id, rollups)
+    db.commit()
+
+    _attach_items(db, [r for r in results if r.ok])
+    return results
+
+
+def _attach_items(db: Session, results: List[ItemBatchResult]):
+    """Load the final state of the touched items with one query"""
+    ids = {r.id for r in results}
+    if not ids:
+        return
+    items = {item.id: item for item in db.query(Item).filter(Item.id.in_(ids))}
+    for r in results:
+        if r.id in items:
+            r.item = ItemResponse.model_validate(items[r.id])
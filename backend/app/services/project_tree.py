@@ -0,0 +1,80 @@
+from typing import Iterable, List
+from sqlalchemy import exists, func, literal_column, or_, select, union_all
+from sqlalchemy.orm import Session, aliased
+from ..models.archive import ArchivedItem
+from ..models.item import Item
+from ..models.project import Project
+from ..schemas.project import ProjectResponse
+from .access import visible_projects
+
+# Deeper chains than this are cut off; horizons only go five levels deep
+MAX_DEPTH = 64
+
+
+def build_project_tree(db: Session, user_id: str, family_ids: Iterable[str]) -> List[dict]:
+    """The user's own and family projects as a forest, in a single statement.
+
+    A recursive CTE walks down from the roots (projects without a visible
+    parent) and a grouped count over live and archived items is joined onto
+    it, so the cost doesn't grow with the depth of the tree. Each node's
+    item_count and completed_item_count include its whole subtree. Projects
+    whose parent chain loops back on itself have no root and are left out.
+    """
+    family_ids = list(family_ids)
+
+    parent = aliased(Project)
+    tree = select(Project.id, literal_column("0").label("depth")).where(
+        visible_projects(user_id, family_ids),
+        or_(
+            Project.parent_id.is_(None),
+            ~exists().where(parent.id == Project.parent_id, visible_projects(user_id, family_ids, parent))
+        )
+    ).cte("tree", recursive=True)
+    child = aliased(Project)
+    tree = tree.union_all(
+        select(child.id, tree.c.depth + 1).join(tree, child.parent_id == tree.c.id).where(
+            visible_projects(user_id, family_ids, child),
+            tree.c.depth < MAX_DEPTH
+        )
+    )
+
+    in_tree = select(tree.c.id)
+    items = union_all(
+        select(Item.project_id, Item.completed_at).where(Item.project_id.in_(in_tree)),
+        select(ArchivedItem.project_id, ArchivedItem.completed_at).where(ArchivedItem.project_id.in_(in_tree)),
+    ).subquery("project_items")
+    counts = select(
+        items.c.project_id,
+        func.count().label("total"),
+        func.count(items.c.completed_at).label("completed"),
+    ).group_by(items.c.project_id).subquery("item_counts")
+
+    rows = db.execute(
+        select(
+            Project,
+            tree.c.depth,
+            func.coalesce(counts.c.total, 0),
+            func.coalesce(counts.c.completed, 0),
+        ).join(tree, tree.c.id == Project.id).outerjoin(
+            counts, counts.c.project_id == Project.id
+        ).order_by(tree.c.depth, Project.created_at, Project.id)
+    ).all()
+
+    # Parents come before their children, so one pass links the tree and a
+    # reverse pass rolls the counts up
+    nodes = {}
+    roots = []
+    for project, depth, item_count, completed_count in rows:
+        node = ProjectResponse.model_validate(project).model_dump()
+        node.update(children=[], item_count=item_count, completed_item_count=completed_count)
+        nodes[project.id] = node
+        if depth == 0:
+            roots.append(node)
+        else:
+            nodes[project.parent_id]["children"].append(node)
+    for project, depth, _, _ in reversed(rows):
+        if depth:
+            node, parent_node = nodes[project.id], nodes[project.parent_id]
+            parent_node["item_count"] += node["item_count"]
+            parent_node["completed_item_count"] += node["completed_item_count"]
+    return roots
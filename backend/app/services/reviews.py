@@ -0,0 +1,247 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..config import get_settings
+from ..models.item import Item, ItemType
+from ..models.project import Project, ProjectHorizon, ProjectStatus
+from ..schemas.item import ItemResponse
+from ..schemas.review import (
+    ReviewChecklistItem, ReviewItemList, ReviewSnapshot, ReviewStep, StalledProjectsReport,
+)
+from ..utils.scoped_cache import ScopedCache
+from .access import visible_projects
+from .events import broker, family_channel, user_channel
+
+settings = get_settings()
+
+# The weekly review, step by step
+CHECKLIST = [
+    ReviewChecklistItem(
+        id="clear_inbox",
+        title="Clear Inbox to Zero",
+        description="Process all items in your inbox - decide what each item is and what to do with it"
+    ),
+    ReviewChecklistItem(
+        id="review_next_actions",
+        title="Review Next Actions",
+        description="Review all next action lists for each context - mark complete, update, or delete"
+    ),
+    ReviewChecklistItem(
+        id="review_waiting_for",
+        title="Review Waiting For",
+        description="Check on delegated items - follow up on anything overdue"
+    ),
+    ReviewChecklistItem(
+        id="review_projects",
+        title="Review Projects",
+        description="Review each project - ensure at least one next action exists for active projects"
+    ),
+    ReviewChecklistItem(
+        id="review_someday",
+        title="Review Someday/Maybe",
+        description="Review someday/maybe list - move items to active if appropriate"
+    ),
+    ReviewChecklistItem(
+        id="review_calendar",
+        title="Review Calendar",
+        description="Review past and upcoming calendar events - capture any actions needed"
+    ),
+    ReviewChecklistItem(
+        id="review_goals",
+        title="Review Goals & Vision",
+        description="Review higher horizons - ensure projects align with goals"
+    ),
+]
+
+# Items listed per snapshot section; counts cover all of them
+SNAPSHOT_LIST_LIMIT = 50
+# Someday items untouched for this many weeks are due for a look
+DEFAULT_STALE_WEEKS = 4
+
+# Weekly-review reports per user, dropped by any change event on the user's
+# or their families' channels (see services/events.py). The snapshot is only
+# meant to survive a walk through the review, so it gets its own short TTL.
+review_cache: Optional[ScopedCache] = (
+    ScopedCache(settings.review_cache_ttl_seconds) if settings.review_cache_ttl_seconds > 0 else None
+)
+snapshot_cache: Optional[ScopedCache] = (
+    ScopedCache(settings.review_snapshot_ttl_seconds) if settings.review_snapshot_ttl_seconds > 0 else None
+)
+for _cache in (review_cache, snapshot_cache):
+    if _cache is not None:
+        broker.add_listener(
+            lambda channels, event, cache=_cache: cache.clear() if channels is None else cache.invalidate(channels)
+        )
+
+
+def review_channels(user_id: str, family_ids: Iterable[str]) -> set:
+    return {user_channel(user_id)} | {family_channel(f) for f in family_ids}
+
+
+async def cached_report(
+    db: AsyncSession, cache: Optional[ScopedCache], key: str, channels: Iterable[str],
+    build: Callable[[], Awaitable]
+):
+    """`build()`'s result, reused from `cache` until a change event on `channels`.
+
+    Reports built on a replica session are served but not cached: the replica
+    may not have caught up with the writes whose events already went by, and
+    nothing would evict the stale copy until the next change.
+    """
+    if cache is None:
+        return await build()
+    report = cache.get(key)
+    if report is None:
+        generation = cache.generation
+        report = await build()
+        if not db.info.get("replica"):
+            cache.put(key, channels, report, generation)
+    return report
+
+
+def find_stalled_projects(db: Session, user_id: str, family_ids: Iterable[str]) -> StalledProjectsReport:
+    """Active projects, own or shared, without a single open next action.
+
+    One anti-join: NOT EXISTS over the (project_id, completed_at) item index.
+    Next actions of any family member count, since the project is shared.
+    Higher horizons (areas, goals, ...) aren't expected to hold actions.
+    """
+    open_next_action = select(Item.id).where(
+        Item.project_id == Project.id,
+        Item.completed_at.is_(None),
+        Item.type == ItemType.next_action
+    ).exists()
+    projects = db.scalars(
+        select(Project).where(
+            visible_projects(user_id, family_ids),
+            Project.status == ProjectStatus.active,
+            Project.horizon == ProjectHorizon.project,
+            ~open_next_action
+        ).order_by(Project.created_at, Project.id)
+    ).all()
+    return StalledProjectsReport(projects=projects, generated_at=datetime.utcnow())
+
+
+def item_counts(db: Session, user_id: str, now: datetime) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """Open items per type, and how many of each are past their due date"""
+    open_counts, overdue_counts = {}, {}
+    rows = db.execute(
+        select(Item.type, func.count(), func.count(case((Item.due_date < now, 1)))).where(
+            Item.user_id == user_id,
+            Item.completed_at.is_(None)
+        ).group_by(Item.type)
+    )
+    for item_type, total, overdue in rows:
+        open_counts[ItemType(item_type).value] = total
+        overdue_counts[ItemType(item_type).value] = overdue
+    return open_counts, overdue_counts
+
+
+def _item_list(db: Session, *conditions, order_by) -> ReviewItemList:
+    # The window count gives the full total alongside the first page
+    rows = db.execute(
+        select(Item, func.count().over()).where(*conditions).order_by(*order_by).limit(SNAPSHOT_LIST_LIMIT)
+    ).all()
+    return ReviewItemList(
+        items=[ItemResponse.model_validate(item) for item, _ in rows],
+        total=rows[0][1] if rows else 0,
+    )
+
+
+def overdue_waiting_for(db: Session, user_id: str, now: datetime) -> ReviewItemList:
+    return _item_list(
+        db,
+        Item.user_id == user_id,
+        Item.type == ItemType.waiting_for,
+        Item.completed_at.is_(None),
+        Item.due_date < now,
+        order_by=(Item.due_date, Item.id),
+    )
+
+
+def stale_someday(db: Session, user_id: str, untouched_since: datetime) -> ReviewItemList:
+    return _item_list(
+        db,
+        Item.user_id == user_id,
+        Item.type == ItemType.someday,
+        Item.completed_at.is_(None),
+        Item.updated_at < untouched_since,
+        order_by=(Item.updated_at, Item.id),
+    )
+
+
+def project_counts(db: Session, user_id: str, family_ids: Iterable[str]) -> Dict[str, int]:
+    """Active own and family projects per horizon"""
+    rows = db.execute(
+        select(Project.horizon, func.count()).where(
+            visible_projects(user_id, family_ids),
+            Project.status == ProjectStatus.active
+        ).group_by(Project.horizon)
+    )
+    return {ProjectHorizon(horizon).value: total for horizon, total in rows}
+
+
+def _step_counts(open_items: Dict[str, int], active_projects: Dict[str, int]) -> Dict[str, int]:
+    return {
+        "clear_inbox": open_items.get(ItemType.inbox.value, 0),
+        "review_next_actions": open_items.get(ItemType.next_action.value, 0),
+        "review_waiting_for": open_items.get(ItemType.waiting_for.value, 0),
+        "review_projects": active_projects.get(ProjectHorizon.project.value, 0),
+        "review_someday": open_items.get(ItemType.someday.value, 0),
+        "review_calendar": open_items.get(ItemType.scheduled.value, 0),
+        "review_goals": sum(n for h, n in active_projects.items() if h != ProjectHorizon.project.value),
+    }
+
+
+def snapshot_stats(snapshot: ReviewSnapshot) -> Dict[str, int]:
+    """The counts of a snapshot, compact enough to keep on every WeeklyReview"""
+    stats = {step.id: step.count for step in snapshot.steps}
+    stats.update(
+        overdue_waiting_for=snapshot.overdue_waiting_for.total,
+        stale_someday=snapshot.stale_someday.total,
+        stalled_projects=len(snapshot.stalled_projects),
+    )
+    return stats
+
+
+async def build_review_snapshot(
+    db: AsyncSession, user_id: str, family_ids: List[str], stale_weeks: int
+) -> ReviewSnapshot:
+    """Run the review's aggregate queries concurrently, each on its own session.
+
+    The sessions share the request session's engine, so the snapshot reads
+    from the same primary or replica the request was routed to. Each one
+    checks out a pooled connection: the request session's own connection is
+    released first, and at most `review_snapshot_concurrency` queries run at
+    once, so a snapshot holds that many connections rather than six.
+    """
+    now = datetime.utcnow()
+    # Ends the request session's (read-only) transaction and returns its connection
+    await db.commit()
+    slots = asyncio.Semaphore(settings.review_snapshot_concurrency)
+
+    async def run(fn, *args):
+        async with slots, AsyncSession(db.bind, expire_on_commit=False) as session:
+            return await session.run_sync(fn, *args)
+
+    (open_counts, overdue_counts), waiting, someday, projects, stalled = await asyncio.gather(
+        run(item_counts, user_id, now),
+        run(overdue_waiting_for, user_id, now),
+        run(stale_someday, user_id, now - timedelta(weeks=stale_weeks)),
+        run(project_counts, user_id, family_ids),
+        run(find_stalled_projects, user_id, family_ids),
+    )
+    counts = _step_counts(open_counts, projects)
+    return ReviewSnapshot(
+        steps=[ReviewStep(**step.model_dump(), count=counts.get(step.id, 0)) for step in CHECKLIST],
+        open_items=open_counts,
+        overdue_items=overdue_counts,
+        active_projects=projects,
+        overdue_waiting_for=waiting,
+        stale_someday=someday,
+        stalled_projects=stalled.projects,
+        generated_at=now,
+    )
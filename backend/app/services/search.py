@@ -0,0 +1,153 @@
+import re
+from typing import List
+from fastapi import HTTPException, status
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+from ..models.item import Item, SEARCH_OWNER, SQLITE_SEARCH_DDL, POSTGRES_SEARCH_DDL
+from ..schemas.item import ItemResponse, ItemSearchHit, ItemSearchResults
+
+MARK_START = "<mark>"
+MARK_END = "</mark>"
+
+SQLITE_SEARCH = text(f"""
+    SELECT items.id AS id,
+           bm25(items_fts, 0.0, 10.0, 1.0) AS score,
+           highlight(items_fts, 1, '{MARK_START}', '{MARK_END}') AS title_highlight,
+           snippet(items_fts, 2, '{MARK_START}', '{MARK_END}', '…', 16) AS snippet
+    FROM items_fts
+    JOIN items_search_keys ON items_search_keys.key = items_fts.rowid
+    JOIN items ON items.id = items_search_keys.item_id
+    WHERE items_fts MATCH :query
+      AND items.user_id = :user_id
+      AND (:include_completed OR items.completed_at IS NULL)
+    ORDER BY score
+    LIMIT :limit OFFSET :offset
+""")
+
+# Rank and page first, then build headlines only for the rows being returned
+POSTGRES_SEARCH = text(f"""
+    SELECT hits.id AS id,
+           hits.score AS score,
+           ts_headline('simple', items.title, hits.query,
+                       'StartSel={MARK_START}, StopSel={MARK_END}, HighlightAll=true') AS title_highlight,
+           ts_headline('simple', coalesce(items.notes, ''), hits.query,
+                       'StartSel={MARK_START}, StopSel={MARK_END}, MaxFragments=1, MaxWords=20, MinWords=5')
+               AS snippet
+    FROM (
+        SELECT items.id, ts_rank_cd(items.search_vector, query) AS score, query
+        FROM items, to_tsquery('simple', :query) AS query
+        WHERE items.search_vector @@ query
+          AND items.user_id = :user_id
+          AND (:include_completed OR items.completed_at IS NULL)
+        ORDER BY score DESC
+        LIMIT :limit OFFSET :offset
+    ) AS hits
+    JOIN items ON items.id = hits.id
+    ORDER BY hits.score DESC
+""")
+
+
+def _terms(q: str) -> List[str]:
+    # Only word characters reach the match syntax, so user input can't inject operators
+    return re.findall(r"\w+", q)[:16]
+
+
+def _sqlite_query(user_id: str, terms: List[str]) -> str:
+    # Implicit AND of quoted terms; the last one is a prefix for search-as-you-type.
+    # The owner phrase keeps the match to the user's own rows.
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    owner = user_id.replace("-", "")  # as SEARCH_OWNER indexes it
+    return f'owner : "{owner}" AND {{title notes}} : ({" ".join(quoted)})'
+
+
+def _postgres_query(terms: List[str]) -> str:
+    return " & ".join(terms[:-1] + [f"{terms[-1]}:*"])
+
+
+def search_items(
+    db: Session,
+    user_id: str,
+    q: str,
+    limit: int,
+    offset: int,
+    include_completed: bool = False,
+) -> ItemSearchResults:
+    """Ranked search over the live items table.
+
+    Items moved to items_archive are not indexed, so include_completed only
+    reaches completed items that have not been archived yet.
+    """
+    terms = _terms(q)
+    if not terms:
+        return ItemSearchResults(hits=[], next_offset=None)
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        statement, query = SQLITE_SEARCH, _sqlite_query(user_id, terms)
+    elif dialect == "postgresql":
+        statement, query = POSTGRES_SEARCH, _postgres_query(terms)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Search is not supported on this database"
+        )
+
+    rows = db.execute(statement, {
+        "query": query,
+        "user_id": user_id,
+        "include_completed": include_completed,
+        "limit": limit + 1,
+        "offset": offset,
+    }).all()
+    next_offset = offset + limit if len(rows) > limit else None
+    rows = rows[:limit]
+
+    items = {item.id: item for item in db.query(Item).filter(Item.id.in_([row.id for row in rows]))}
+    hits = [
+        ItemSearchHit(
+            item=ItemResponse.model_validate(items[row.id]),
+            rank=abs(row.score),  # bm25 scores are negative, lower is better
+            title_highlight=row.title_highlight,
+            snippet=row.snippet or None,
+        )
+        for row in rows
+        if row.id in items
+    ]
+    return ItemSearchResults(hits=hits, next_offset=next_offset)
+
+
+def ensure_search_index(conn: Connection):
+    """Create the search index on databases whose items table predates it,
+    replacing the rowid-keyed SQLite index of older releases"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        tables = inspect(conn).get_table_names()
+        if "items_search_keys" in tables:
+            return
+        if "items_fts" in tables:
+            for trigger in ("items_fts_au", "items_fts_ad", "items_fts_ai"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            conn.execute(text("DROP TABLE items_fts"))
+        for statement in SQLITE_SEARCH_DDL:
+            conn.execute(text(statement))
+        rebuild_search_index(conn)
+    elif dialect == "postgresql":
+        for statement in POSTGRES_SEARCH_DDL:
+            conn.execute(text(statement))
+
+
+def rebuild_search_index(conn: Connection):
+    """Re-derive the SQLite FTS index from the items table (repair only; the
+    triggers keep it in sync). Postgres keeps a generated column and needs nothing.
+    """
+    if conn.dialect.name == "sqlite":
+        conn.execute(text("DELETE FROM items_fts"))
+        conn.execute(text("DELETE FROM items_search_keys"))
+        conn.execute(text("INSERT INTO items_search_keys (item_id) SELECT id FROM items"))
+        conn.execute(text(
+            "INSERT INTO items_fts (rowid, owner, title, notes) "
+            f"SELECT items_search_keys.key, {SEARCH_OWNER.format('items')}, items.title, items.notes "
+            "FROM items JOIN items_search_keys ON items_search_keys.item_id = items.id"
+        ))
@@ -0,0 +1,123 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import and_, insert, or_
+from sqlalchemy.orm import Session
+from ..models.item import Item
+from ..models.project import Project
+from ..models.context import Context
+from ..models.tombstone import Tombstone
+from ..schemas.sync import SyncChanges, SyncTombstone
+from .access import user_family_ids, visible_projects
+
+SYNC_PAGE_SIZE = 500
+# Rows are only handed out once their timestamp is this far in the past, so a
+# write that stamped updated_at just before a slow commit can't land behind a
+# cursor that has already moved on. Clients see their own writes after ~2s.
+SAFETY_WINDOW = timedelta(seconds=2)
+
+Position = Optional[Tuple[datetime, Optional[str]]]
+
+
+def encode_sync_cursor(positions: Dict[str, Position]) -> str:
+    raw = json.dumps({
+        name: [position[0].isoformat(), position[1]] if position else None
+        for name, position in positions.items()
+    }).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> Dict[str, Position]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {
+            name: (datetime.fromisoformat(value[0]), value[1]) if value else None
+            for name, value in data.items()
+        }
+    except (ValueError, TypeError, IndexError, AttributeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync cursor"
+        )
+
+
+def record_tombstones(db: Session, entity_type: str, rows: Iterable):
+    """Queue tombstones for rows about to be hard-deleted; committed with the delete"""
+    values = [
+        {
+            "entity_type": entity_type,
+            "entity_id": row.id,
+            "user_id": row.user_id,
+            "family_id": getattr(row, "family_id", None),
+        }
+        for row in rows
+    ]
+    if values:
+        db.execute(insert(Tombstone), values)
+
+
+def _page(query, ts_column, id_column, position: Position, until: datetime, limit: int):
+    """Keyset-page rows changed after `position` up to `until`, oldest first"""
+    if position:
+        ts, last_id = position
+        if last_id is None:
+            query = query.filter(ts_column > ts)
+        else:
+            query = query.filter(or_(ts_column > ts, and_(ts_column == ts, id_column > last_id)))
+
+    rows = query.filter(ts_column <= until).order_by(ts_column, id_column).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        return rows, (getattr(last, ts_column.key), last.id), True
+    # Everything up to `until` has been seen
+    return rows, (until, None), False
+
+
+def get_changes(db: Session, user_id: str, cursor: Optional[str], limit: int = SYNC_PAGE_SIZE) -> SyncChanges:
+    """Return rows created, updated or deleted since `cursor`.
+
+    Each collection is read with its own (timestamp, id) keyset over the
+    user_id/updated_at indexes, so the cost follows the number of changed rows.
+    Without a cursor the live rows are returned in full as the initial sync,
+    and deletions are tracked from that point on.
+    """
+    until = datetime.utcnow() - SAFETY_WINDOW
+    if cursor:
+        positions = decode_sync_cursor(cursor)
+    else:
+        positions = {"items": None, "projects": None, "contexts": None, "deleted": (until, None)}
+
+    family_ids = user_family_ids(db, user_id)
+
+    items, positions["items"], items_more = _page(
+        db.query(Item).filter(Item.user_id == user_id),
+        Item.updated_at, Item.id, positions.get("items"), until, limit,
+    )
+    projects, positions["projects"], projects_more = _page(
+        db.query(Project).filter(visible_projects(user_id, family_ids)),
+        Project.updated_at, Project.id, positions.get("projects"), until, limit,
+    )
+    contexts, positions["contexts"], contexts_more = _page(
+        db.query(Context).filter(Context.user_id == user_id),
+        Context.updated_at, Context.id, positions.get("contexts"), until, limit,
+    )
+    tombstones, positions["deleted"], deleted_more = _page(
+        db.query(Tombstone).filter(visible_projects(user_id, family_ids, Tombstone)),
+        Tombstone.deleted_at, Tombstone.id, positions.get("deleted"), until, limit,
+    )
+
+    return SyncChanges(
+        items=items,
+        projects=projects,
+        contexts=contexts,
+        deleted=[
+            SyncTombstone(entity_type=t.entity_type, id=t.entity_id, deleted_at=t.deleted_at)
+            for t in tombstones
+        ],
+        next_cursor=encode_sync_cursor(positions),
+        has_more=items_more or projects_more or contexts_more or deleted_more,
+    )
@@ -3,18 +3,32 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..config import get_settings
-from ..database import get_db
+from ..database import AsyncSessionLocal, get_db
 from ..models.user import User
 from ..schemas.user import TokenData
+from .passwords import pwd_context
+from .token_cache import TokenCache, UserSnapshot
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["sha256_crypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Verified tokens -> user snapshot, so most requests skip jwt.decode and the users query
+token_cache = (
+    TokenCache(settings.auth_cache_size, settings.auth_cache_ttl_seconds)
+    if settings.auth_cache_enabled else None
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_cached_user(mapper, connection, target):
+    if token_cache is not None:
+        token_cache.invalidate_user(target.id)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -45,8 +59,20 @@ def create_refresh_token(data: dict) -> str:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> UserSnapshot:
+    return await authenticate_token(token, db)
+
+
+async def authenticate_token(token: str, db: AsyncSession) -> UserSnapshot:
+    """The user an access token belongs to; 401 if the token is invalid"""
+    if token_cache is not None:
+        cache_key = TokenCache.key(token)
+        cached = token_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        generation = token_cache.generation
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -61,11 +87,19 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user = await db.scalar(select(User).where(User.id == token_data.user_id))
+    if user is None and db.info.get("replica"):
+        # A just-registered user may not have reached the replica yet
+        async with AsyncSessionLocal() as primary:
+            user = await primary.scalar(select(User).where(User.id == token_data.user_id))
     if user is None:
         raise credentials_exception
-    return user
+
+    snapshot = UserSnapshot.of(user)
+    if token_cache is not None:
+        token_cache.put(cache_key, snapshot, payload.get("exp"), generation)
+    return snapshot
 
 
-async def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: UserSnapshot = Depends(get_current_user)) -> UserSnapshot:
     return current_user
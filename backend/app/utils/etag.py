@@ -0,0 +1,118 @@
+import hashlib
+from typing import Callable
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.user import User
+from ..models.item import Item
+from ..models.archive import ArchivedItem
+from ..models.project import Project
+from ..models.context import Context
+from ..models.family import Family, FamilyMember
+from ..models.review import WeeklyReview
+from ..services.access import memberships, user_family_ids, visible_projects
+from .auth import get_current_active_user
+from .token_cache import UserSnapshot
+
+VersionFn = Callable[[Session, str], tuple]
+
+
+def _membership_version(db: Session, user_id: str) -> tuple:
+    return db.execute(memberships(user_id, func.count(FamilyMember.id), func.max(FamilyMember.joined_at))).one()
+
+
+def items_version(db: Session, user_id: str) -> tuple:
+    live = db.query(func.count(Item.id), func.max(Item.updated_at)).filter(
+        Item.user_id == user_id
+    ).one()
+    # Deleting an archived item must change the stamp of include_completed lists
+    archived = db.query(func.count(ArchivedItem.id)).filter(ArchivedItem.user_id == user_id).scalar()
+    return tuple(live) + (archived,)
+
+
+def projects_version(db: Session, user_id: str) -> tuple:
+    visible = db.query(func.count(Project.id), func.max(Project.updated_at)).filter(
+        visible_projects(user_id, user_family_ids(db, user_id))
+    ).one()
+    # Joining or leaving a family changes which projects are visible
+    return tuple(visible) + tuple(_membership_version(db, user_id))
+
+
+def contexts_version(db: Session, user_id: str) -> tuple:
+    return db.query(func.count(Context.id), func.max(Context.updated_at)).filter(
+        Context.user_id == user_id
+    ).one()
+
+
+def reviews_version(db: Session, user_id: str) -> tuple:
+    # Reviews are never edited, so creation time is enough
+    return db.query(func.count(WeeklyReview.id), func.max(WeeklyReview.created_at)).filter(
+        WeeklyReview.user_id == user_id
+    ).one()
+
+
+def families_version(db: Session, user_id: str) -> tuple:
+    family_ids = user_family_ids(db, user_id)
+    families = db.query(func.count(Family.id), func.max(Family.updated_at)).filter(
+        Family.id.in_(family_ids)
+    ).one()
+    # ?include=members embeds every roster, so other members joining, leaving
+    # or renaming themselves must change the stamp too
+    rosters = db.query(
+        func.count(FamilyMember.id), func.max(FamilyMember.joined_at), func.max(User.updated_at)
+    ).join(User, User.id == FamilyMember.user_id).filter(
+        FamilyMember.family_id.in_(family_ids)
+    ).one()
+    return tuple(families) + tuple(rosters)
+
+
+class CollectionETag:
+    """Route dependency that makes a list endpoint answer conditional GETs.
+
+    The ETag is derived from a cheap per-user version stamp of the collection
+    (row count plus latest change time, read from an index) and the request's
+    query string. When it matches If-None-Match the dependency short-circuits
+    with 304 before the handler loads or serializes any rows; otherwise it
+    sets the ETag header on the response the handler returns.
+
+        @router.get("", dependencies=[Depends(CollectionETag("items", items_version))])
+    """
+
+    def __init__(self, collection: str, version: VersionFn):
+        self.collection = collection
+        self.version = version
+
+    async def __call__(
+        self,
+        request: Request,
+        response: Response,
+        db: AsyncSession = Depends(get_db),
+        current_user: UserSnapshot = Depends(get_current_active_user)
+    ):
+        stamp = await db.run_sync(self.version, current_user.id)
+        query = "&".join(sorted(str(request.query_params).split("&")))
+        digest = hashlib.sha256(
+            f"{self.collection}|{current_user.id}|{stamp}|{query}".encode()
+        ).hexdigest()[:32]
+        etag = f'"{digest}"'
+
+        if_none_match = request.headers.get("if-none-match", "")
+        candidates = {tag.strip() for tag in if_none_match.split(",")}
+        if etag in candidates or f"W/{etag}" in candidates or "*" in candidates:
+            raise HTTPException(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": etag}
+            )
+
+        response.headers["ETag"] = etag
+        # Let clients cache, but make them revalidate every time
+        response.headers["Cache-Control"] = "private, no-cache"
+
+
+items_etag = CollectionETag("items", items_version)
+projects_etag = CollectionETag("projects", projects_version)
+contexts_etag = CollectionETag("contexts", contexts_version)
+reviews_etag = CollectionETag("reviews", reviews_version)
+families_etag = CollectionETag("families", families_version)
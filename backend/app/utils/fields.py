@@ -0,0 +1,44 @@
+from typing import Iterable, List, Optional, Type
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy.orm import load_only
+
+# Always loaded: the row identity and the keyset pagination columns
+REQUIRED_COLUMNS = ("id", "created_at")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[List[str]]:
+    """Turn a ?fields=a,b,c parameter into a validated field list (None = full shape)"""
+    if not fields:
+        return None
+    selected = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in schema.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}"
+        )
+    if "id" not in selected:
+        selected.insert(0, "id")
+    return selected
+
+
+def load_fields(model, fields: List[str]):
+    """Query option that only SELECTs the requested columns"""
+    columns = dict.fromkeys(list(REQUIRED_COLUMNS) + fields)
+    return load_only(*[getattr(model, name) for name in columns])
+
+
+def sparse_rows(rows: Iterable, fields: List[str]) -> List[dict]:
+    return [{name: getattr(row, name) for name in fields} for row in rows]
+
+
+def sparse_response(content, response: Response) -> JSONResponse:
+    """Serialize a narrowed payload directly, bypassing the full response_model.
+
+    Headers set on the injected `response` by dependencies (such as the ETag)
+    are carried over, since FastAPI only merges them into responses it builds.
+    """
+    return JSONResponse(content=jsonable_encoder(content), headers=dict(response.headers))
@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import Select, and_, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, id: str) -> str:
+    """Encode the (created_at, id) keyset position of the last row on a page"""
+    raw = json.dumps([created_at.isoformat(), id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), str(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+
+
+def is_paginated(limit: Optional[int], cursor: Optional[str], include_total: bool) -> bool:
+    """Legacy clients send none of the paging params and get a bare list back"""
+    return limit is not None or cursor is not None or include_total
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    model,
+    limit: Optional[int],
+    cursor: Optional[str],
+    include_total: bool = False,
+):
+    """Apply keyset pagination on (created_at DESC, id DESC) to a SELECT of `model`.
+
+    Returns (rows, next_cursor, total). `total` is only counted when asked for,
+    since it is the one part of a page whose cost grows with the list.
+    """
+    total = None
+    if include_total:
+        total = await db.scalar(stmt.with_only_columns(func.count(model.id)).order_by(None))
+
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        stmt = stmt.where(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < last_id)
+        ))
+
+    limit = limit or DEFAULT_PAGE_SIZE
+    rows = (await db.scalars(
+        stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return rows, next_cursor, total
@@ -0,0 +1,126 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+from ..config import get_settings
+
+settings = get_settings()
+
+# Schemes existing hashes may use; anything but the configured scheme is
+# deprecated and gets rehashed on the next successful login
+KNOWN_SCHEMES = ["sha256_crypt", "bcrypt"]
+
+
+def build_password_context(scheme: str, rounds: Optional[int]) -> CryptContext:
+    options = {}
+    if rounds:
+        # Pinning min and max to the target makes hashes at any other cost "need update"
+        options = {
+            f"{scheme}__default_rounds": rounds,
+            f"{scheme}__min_rounds": rounds,
+            f"{scheme}__max_rounds": rounds,
+        }
+    schemes = [scheme] + [s for s in KNOWN_SCHEMES if s != scheme]
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+pwd_context = build_password_context(settings.password_scheme, settings.password_rounds)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
+
+class PasswordHasher:
+    """Runs password hashing off the event loop with bounded concurrency.
+
+    At most `workers` hashes run at once, by default in worker processes so
+    the CPU-bound rounds never compete with the event loop thread; a thread
+    pool is available where spawning processes is undesirable. Callers beyond
+    the cap wait up to `queue_timeout` seconds for a slot and then get a 503,
+    so a login storm queues instead of stalling every other request. With
+    workers=0 hashing runs inline on the event loop, as it used to.
+    """
+
+    def __init__(self, workers: int, queue_timeout: float, pool: str = "process"):
+        self.workers = workers
+        self.queue_timeout = queue_timeout
+        self.pool = pool
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._slots_loop = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.pool == "process":
+                # spawn: forking a process that runs an event loop and DB pools is unsafe
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args)
+        loop = asyncio.get_running_loop()
+        if self._slots_loop is not loop:
+            # A semaphore belongs to one event loop
+            self._slots, self._slots_loop = asyncio.Semaphore(self.workers), loop
+        slots = self._slots
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many password checks in progress, please retry",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self.waiting -= 1
+
+        self.in_flight += 1
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+        """Check a password; the second value is a new hash when the stored one is outdated"""
+        return await self._run(_verify_and_update, password, hashed)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "pool": self.pool if self.workers > 0 else "inline",
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    settings.password_hash_workers,
+    settings.password_hash_queue_timeout,
+    settings.password_hash_pool,
+)
@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class ScopedCache:
+    """Thread-safe cache of computed per-user reports.
+
+    Keys are the user id plus any report parameters. Each entry records the
+    event channels its data came from (the user's own and their families');
+    `invalidate` drops every entry that shares a channel with a change event.
+    `ttl` bounds staleness for writes that publish no event, such as imports
+    and the CLI.
+    """
+
+    def __init__(self, ttl: float, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: Dict[str, Tuple[Any, Set[str], float]] = {}
+        self._by_channel: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a report that raced with one isn't cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, channels: Iterable[str], value: Any, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._remove(key)
+            if len(self._entries) >= self.max_size:
+                # Reports are cheap to rebuild; start over rather than track recency
+                self._entries.clear()
+                self._by_channel.clear()
+            channels = set(channels)
+            self._entries[key] = (value, channels, time.monotonic() + self.ttl)
+            for channel in channels:
+                self._by_channel.setdefault(channel, set()).add(key)
+
+    def invalidate(self, channels: Iterable[str]):
+        with self._lock:
+            self.generation += 1
+            for channel in channels:
+                for key in list(self._by_channel.get(channel, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._by_channel.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for channel in entry[1]:
+            keys = self._by_channel.get(channel)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_channel[channel]
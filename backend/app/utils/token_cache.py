@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The user fields request handlers need, detached from any session"""
+    id: str
+    email: str
+    name: str
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def of(cls, user) -> "UserSnapshot":
+        return cls(user.id, user.email, user.name, user.created_at, user.updated_at)
+
+
+class TokenCache:
+    """Thread-safe LRU of verified access tokens -> user snapshot.
+
+    Keys are SHA-256 digests of the raw token, so tokens themselves are never
+    held in memory. An entry lives until the earlier of the token's own expiry
+    and `ttl` seconds, and is dropped as soon as its user is updated in this
+    process; the TTL bounds staleness for updates made by other processes.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[UserSnapshot, float]]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a lookup that raced with one isn't cached
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[UserSnapshot]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                self._remove(key, user.id)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def put(self, key: str, user: UserSnapshot, token_exp: Optional[float], generation: int):
+        expires = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expires = min(expires, time.monotonic() + token_exp - time.time())
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (user, expires)
+            self._entries.move_to_end(key)
+            self._by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                old_key, (old_user, _) = self._entries.popitem(last=False)
+                self._discard_user_key(old_user.id, old_key)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: str):
+        with self._lock:
+            self.generation += 1
+            for key in self._by_user.pop(user_id, ()):
+                self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._by_user.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: str, user_id: str):
+        self._entries.pop(key, None)
+        self._discard_user_key(user_id, key)
+
+    def _discard_user_key(self, user_id: str, key: str):
+        keys = self._by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[user_id]
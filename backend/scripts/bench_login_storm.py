@@ -0,0 +1,142 @@
+"""Measure how a burst of logins affects latency of unrelated requests.
+
+Starts the app in a single Uvicorn worker (as the Dockerfile does) on a
+scratch SQLite database, then probes GET /health at a fixed rate, first with
+the server idle and then while `--clients` threads log in back to back.
+Prints p50/p99/max probe latency for both phases. Compare hashing on the
+event loop with the pool:
+
+    cd backend && python scripts/bench_login_storm.py --hash-workers 0
+    cd backend && python scripts/bench_login_storm.py --hash-workers 2
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url: str, data: dict = None, form: bool = False, timeout: float = 60) -> int:
+    body, headers = None, {}
+    if data is not None:
+        if form:
+            body = urllib.parse.urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        else:
+            body = json.dumps(data).encode()
+            headers["Content-Type"] = "application/json"
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, body, headers), timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def wait_until_up(base: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if request(base + "/health", timeout=1) == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+def probe(base: str, seconds: float, interval: float) -> list:
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        request(base + "/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(max(0.0, interval - latencies[-1] / 1000))
+    return latencies
+
+
+def summary(latencies: list) -> str:
+    ordered = sorted(latencies)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return (f"n={len(ordered):4d}  p50={statistics.median(ordered):7.1f}ms  "
+            f"p99={p99:7.1f}ms  max={ordered[-1]:7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hash-workers", type=int, default=2, help="PASSWORD_HASH_WORKERS (0 = on the event loop)")
+    parser.add_argument("--hash-pool", default="process", choices=["process", "thread"])
+    parser.add_argument("--clients", type=int, default=8, help="concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=5.0, help="length of each phase")
+    parser.add_argument("--interval", type=float, default=0.02, help="seconds between probes")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        PASSWORD_HASH_WORKERS=str(args.hash_workers),
+        PASSWORD_HASH_POOL=args.hash_pool,
+        PASSWORD_HASH_QUEUE_TIMEOUT="60",
+        ARCHIVE_INTERVAL_MINUTES="0",
+    )
+    subprocess.run([sys.executable, "-m", "app.cli", "migrate"], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        wait_until_up(base)
+        users = [f"bench{i}@example.com" for i in range(args.clients)]
+        for email in users:
+            request(base + "/auth/register", {"email": email, "password": "bench-password", "name": "Bench"})
+
+        idle = probe(base, args.seconds, args.interval)
+
+        stop = threading.Event()
+        logins = []
+
+        def login_loop(email):
+            while not stop.is_set():
+                start = time.perf_counter()
+                request(base + "/auth/login", {"username": email, "password": "bench-password"}, form=True)
+                logins.append((time.perf_counter() - start) * 1000)
+
+        threads = [threading.Thread(target=login_loop, args=(email,), daemon=True) for email in users]
+        for thread in threads:
+            thread.start()
+        storm = probe(base, args.seconds, args.interval)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        mode = f"{args.hash_pool} pool x{args.hash_workers}" if args.hash_workers > 0 else "inline"
+        print(f"hashing: {mode}, {args.clients} login clients")
+        print(f"  /health idle    {summary(idle)}")
+        print(f"  /health storm   {summary(storm)}")
+        print(f"  /auth/login     {summary(logins)}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
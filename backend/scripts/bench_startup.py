@@ -0,0 +1,107 @@
+"""Measure cold-start cost: importing the app and time to first response.
+
+Each run uses a fresh interpreter, as a new Cloud Run instance would. The
+scratch SQLite database is migrated once up front (as deploy.sh does), so
+the numbers cover only what every instance pays on boot:
+
+    cd backend && python scripts/bench_startup.py
+    cd backend && python scripts/bench_startup.py --runs 10 --top 15
+
+"import" is `import app.main` timed inside the interpreter; "first
+response" is from spawning Uvicorn until GET /health returns 200.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from bench_login_storm import BACKEND_DIR, free_port
+
+IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import app.main; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def time_import(env: dict) -> float:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True, text=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+
+def time_first_response(env: dict, timeout: float = 30) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/health"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - start) * 1000
+            except OSError:
+                time.sleep(0.005)
+        raise RuntimeError("server did not start")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    """(cumulative ms, module) for the slowest top-level imports under app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if "." not in name.strip():
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def summary(samples: list) -> str:
+    return (f"n={len(samples)}  median={statistics.median(samples):7.1f}ms  "
+            f"min={min(samples):7.1f}ms  max={max(samples):7.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="also list the N slowest top-level imports")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        ARCHIVE_INTERVAL_MINUTES="0",
+    )
+    subprocess.run([sys.executable, "-m", "app.cli", "migrate"], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    imports = [time_import(env) for _ in range(args.runs)]
+    first_responses = [time_first_response(env) for _ in range(args.runs)]
+    print(f"  import app.main   {summary(imports)}")
+    print(f"  first response    {summary(first_responses)}")
+    if args.top:
+        print(f"\nslowest top-level imports:")
+        for cumulative, name in slowest_imports(env, args.top):
+            print(f"  {cumulative:8.1f}ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Check that the list queries issued by the routers are served by an index.
+
+Runs EXPLAIN (PostgreSQL) or EXPLAIN QUERY PLAN (SQLite) for each hot query
+shape against the configured DATABASE_URL and exits non-zero if any plan
+falls back to a full table scan.
+
+    cd backend && python scripts/check_query_plans.py
+"""
+import re
+import sys
+import os
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import and_, or_
+from app.database import Base, SessionLocal, engine
+from app.models import Item, Project, Family, FamilyMember
+from app.models.item import ItemType, ItemPriority
+
+USER_ID = "00000000-0000-0000-0000-000000000001"
+OTHER_ID = "00000000-0000-0000-0000-000000000002"
+CHECKED_TABLES = ("items", "projects", "family_members")
+
+SQLITE_FULL_SCAN = re.compile(r"\bSCAN (%s)\b(?!.*USING)" % "|".join(CHECKED_TABLES))
+POSTGRES_FULL_SCAN = re.compile(r"Seq Scan on (%s)\b" % "|".join(CHECKED_TABLES))
+
+
+def query_shapes(db):
+    """The WHERE/ORDER BY shapes used by routers/items.py, projects.py and families.py"""
+    open_items = db.query(Item).filter(Item.user_id == USER_ID, Item.completed_at.is_(None))
+    newest_first = (Item.created_at.desc(), Item.id.desc())
+    cursor_at = datetime(2026, 1, 1)
+
+    my_families = db.query(FamilyMember.family_id).filter(FamilyMember.user_id == USER_ID)
+    visible_projects = db.query(Project).filter(
+        (Project.user_id == USER_ID) | (Project.family_id.in_(my_families))
+    )
+
+    return {
+        "items: open": open_items.order_by(*newest_first).limit(51),
+        "items: open by type": open_items.filter(Item.type == ItemType.next_action).order_by(*newest_first),
+        "items: open by context": open_items.filter(Item.context_id == OTHER_ID).order_by(*newest_first),
+        "items: open by priority": open_items.filter(Item.priority == ItemPriority.p1).order_by(*newest_first),
+        "items: by project": open_items.filter(Item.project_id == OTHER_ID).order_by(*newest_first),
+        "items: include completed": db.query(Item).filter(Item.user_id == USER_ID).order_by(*newest_first),
+        "items: open keyset page": open_items.filter(or_(
+            Item.created_at < cursor_at,
+            and_(Item.created_at == cursor_at, Item.id < OTHER_ID)
+        )).order_by(*newest_first).limit(51),
+        "items: get by id": db.query(Item).filter(Item.id == OTHER_ID, Item.user_id == USER_ID),
+        "projects: visible": visible_projects.order_by(Project.created_at.desc(), Project.id.desc()),
+        "projects: visible in family": visible_projects.filter(Project.family_id == OTHER_ID),
+        "families: of user": db.query(Family).filter(Family.id.in_(
+            db.query(FamilyMember.family_id).filter(FamilyMember.user_id == USER_ID)
+        )),
+        "families: membership check": db.query(FamilyMember).filter(
+            FamilyMember.family_id == OTHER_ID, FamilyMember.user_id == USER_ID
+        ),
+        "families: members": db.query(FamilyMember).filter(FamilyMember.family_id == OTHER_ID),
+    }
+
+
+def explain(conn, query) -> str:
+    sql = str(query.statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+    if engine.dialect.name == "sqlite":
+        rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql).fetchall()
+        return "\n".join(row[-1] for row in rows)
+    rows = conn.exec_driver_sql("EXPLAIN " + sql).fetchall()
+    return "\n".join(row[0] for row in rows)
+
+
+def main() -> int:
+    dialect = engine.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        print(f"Unsupported dialect: {dialect}")
+        return 2
+    if dialect == "sqlite":
+        Base.metadata.create_all(bind=engine)
+
+    full_scan = SQLITE_FULL_SCAN if dialect == "sqlite" else POSTGRES_FULL_SCAN
+    failures = 0
+    db = SessionLocal()
+    try:
+        with engine.connect() as conn:
+            if dialect == "postgresql":
+                # Tiny dev tables make sequential scans look cheap; we want to
+                # know whether an index *can* serve the query.
+                conn.exec_driver_sql("SET enable_seqscan = off")
+            for name, query in query_shapes(db).items():
+                plan = explain(conn, query)
+                ok = not full_scan.search(plan)
+                failures += not ok
+                print(f"[{'ok' if ok else 'FULL SCAN'}] {name}")
+                for line in plan.splitlines():
+                    print(f"    {line}")
+    finally:
+        db.close()
+
+    print(f"\n{failures} quer{'y' if failures == 1 else 'ies'} without index support")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
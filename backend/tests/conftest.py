@@ -0,0 +1,70 @@
+"""Shared fixtures: one migrated scratch SQLite database for the session,
+and a fresh user per test so tests don't see each other's rows."""
+import os
+import tempfile
+import uuid
+
+# Settings are read at import time, so configure before anything imports app
+_workdir = tempfile.mkdtemp(prefix="gtd-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_workdir}/test.db"
+os.environ.setdefault("PASSWORD_HASH_POOL", "thread")
+os.environ.setdefault("ARCHIVE_INTERVAL_MINUTES", "0")
+
+import pytest
+from fastapi.testclient import TestClient
+from app.database import SessionLocal
+from app.migrations import migrate
+
+migrate()
+
+from app.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+class ApiUser:
+    def __init__(self, client: TestClient, email: str):
+        self.client = client
+        self.email = email
+        client.post("/auth/register", json={"email": email, "password": "secret", "name": "Test"})
+        token = client.post("/auth/login", data={"username": email, "password": "secret"}).json()["access_token"]
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.id = client.get("/auth/me", headers=self.headers).json()["id"]
+
+    def get(self, url, **kwargs):
+        return self.client.get(url, headers={**self.headers, **kwargs.pop("headers", {})}, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.client.post(url, headers=self.headers, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.client.put(url, headers=self.headers, **kwargs)
+
+    def patch(self, url, **kwargs):
+        return self.client.patch(url, headers=self.headers, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.client.delete(url, headers=self.headers, **kwargs)
+
+
+@pytest.fixture
+def make_user(client):
+    return lambda: ApiUser(client, f"{uuid.uuid4().hex}@example.com")
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
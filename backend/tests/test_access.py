@@ -0,0 +1,23 @@
+import asyncio
+from sqlalchemy import delete
+from app.models.family import FamilyMember
+from app.services.access import role_cache
+from app.services.events import broker, user_channel
+
+
+def test_shared_project_access_follows_membership(make_user, db):
+    owner, member = make_user(), make_user()
+    family = owner.post("/families", json={"name": "Home"}).json()
+    project = owner.post("/projects", json={"name": "Garden", "family_id": family["id"]}).json()
+    assert member.get(f"/projects/{project['id']}").status_code == 403
+
+    member.post("/families/join", json={"invite_code": family["invite_code"]})
+    assert member.get(f"/projects/{project['id']}").status_code == 200
+    assert role_cache.get(member.id) == {family["id"]: "member"}
+
+    # Another worker removes the membership; only its change event reaches this one
+    db.execute(delete(FamilyMember).where(FamilyMember.user_id == member.id))
+    db.commit()
+    event = {"type": "family_member.removed", "ids": [member.id], "actor": owner.id, "at": ""}
+    asyncio.run(broker.publish([user_channel(member.id)], event))
+    assert member.get(f"/projects/{project['id']}").status_code == 403
@@ -0,0 +1,59 @@
+"""Weekly rollups kept by deltas must match a rebuild from the items"""
+from datetime import timedelta
+from sqlalchemy import select
+from app.models.analytics import WeeklyRollup
+from app.services.analytics import CAPTURED, COMPLETED, rebuild_rollups
+from app.services.archive import archive_completed_items
+
+
+def rollups(db, user_id):
+    db.expire_all()
+    return sorted(db.execute(
+        select(WeeklyRollup.week, WeeklyRollup.dimension, WeeklyRollup.metric, WeeklyRollup.value).where(
+            WeeklyRollup.user_id == user_id,
+            WeeklyRollup.metric.in_([CAPTURED, COMPLETED]),
+            WeeklyRollup.value != 0,
+        )
+    ).all())
+
+
+def assert_rollups_match_rebuild(user, db):
+    live = rollups(db, user.id)
+    rebuild_rollups(db, user.id)
+    assert live == rollups(db, user.id)
+    return live
+
+
+def test_item_writes_keep_rollups_in_step(user, db):
+    project_id = user.post("/projects", json={"name": "taxes"}).json()["id"]
+    context_id = user.post("/contexts", json={"name": "@desk"}).json()["id"]
+    inbox_id = user.post("/items", json={"title": "receipts"}).json()["id"]
+    action_id = user.post("/items", json={"title": "file", "type": "next_action"}).json()["id"]
+    assert assert_rollups_match_rebuild(user, db)
+
+    user.post(f"/items/{inbox_id}/process", json={"type": "next_action", "project_id": project_id})
+    user.patch(f"/items/{action_id}", json={"project_id": project_id, "context_id": context_id})
+    user.post(f"/items/{action_id}/complete")
+    user.post("/items/batch", json={"operations": [
+        {"op": "create", "data": {"title": "sign", "type": "next_action", "context_id": context_id}},
+        {"op": "complete", "id": inbox_id},
+    ]})
+    assert_rollups_match_rebuild(user, db)
+
+
+def test_project_and_context_delete_move_rollups_to_none(user, db):
+    project_id = user.post("/projects", json={"name": "party"}).json()["id"]
+    context_id = user.post("/contexts", json={"name": "@shops"}).json()["id"]
+    ids = [
+        user.post("/items", json={
+            "title": f"task {n}", "type": "next_action", "project_id": project_id, "context_id": context_id,
+        }).json()["id"]
+        for n in range(3)
+    ]
+    user.post(f"/items/{ids[0]}/complete")
+    archive_completed_items(db, timedelta(0))
+
+    assert user.delete(f"/projects/{project_id}").status_code == 204
+    assert user.delete(f"/contexts/{context_id}").status_code == 204
+    live = assert_rollups_match_rebuild(user, db)
+    assert not any(project_id in dimension or context_id in dimension for _, dimension, _, _ in live)
@@ -0,0 +1,48 @@
+"""Writes to an archived item bring it back into the live table first"""
+from datetime import timedelta
+from app.models.archive import ArchivedItem
+from app.models.item import Item
+from app.services.archive import archive_completed_items
+from .test_counters import assert_counters_match_recount
+
+
+def archive(db, item_id):
+    archive_completed_items(db, timedelta(0))
+    db.expire_all()
+    assert db.get(Item, item_id) is None
+    assert db.get(ArchivedItem, item_id) is not None
+
+
+def test_update_restores_archived_item(user, db):
+    item_id = user.post("/items", json={"title": "old", "type": "next_action"}).json()["id"]
+    user.post(f"/items/{item_id}/complete")
+    archive(db, item_id)
+
+    response = user.patch(f"/items/{item_id}", json={"title": "renamed"})
+    assert response.status_code == 200
+    assert response.json()["title"] == "renamed"
+    db.expire_all()
+    assert db.get(Item, item_id).title == "renamed"
+    assert db.get(ArchivedItem, item_id) is None
+    assert_counters_match_recount(user, db)
+
+
+def test_batch_and_delete_restore_archived_items(user, db):
+    ids = [user.post("/items", json={"title": f"done {n}"}).json()["id"] for n in range(2)]
+    for item_id in ids:
+        user.post(f"/items/{item_id}/complete")
+    archive(db, ids[0])
+
+    response = user.post("/items/batch", json={"operations": [
+        {"op": "update", "id": ids[0], "data": {"notes": "reopened"}},
+    ]}).json()
+    assert response["succeeded"] == 1
+    db.expire_all()
+    assert db.get(Item, ids[0]).notes == "reopened"
+
+    archive(db, ids[1])
+    assert user.delete(f"/items/{ids[1]}").status_code == 204
+    db.expire_all()
+    assert db.get(Item, ids[1]) is None
+    assert db.get(ArchivedItem, ids[1]) is None
+    assert_counters_match_recount(user, db)
@@ -0,0 +1,78 @@
+"""Dashboard counters kept by deltas must match a recount from the tables"""
+from app.services.counters import get_summary, recompute_counters
+
+
+def assert_counters_match_recount(user, db):
+    summary = user.get("/dashboard/summary").json()
+    recompute_counters(db, user.id)
+    assert summary == get_summary(db, user.id).model_dump()
+    return summary
+
+
+def test_delete_context_moves_next_actions_to_none(user, db):
+    context_id = user.post("/contexts", json={"name": "@phone"}).json()["id"]
+    item_id = user.post("/items", json={"title": "call", "type": "next_action", "context_id": context_id}).json()["id"]
+    assert user.get("/dashboard/summary").json()["next_actions_by_context"] == {context_id: 1}
+
+    assert user.delete(f"/contexts/{context_id}").status_code == 204
+    summary = assert_counters_match_recount(user, db)
+    assert summary["next_actions_by_context"] == {"none": 1}
+
+    user.post(f"/items/{item_id}/complete")
+    summary = assert_counters_match_recount(user, db)
+    assert summary["next_actions_by_context"] == {}
+
+
+def test_item_writes_keep_counters_in_step(user, db):
+    project_id = user.post("/projects", json={"name": "move"}).json()["id"]
+    context_id = user.post("/contexts", json={"name": "@home"}).json()["id"]
+    inbox_id = user.post("/items", json={"title": "boxes"}).json()["id"]
+    action_id = user.post("/items", json={"title": "pack", "type": "next_action", "project_id": project_id}).json()["id"]
+    assert_counters_match_recount(user, db)
+
+    user.patch(f"/items/{inbox_id}", json={"type": "waiting_for"})
+    user.patch(f"/items/{action_id}", json={"context_id": context_id})
+    summary = assert_counters_match_recount(user, db)
+    assert summary["next_actions_by_context"] == {context_id: 1}
+
+    user.post(f"/items/{action_id}/complete")
+    assert_counters_match_recount(user, db)
+
+    assert user.delete(f"/items/{inbox_id}").status_code == 204
+    assert user.delete(f"/items/{action_id}").status_code == 204
+    assert_counters_match_recount(user, db)
+
+
+def test_batch_and_process_keep_counters_in_step(user, db):
+    context_id = user.post("/contexts", json={"name": "@errands"}).json()["id"]
+    inbox_ids = [user.post("/items", json={"title": f"thought {n}"}).json()["id"] for n in range(4)]
+
+    response = user.post("/items/batch", json={"operations": [
+        {"op": "create", "data": {"title": "buy milk", "type": "next_action", "context_id": context_id}},
+        {"op": "update", "id": inbox_ids[0], "data": {"type": "someday"}},
+        {"op": "complete", "id": inbox_ids[1]},
+        {"op": "delete", "id": inbox_ids[2]},
+    ]}).json()
+    assert response["failed"] == 0
+    assert_counters_match_recount(user, db)
+
+    response = user.post("/items/process", json={"items": [
+        {"id": inbox_ids[3], "type": "next_action", "context_id": context_id},
+    ]}).json()
+    assert response["failed"] == 0
+    summary = assert_counters_match_recount(user, db)
+    assert summary["next_actions_by_context"] == {context_id: 2}
+
+    single_id = user.post("/items", json={"title": "call mum"}).json()["id"]
+    assert user.post(f"/items/{single_id}/process", json={"type": "next_action"}).status_code == 200
+    summary = assert_counters_match_recount(user, db)
+    assert summary["next_actions_by_context"] == {context_id: 2, "none": 1}
+
+
+def test_delete_project_keeps_counters_in_step(user, db):
+    project_id = user.post("/projects", json={"name": "garden"}).json()["id"]
+    user.post("/items", json={"title": "dig", "type": "next_action", "project_id": project_id})
+    assert_counters_match_recount(user, db)
+
+    assert user.delete(f"/projects/{project_id}").status_code == 204
+    assert_counters_match_recount(user, db)
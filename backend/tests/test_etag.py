@@ -0,0 +1,38 @@
+"""Conditional GETs on list endpoints"""
+
+
+def test_items_list_answers_304_until_it_changes(user):
+    user.post("/items", json={"title": "first"})
+    response = user.get("/items")
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    response = user.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # The query string is part of the tag
+    assert user.get("/items", params={"type": "inbox"}, headers={"If-None-Match": etag}).status_code == 200
+
+    user.post("/items", json={"title": "second"})
+    response = user.get("/items", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_is_per_user(make_user):
+    alice, bob = make_user(), make_user()
+    etag = alice.get("/contexts").headers["ETag"]
+    assert bob.get("/contexts", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_projects_etag_follows_family_membership(user, make_user):
+    owner = make_user()
+    family_id = owner.post("/families", json={"name": "home"}).json()["id"]
+    invite_code = owner.post(f"/families/{family_id}/invite").json()["invite_code"]
+    etag = user.get("/projects").headers["ETag"]
+    assert user.get("/projects", headers={"If-None-Match": etag}).status_code == 304
+
+    # Joining makes the family's projects visible without touching any project row
+    assert user.post("/families/join", json={"invite_code": invite_code}).status_code == 200
+    assert user.get("/projects", headers={"If-None-Match": etag}).status_code == 200
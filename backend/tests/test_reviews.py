@@ -0,0 +1,13 @@
+import io
+
+
+def test_import_refreshes_cached_review_reports(user):
+    before = user.get("/reviews/snapshot").json()
+    csv = b"title,type\nfile taxes,inbox\nbuy milk,inbox\n"
+    response = user.post("/import", files={"file": ("items.csv", io.BytesIO(csv), "text/csv")})
+    assert response.status_code == 200
+
+    after = user.get("/reviews/snapshot").json()
+    assert after["open_items"].get("inbox", 0) == before["open_items"].get("inbox", 0) + 2
+    review = user.post("/reviews", json={"notes": "weekly"}).json()
+    assert review["stats"]["clear_inbox"] == 2
@@ -0,0 +1,31 @@
+from sqlalchemy import text
+from app.database import engine
+
+
+def titles(user, q):
+    return sorted(hit["item"]["title"] for hit in user.get("/items/search", params={"q": q}).json()["hits"])
+
+
+def test_search_is_scoped_to_the_user(make_user):
+    alice, bob = make_user(), make_user()
+    alice.post("/items", json={"title": "quarterly taxes"})
+    bob.post("/items", json={"title": "quarterly report"})
+    assert titles(alice, "quarter") == ["quarterly taxes"]
+    assert titles(bob, "quarter") == ["quarterly report"]
+
+
+def test_search_index_follows_writes_and_vacuum(user):
+    doomed = [user.post("/items", json={"title": f"filler {n}"}).json()["id"] for n in range(20)]
+    user.post("/items", json={"title": "water the plants", "notes": "balcony first"})
+    for item_id in doomed:
+        user.delete(f"/items/{item_id}")
+    renamed = user.post("/items", json={"title": "old name"}).json()["id"]
+    user.patch(f"/items/{renamed}", json={"title": "fresh name"})
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM"))
+
+    assert titles(user, "plants") == ["water the plants"]
+    assert titles(user, "balcony") == ["water the plants"]
+    assert titles(user, "name") == ["fresh name"]
+    assert titles(user, "filler") == []
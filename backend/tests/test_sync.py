@@ -0,0 +1,38 @@
+"""Sync only hands out rows older than the safety window, and never skips them"""
+from datetime import datetime, timedelta
+from sqlalchemy import update
+from app.models.item import Item
+from app.services import sync
+
+
+def item_ids(changes):
+    return [item["id"] for item in changes["items"]]
+
+
+def test_fresh_writes_wait_for_the_safety_window(user, db):
+    item_id = user.post("/items", json={"title": "just now"}).json()["id"]
+    changes = user.get("/sync/changes").json()
+    assert item_id not in item_ids(changes)
+
+    db.execute(update(Item).where(Item.id == item_id).values(
+        updated_at=datetime.utcnow() - sync.SAFETY_WINDOW - timedelta(seconds=1)
+    ))
+    db.commit()
+    changes = user.get("/sync/changes").json()
+    assert item_ids(changes) == [item_id]
+
+
+def test_late_commit_inside_the_window_is_not_skipped(user, db, monkeypatch):
+    cursor = user.get("/sync/changes").json()["next_cursor"]
+    # A write stamped before the cursor was issued but committed after it
+    item_id = user.post("/items", json={"title": "slow commit"}).json()["id"]
+    db.execute(update(Item).where(Item.id == item_id).values(
+        updated_at=datetime.utcnow() - sync.SAFETY_WINDOW / 2
+    ))
+    db.commit()
+
+    monkeypatch.setattr(sync, "SAFETY_WINDOW", timedelta(0))
+    changes = user.get("/sync/changes", params={"since": cursor}).json()
+    assert item_ids(changes) == [item_id]
+    changes = user.get("/sync/changes", params={"since": changes["next_cursor"]}).json()
+    assert item_ids(changes) == []
@@ -34,16 +34,36 @@ echo -n "$JWT_SECRET" | gcloud secrets create jwt-secret --data-file=- 2>/dev/nu
 CONNECTION_NAME=$(gcloud sql instances describe $DB_INSTANCE --format='value(connectionName)')
 
 # Build and deploy backend
-echo "Deploying backend to Cloud Run..."
 cd backend
+DATABASE_URL="postgresql://gtd_user:${DB_PASSWORD}@/${DB_NAME}?host=/cloudsql/${CONNECTION_NAME}"
+
+# Migrate the schema once, before the new revision starts serving; instances
+# never touch the schema at startup
+echo "Running database migrations..."
+gcloud run jobs deploy $BACKEND_SERVICE-migrate \
+  --source . \
+  --region $REGION \
+  --set-cloudsql-instances $CONNECTION_NAME \
+  --set-env-vars "DATABASE_URL=${DATABASE_URL}" \
+  --set-env-vars "SECRET_KEY=${JWT_SECRET}" \
+  --command python \
+  --args="-m,app.cli,migrate" \
+  --max-retries 0 \
+  --execute-now \
+  --wait
+
+# Instances share change events (SSE/WebSocket pushes, cache invalidation)
+# through PostgreSQL LISTEN/NOTIFY
+echo "Deploying backend to Cloud Run..."
 gcloud run deploy $BACKEND_SERVICE \
   --source . \
   --region $REGION \
   --platform managed \
   --allow-unauthenticated \
   --add-cloudsql-instances $CONNECTION_NAME \
-  --set-env-vars "DATABASE_URL=postgresql://gtd_user:${DB_PASSWORD}@/${DB_NAME}?host=/cloudsql/${CONNECTION_NAME}" \
-  --set-env-vars "SECRET_KEY=${JWT_SECRET}"
+  --set-env-vars "DATABASE_URL=${DATABASE_URL}" \
+  --set-env-vars "SECRET_KEY=${JWT_SECRET}" \
+  --set-env-vars "EVENT_BROKER=postgres"
 cd ..
 
 # Get backend URL